@@ -0,0 +1,330 @@
+""" A module for benchmarking the serving paths of the dashboards. """
+
+import gc
+import json
+import time
+import tempfile
+import tracemalloc
+import numpy as np
+import pandas as pd
+from plotly.io.json import to_json_plotly
+import dash_plots as dp
+import ingestion as ig
+import custom_tabs as ct
+import custom_dashboards as cd
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def best_time(function: Callable[[], Any], repeat: int = 3) -> Tuple[float, Any]:
+    """
+    Run a function several times and return the fastest run time and its result.
+
+    Args:
+        function (Callable[[], Any]): The function to time.
+        repeat (int): The number of runs.
+
+    Returns:
+        Tuple[float, Any]: The fastest run time in seconds and the result of the last run.
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def synthetic_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Builds a synthetic DataFrame with the columns of `data/data.csv`.
+
+    Args:
+        rows (int): The number of rows.
+        seed (int): The random seed.
+
+    Returns:
+        pd.DataFrame: The synthetic data.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'date': pd.date_range('2000-01-01', periods=rows, freq='min'),
+        'price': rng.normal(100, 10, rows).round(2),
+        'volume': rng.integers(100, 10000, rows),
+        'consensus': rng.choice(['Positive', 'Neutral', 'Negative'], rows),
+        'test_set': rng.random(rows),
+    })
+
+
+def example_payloads() -> Dict[str, Any]:
+    """
+    Renders every tab of the example dashboards and the example dropdown figure.
+
+    Returns:
+        Dict[str, Any]: The rendered payloads keyed by name.
+    """
+    payloads = {}
+    for dashboard in [cd.ExampleDashboard, cd.ExampleDropDownDashboard, cd.ExampleCrossFilterDashboard]:
+        for tab in dashboard.tabs:
+            payloads[f'{dashboard.__name__}/{tab.value}'] = tab().tab
+    tab = ct.ExampleDropDownTab
+    payloads[f'{tab.value}/update_graph'] = tab.update_graph(tab, tab.start_value)
+    return payloads
+
+
+def synthetic_payloads(sizes: List[int]) -> Dict[str, Any]:
+    """
+    Renders line graphs of synthetic frames.
+
+    Args:
+        sizes (List[int]): The number of rows of each frame.
+
+    Returns:
+        Dict[str, Any]: The rendered graphs keyed by name.
+    """
+    payloads = {}
+    for rows in sizes:
+        df = synthetic_frame(rows)
+        payloads[f'synthetic/{rows}'] = dp.Graph(id=f'synthetic-{rows}',
+                                                 data=[dp.LinePlot(df, 'date', 'price'),
+                                                       dp.LinePlot(df, 'date', 'volume')]).plot
+    return payloads
+
+
+def json_benchmark(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    """
+    Compares the plotly 'json' and 'orjson' engines on the example dashboards and synthetic frames.
+    Each payload reports the encode time of both engines, whether the outputs are byte identical and whether
+    they decode to identical figures. The engines format some floats differently, e.g. 1e-05 and 0.00001,
+    so payloads can differ in bytes while holding the same values.
+
+    Args:
+        sizes (List[int]): The number of rows of each synthetic frame.
+        repeat (int): The number of runs per engine.
+
+    Returns:
+        List[Dict[str, Any]]: One result row per payload.
+    """
+    payloads = {**example_payloads(), **synthetic_payloads(sizes)}
+    results = []
+    for name, payload in payloads.items():
+        json_time, json_out = best_time(lambda: to_json_plotly(payload, engine='json'), repeat)
+        orjson_time, orjson_out = best_time(lambda: to_json_plotly(payload, engine='orjson'), repeat)
+        results.append({
+            'payload': name,
+            'bytes': len(json_out),
+            'json_s': round(json_time, 4),
+            'orjson_s': round(orjson_time, 4),
+            'speedup': round(json_time / orjson_time, 1) if orjson_time else None,
+            'byte_identical': json_out == orjson_out,
+            'value_identical': json.loads(json_out) == json.loads(orjson_out),
+        })
+    return results
+
+
+def wide_frame(rows: int, columns: int = 40, seed: int = 0) -> pd.DataFrame:
+    """
+    Builds a wide synthetic DataFrame of mixed numeric and text columns, like a `TableTab` export.
+
+    Args:
+        rows (int): The number of rows.
+        columns (int): The number of columns.
+        seed (int): The random seed.
+
+    Returns:
+        pd.DataFrame: The synthetic data.
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(columns):
+        if i % 4 == 0:
+            data[f'Label {i}'] = rng.choice(['California', 'Arizona', 'Nevada', 'Texas'], rows)
+        elif i % 4 == 1:
+            data[f'Count {i}'] = rng.integers(0, 1000, rows)
+        else:
+            data[f'Value {i}'] = rng.random(rows).round(3)
+    return pd.DataFrame(data)
+
+
+def table_benchmark(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    """
+    Compares the 'records' and 'columnar' transfer modes of `dp.DataTable` on wide synthetic tables.
+    The build time covers constructing the table component on the server and the bytes are its serialized size.
+
+    Args:
+        sizes (List[int]): The number of rows of each table.
+        repeat (int): The number of runs per mode.
+
+    Returns:
+        List[Dict[str, Any]]: One result row per table size.
+    """
+    results = []
+    for rows in sizes:
+        df = wide_frame(rows)
+        row = {'rows': rows, 'columns': len(df.columns)}
+        for mode in ['records', 'columnar']:
+            build_time, table = best_time(lambda: dp.DataTable('table', df, transfer_mode=mode, virtualization=True).table,
+                                          repeat)
+            row[f'{mode}_build_s'] = round(build_time, 4)
+            row[f'{mode}_bytes'] = len(to_json_plotly(table))
+        row['build_speedup'] = round(row['records_build_s'] / row['columnar_build_s'], 1)
+        row['size_ratio'] = round(row['columnar_bytes'] / row['records_bytes'], 2)
+        results.append(row)
+    return results
+
+
+def retained_bytes(build: Callable[[pd.DataFrame], Any], rows: int) -> Tuple[int, int]:
+    """
+    Build an object from a wide synthetic frame, drop the frame and measure the memory the object keeps alive,
+    including the parts of the frame it still references.
+
+    Args:
+        build (Callable[[pd.DataFrame], Any]): Builds the object from the frame.
+        rows (int): The number of rows of the frame.
+
+    Returns:
+        Tuple[int, int]: The bytes still held after the frame is dropped and the peak bytes held while building.
+    """
+    build(wide_frame(10))
+    gc.collect()
+    tracemalloc.start()
+    df = wide_frame(rows)
+    start, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    result = build(df)
+    _, peak = tracemalloc.get_traced_memory()
+    del df
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak - start
+
+
+def graph_benchmark(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    """
+    Compares the memory a line figure of two columns of a wide synthetic frame keeps alive, for traces holding
+    the frame columns as Series and for the compact arrays of `dp.SubPlot`. A Series of a frame column is a view
+    of the 2-D block holding every column of its dtype, so a figure holding Series keeps the whole block alive.
+
+    Args:
+        sizes (List[int]): The number of rows of each frame.
+        repeat (int): Unused, the memory is measured once per mode.
+
+    Returns:
+        List[Dict[str, Any]]: One result row per frame size.
+    """
+    results = []
+    for rows in sizes:
+        row = {'rows': rows, 'frame_bytes': int(wide_frame(rows).memory_usage(deep=True).sum())}
+        series, series_peak = retained_bytes(
+            lambda df: {'data': [{'x': df['Count 1'], 'y': df[i]} for i in ['Value 2', 'Value 3']]}, rows)
+        compact, compact_peak = retained_bytes(
+            lambda df: dp.Graph('graph', [dp.LinePlot(df, 'Count 1', i) for i in ['Value 2', 'Value 3']]).plot, rows)
+        row.update({'series_retained': series, 'compact_retained': compact,
+                    'series_build_peak': series_peak, 'compact_build_peak': compact_peak})
+        results.append(row)
+    return results
+
+
+def population_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Builds a synthetic DataFrame with the columns of `data/drop_data.csv`.
+
+    Args:
+        rows (int): The number of rows.
+        seed (int): The random seed.
+
+    Returns:
+        pd.DataFrame: The synthetic data.
+    """
+    rng = np.random.default_rng(seed)
+    countries = np.array([f'Country {i}' for i in range(200)])
+    continents = np.array(['Africa', 'Americas', 'Asia', 'Europe', 'Oceania'])
+    country = rng.integers(0, len(countries), rows)
+    return pd.DataFrame({
+        'country': countries[country],
+        'continent': continents[country % len(continents)],
+        'year': rng.integers(1952, 2008, rows),
+        'lifeExp': rng.uniform(25, 85, rows).round(3),
+        'pop': rng.integers(10 ** 5, 10 ** 9, rows),
+        'gdpPercap': rng.lognormal(8, 1, rows),
+    })
+
+
+def csv_benchmark(sizes: List[int], repeat: int) -> List[Dict[str, Any]]:
+    """
+    Compares the csv engines of `DashboardTab.csv_engine` on synthetic files with the columns of `data/data.csv`
+    and `data/drop_data.csv`. The memory is the deep size of the parsed DataFrame. 'pyarrow' is skipped when
+    pyarrow is not installed.
+
+    Args:
+        sizes (List[int]): The number of rows of each file.
+        repeat (int): The number of parses per engine.
+
+    Returns:
+        List[Dict[str, Any]]: One result row per file and engine.
+    """
+    engines = [i for i in ig.CSV_ENGINES if i != 'pyarrow' or ig.pyarrow is not None]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            for name, frame in [('data', synthetic_frame), ('drop_data', population_frame)]:
+                path = Path(tmp) / f'{name}_{rows}.csv'
+                frame(rows).to_csv(path, index=False)
+                baseline = None
+                for engine in engines:
+                    options = ig.read_csv_options(engine)
+                    parse_time, df = best_time(lambda: pd.read_csv(path, **options), repeat)
+                    baseline = baseline or parse_time
+                    results.append({
+                        'file': name,
+                        'rows': rows,
+                        'file_mb': round(path.stat().st_size / 2 ** 20, 1),
+                        'engine': engine,
+                        'parse_s': round(parse_time, 4),
+                        'speedup': round(baseline / parse_time, 1),
+                        'frame_mb': round(df.memory_usage(deep=True).sum() / 2 ** 20, 1),
+                    })
+                    del df
+    return results
+
+
+SUITES: Dict[str, Callable[[List[int], int], List[Dict[str, Any]]]] = {
+    'json': json_benchmark,
+    'table': table_benchmark,
+    'graph': graph_benchmark,
+    'csv': csv_benchmark,
+}
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """Prints benchmark results as an aligned table."""
+    if not results:
+        return
+    columns = list(results[0].keys())
+    widths = {i: max(len(i), *(len(str(row[i])) for row in results)) for i in columns}
+    print('  '.join(i.ljust(widths[i]) for i in columns))
+    for row in results:
+        print('  '.join(str(row[i]).ljust(widths[i]) for i in columns))
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the serving paths of the dashboards')
+    parser.add_argument('--suite',
+                        help='The benchmark to run',
+                        choices=list(SUITES),
+                        default='json')
+    parser.add_argument('--rows',
+                        help='The number of rows of each synthetic frame',
+                        type=int,
+                        nargs='+',
+                        default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat',
+                        help='The number of runs per measurement',
+                        type=int,
+                        default=3)
+    args = parser.parse_args()
+    print_results(SUITES[args.suite](args.rows, args.repeat))
@@ -0,0 +1,92 @@
+"""
+This module contains the response compression and conditional response hooks for the Flask server of a dashboard.
+"""
+
+import gzip
+import hashlib
+from flask import Flask, Response, request
+from typing import Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def accepted_encoding(accept_encoding: str, encodings: Tuple[str, ...]) -> Optional[str]:
+    """
+    Pick the first of `encodings` accepted by the client.
+
+    Args:
+        accept_encoding (str): The Accept-Encoding header of the request.
+        encodings (Tuple[str, ...]): The supported encodings in order of preference.
+
+    Returns:
+        Optional[str]: The chosen encoding, or None if the client accepts none of them.
+    """
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    """
+    Compress a response body.
+
+    Args:
+        data (bytes): The response body.
+        encoding (str): 'br' or 'gzip'.
+        level (int): The compression level, 1 to 9 for gzip and 0 to 11 for brotli.
+
+    Returns:
+        bytes: The compressed body.
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def install_compression(server: Flask, min_size: int = 1024, level: int = 6, etags: bool = True) -> None:
+    """
+    Register an `after_request` hook that compresses the layout and callback responses of a Dash app with
+    brotli, if installed, or gzip. Responses to GET requests, such as the layout, also get a content hash
+    ETag and are answered with 304 Not Modified when the client already holds them.
+
+    Args:
+        server (Flask): The Flask server of the Dash app.
+        min_size (int): Responses smaller than this number of bytes are sent uncompressed.
+        level (int): The compression level.
+        etags (bool): If True, add ETags to GET responses and answer conditional requests.
+    """
+    encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    @server.after_request
+    def compress_response(response: Response) -> Response:
+        if response.status_code != 200 or response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return response
+        if etags and request.method == 'GET':
+            response.set_etag(hashlib.sha1(response.get_data()).hexdigest(), weak=True)
+            response = response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        encoding = accepted_encoding(request.headers.get('Accept-Encoding', ''), encodings)
+        if encoding is None:
+            return response
+        response.set_data(compress(data, encoding, level))
+        response.headers['Content-Encoding'] = encoding
+        return response
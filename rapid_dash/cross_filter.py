@@ -0,0 +1,126 @@
+"""
+This module contains the categorical indexes used to cross filter the graphs of a tab.
+The row positions of every category are precomputed once per data version so a selection
+costs roughly the number of selected rows instead of a scan of the whole DataFrame.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class CategoricalIndex:
+    """
+    Maps every distinct value of a column to the sorted row positions holding it.
+
+    Attributes:
+        column (str): The indexed column.
+        categories (pd.Index): The distinct values of the column.
+        positions (np.ndarray): The row positions grouped by category, sorted within each category.
+        offsets (np.ndarray): The start of each category in `positions`, with a final end offset.
+    """
+
+    def __init__(self, df: pd.DataFrame, column: str) -> None:
+        self.column = column
+        codes, categories = pd.factorize(df[column], sort=True)
+        self.categories = pd.Index(categories)
+        valid = codes >= 0
+        order = np.argsort(codes[valid], kind='stable')
+        self.positions = np.flatnonzero(valid)[order]
+        counts = np.bincount(codes[valid], minlength=len(self.categories))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def rows(self, values: Iterable[Any]) -> np.ndarray:
+        """
+        Returns the sorted row positions holding any of `values`.
+
+        Args:
+            values (Iterable[Any]): The selected values. Values that are not in the column are ignored.
+
+        Returns:
+            np.ndarray: The row positions.
+        """
+        codes = self.categories.get_indexer(pd.Index(list(values)))
+        codes = np.unique(codes[codes >= 0])
+        if len(codes) == 1:
+            return self.positions[self.offsets[codes[0]]:self.offsets[codes[0] + 1]]
+        if len(codes) == 0:
+            return np.empty(0, dtype=self.positions.dtype)
+        return np.sort(np.concatenate([self.positions[self.offsets[i]:self.offsets[i + 1]] for i in codes]))
+
+    def count(self, values: Iterable[Any]) -> int:
+        """Returns the number of rows holding any of `values`."""
+        codes = self.categories.get_indexer(pd.Index(list(values)))
+        codes = np.unique(codes[codes >= 0])
+        return int(sum(self.offsets[i + 1] - self.offsets[i] for i in codes))
+
+
+class CrossFilterIndex:
+    """
+    A set of categorical indexes over the columns of a shared DataFrame.
+
+    Attributes:
+        n_rows (int): The number of rows of the indexed DataFrame.
+        indexes (Dict[str, CategoricalIndex]): The index of every filter column.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: List[str]) -> None:
+        self.n_rows = len(df)
+        self.indexes: Dict[str, CategoricalIndex] = {column: CategoricalIndex(df, column) for column in columns}
+
+    def select(self, selections: Iterable[Tuple[str, Optional[List[Any]]]]) -> Optional[np.ndarray]:
+        """
+        Returns the row positions matching every selection. The smallest selection is taken first
+        and intersected with the others, so the cost follows the number of selected rows.
+
+        Args:
+            selections (Iterable[Tuple[str, Optional[List[Any]]]]): Pairs of column and selected values.
+                A column may appear more than once. Empty or None selections are ignored.
+
+        Returns:
+            Optional[np.ndarray]: The sorted row positions, or None if nothing is selected.
+        """
+        active = [(column, values) for column, values in selections
+                  if values and column in self.indexes]
+        if not active:
+            return None
+        active.sort(key=lambda i: self.indexes[i[0]].count(i[1]))
+        rows = self.indexes[active[0][0]].rows(active[0][1])
+        for column, values in active[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, self.indexes[column].rows(values), assume_unique=True)
+        return rows
+
+
+def take_columns(df: pd.DataFrame, columns: List[str], rows: Optional[np.ndarray]) -> pd.DataFrame:
+    """
+    Builds a DataFrame holding only `columns` of the selected rows, without copying the unselected rows.
+
+    Args:
+        df (pd.DataFrame): The shared DataFrame.
+        columns (List[str]): The columns to take.
+        rows (np.ndarray, optional): The selected row positions. None selects every row.
+
+    Returns:
+        pd.DataFrame: The selected data.
+    """
+    if rows is None:
+        return df[list(dict.fromkeys(columns))]
+    return pd.DataFrame({column: df[column].to_numpy()[rows] for column in dict.fromkeys(columns)})
+
+
+def selected_points(selection: Optional[Dict[str, Any]], axis: str = 'x') -> Optional[List[Any]]:
+    """
+    Returns the values selected on a graph axis from a `clickData` or `selectedData` property.
+
+    Args:
+        selection (dict, optional): The `clickData` or `selectedData` of a `dcc.Graph`.
+        axis (str): The axis to read, 'x' or 'y'.
+
+    Returns:
+        Optional[List[Any]]: The selected values, or None if nothing is selected.
+    """
+    if not selection or not selection.get('points'):
+        return None
+    return list(dict.fromkeys(point[axis] for point in selection['points'] if axis in point))
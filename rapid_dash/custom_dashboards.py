@@ -1,6 +1,6 @@
 """ This module contains custom dashboards."""
 from dashboards import Dashboard
-from dash import Dash, html, dcc, callback, Output, Input, State
+from dash import Dash, html, dcc, Output, Input, State
 from dash.dependencies import Input, Output
 import plotly.graph_objs as go
 import pandas as pd
@@ -55,24 +55,69 @@ class ExampleDropDownDashboard(Dashboard):
     def __init__(self)-> None:
         Dashboard.__init__(self)
 
-    #Add a callback to update the dropdown options when the dropdown tab is selected.
-    @callback(
-        # Graph id as figure output
-        Output(ct.ExampleDropDownTab.graph_id, 'figure'),
-        Input(ct.ExampleDropDownTab.dropdown_id,
-              'value')  # Dropdown id as input
-    )
-    def update_graph(value: str) -> go.Figure:
+    def register_tab_callbacks(self, app: Dash) -> None:
         """
-        Update the graph displayed in ct.ExampleDropDownTab with the selected value from the dropdown.
+        Register the callbacks of the tabs, and the callback updating the graph of ct.ExampleDropDownTab
+        when a value is selected in its dropdown.
+        """
+        super().register_tab_callbacks(app)
 
-        Args:
-            value (str): The selected value from the dropdown.
+        @app.callback(
+            # Graph id as figure output
+            Output(ct.ExampleDropDownTab.graph_id, 'figure'),
+            Input(ct.ExampleDropDownTab.dropdown_id,
+                  'value')  # Dropdown id as input
+        )
+        def update_graph(value: str) -> go.Figure:
+            """
+            Update the graph displayed in ct.ExampleDropDownTab with the selected value from the dropdown.
+
+            Args:
+                value (str): The selected value from the dropdown.
+
+            Returns:
+                plotly.graph_objs._figure.Figure: A Plotly figure object representing the updated graph.
+            """
+            cls = ct.ExampleDropDownTab
+            return cls.update_graph(cls, value)
 
-        Returns:
-            plotly.graph_objs._figure.Figure: A Plotly figure object representing the updated graph.
-        """
-        cls = ct.ExampleDropDownTab
-        return cls.update_graph(cls, value)
 
+class ExampleCrossFilterDashboard(Dashboard):
+    """
+    A dashboard class that demonstrates cross filtering between the graphs of a tab.
+    Clicking a continent on the bar plot, or picking continents and years in the dropdowns, filters the other graphs.
+
+    Attributes:
+        h1_title (str): The title of the dashboard displayed in a H1 HTML element.
+        tabs_value (str): The ID of the Tabs component.
+        div_id (str): The ID of the HTML div element where the tab content is displayed.
+        tabs (list): A list of tab classes to be included in the dashboard.
+    """
+    h1_title = 'Cross filter demo'
+    tabs_value = "tabs-example-dash-cross-filter"
+    div_id = 'tabs-content-example-dash-cross-filter'
+    tabs = [ct.ExampleCrossFilterTab,
+            ct.ExampleTableTab]
 
+    def __init__(self)-> None:
+        super().__init__()
+
+
+class ExampleStreamingDashboard(Dashboard):
+    """
+    A dashboard class that demonstrates a live graph fed by a stream.
+    Lines appended to data/live.csv are plotted within half a second, e.g. `echo 2023-01-01T00:00:00,10.5 >> data/live.csv`.
+
+    Attributes:
+        h1_title (str): The title of the dashboard displayed in a H1 HTML element.
+        tabs_value (str): The ID of the Tabs component.
+        div_id (str): The ID of the HTML div element where the tab content is displayed.
+        tabs (list): A list of tab classes to be included in the dashboard.
+    """
+    h1_title = 'Streaming demo'
+    tabs_value = "tabs-example-dash-streaming"
+    div_id = 'tabs-content-example-dash-streaming'
+    tabs = [ct.ExampleStreamingTab]
+
+    def __init__(self)-> None:
+        super().__init__()
@@ -4,7 +4,8 @@ import dash_plots as dp
 import os
 from pathlib import Path
 import plotly.express as px
-from dash_tabs import DashboardTab,DropDownTab,MultiTab,TableTab
+from dash_tabs import DashboardTab,DropDownTab,MultiTab,TableTab,CrossFilterMultiTab,StreamingTab
+import streaming as st
 import pathlib
 from typing import Type,Union,Dict,List,Any,Callable,Optional
 
@@ -34,6 +35,7 @@ class ExampleScatterLineTab(DashboardTab):
     csv_path=DATA_DIR / "data.csv"
     plot_function: Callable = dp.ScatterLinePlot
     graph_columns={'x':'date', 'y':'volume'}
+    time_column='date'
     
     def __init__(self):
         super().__init__()
@@ -92,4 +94,38 @@ class ExampleMultiTab(MultiTab):
                 ExampleBarTab,ExampleScatterLineTab,
                 ExampleDropDownTab]
     def __init__(self):
-        super().__init__(self.tab_list)
\ No newline at end of file
+        super().__init__(self.tab_list)
+
+
+class ExampleContinentBarTab(DashboardTab):
+    label='Population by Continent'
+    value='tab-4-example-continent-bar'
+    plot_function=dp.BarPlot
+    graph_columns={'x':'continent','y':'pop'}
+
+
+class ExampleLifeExpScatterTab(DashboardTab):
+    label='Life Expectancy by GDP'
+    value='tab-4-example-lifeexp-scatter'
+    plot_function=dp.ScatterPlot
+    graph_columns={'x':'gdpPercap','y':'lifeExp'}
+
+
+class ExampleCrossFilterTab(CrossFilterMultiTab):
+    label='Cross Filter'
+    value='tab-4-example-cross-filter'
+    csv_path=DATA_DIR / "drop_data.csv"
+    filter_columns=['continent','year']
+
+    tab_list = [ExampleContinentBarTab,ExampleLifeExpScatterTab]
+    def __init__(self):
+        super().__init__()
+
+
+class ExampleStreamingTab(StreamingTab):
+    label='Live Price'
+    value='tab-5-example-streaming'
+    plot_function=dp.LinePlot
+    graph_columns={'x':'date','y':'price'}
+    stream_columns={'date':'datetime64[ns]','price':'float64'}
+    stream_source=lambda: st.FileTailSource(DATA_DIR / "live.csv")
@@ -1,6 +1,7 @@
 from dash import Dash, dcc, html, dash_table
 from dash.dependencies import Input, Output
 import plotly.graph_objs as go
+import numpy as np
 import pandas as pd
 from typing import Any, Type, Dict, List, Union,Optional
 from abc import ABC, abstractmethod, abstractproperty,abstractclassmethod
@@ -11,6 +12,7 @@ class FigureData(object):
     Abstract base class used to define the data for a plotly graph figure.
     All concrete classes derived from this base class must implement the `plot` method.
     """
+    __slots__ = ()
     x_name="x"
     y_name="y"
 
@@ -23,17 +25,46 @@ class FigureData(object):
         pass
 
 
+def column_values(df: pd.DataFrame, name: str) -> Union[np.ndarray, pd.DatetimeIndex]:
+    """
+    Returns a column of a DataFrame as a standalone 1-D array that does not keep the rest of the DataFrame alive.
+    The column is returned as a view when it owns its memory, e.g. a memory mapped column, and copied when it is
+    a view of a 2-D block holding other columns. Naive datetimes are returned as a `pd.DatetimeIndex`, which plotly
+    serializes like a datetime column.
+
+    Args:
+        df (pd.DataFrame): The DataFrame.
+        name (str): The name of the column.
+
+    Returns:
+        Union[np.ndarray, pd.DatetimeIndex]: The values of the column.
+    """
+    values = df[name].to_numpy()
+    if isinstance(values.base, np.ndarray) and values.base.nbytes > values.nbytes:
+        values = values.copy()
+    if values.dtype.kind == 'M':
+        return pd.DatetimeIndex(values, copy=False)
+    return values
+
+
 class SubPlot(FigureData):
     """
     A class to create subplots for Dash apps.
     See https://plotly.com/python/reference/ for more information on plotly properties.
+    Only the plotted columns are kept, as arrays, so a figure never keeps the DataFrame it was drawn from alive.
 
-    Methods:
-    --------
-    __init__(self, df: pd.DataFrame, x_name: str, y_name: str) -> None:
-        Initializes a SubPlot object with a given pandas DataFrame, x and y axis column names.
-
+    Attributes:
+    -----------
+    x_name : str
+        The name of the x-axis column.
+    y_name : str
+        The name of the y-axis column.
+    x_values : Union[np.ndarray, pd.DatetimeIndex]
+        The x values, from `column_values`.
+    y_values : Union[np.ndarray, pd.DatetimeIndex]
+        The y values, from `column_values`.
     """
+    __slots__ = ('x_name', 'y_name', 'plot_name', 'x_values', 'y_values')
     
     def __init__(self, df: pd.DataFrame, x_name: str, y_name: str)-> None:
         """
@@ -48,10 +79,11 @@ class SubPlot(FigureData):
         y_name : str
             The name of the y-axis column in the dataframe.
         """
-        self.data=df
         self.x_name = x_name
         self.y_name = y_name
         self.plot_name = y_name
+        self.x_values = column_values(df, x_name)
+        self.y_values = column_values(df, y_name)
 
     @abstractclassmethod
     def plot_type(cls) -> str:
@@ -87,27 +119,6 @@ class SubPlot(FigureData):
         """
         return {'color': 'blue'}
 
-
-    @property
-    def x_values(self) -> pd.Series:
-        """
-        Getter method for the x values from the dataframe.
-
-        Returns:
-            pd.Series: The x values.
-        """
-        return self.data[self.x_name]
-      
-    @property
-    def y_values(self) -> pd.Series:
-        """
-        Returns the y values from the DataFrame for the plot.
-
-        Returns:
-            pd.Series: A Pandas series of y values from the DataFrame.
-        """
-        return self.data[self.y_name]
-
     @property
     def plot(self):
         """
@@ -136,6 +147,7 @@ class BarPlot(SubPlot):
     plot_type : str
         Type of plot. This is set to "bar" for BarPlot.
     """
+    __slots__ = ()
     plot_type: str = "bar"
     mode: str="group"
     
@@ -163,6 +175,7 @@ class ScatterPlot(SubPlot):
     plot_type : str
         The type of plot. In this case it is 'markers'.
     """
+    __slots__ = ()
     plot_type: str = 'scatter'
     mode: str = "markers"
     
@@ -190,6 +203,7 @@ class LinePlot(SubPlot):
     mode: str
         The type of line to display in the plot.
     """
+    __slots__ = ()
     plot_type: str = "line"
     mode: str = "lines"
 
@@ -211,6 +225,7 @@ class ScatterLinePlot(SubPlot):
     """
     A subclass of SubPlot used to create scatter and line plots.
     """
+    __slots__ = ()
     plot_type: str = 'scatter'
     mode: str = 'lines+markers'
     def __init__(self, df: pd.DataFrame, x_name: str, y_name: str) -> None:
@@ -228,8 +243,29 @@ class ScatterLinePlot(SubPlot):
         SubPlot.__init__(self, df, x_name, y_name)
 
 
+COLUMNAR_TABLE_JS = """
+function(columnar) {
+    if (!columnar) {
+        return window.dash_clientside.no_update;
+    }
+    var names = columnar.columns, values = columnar.values;
+    var n = values.length ? values[0].length : 0;
+    var records = new Array(n);
+    for (var i = 0; i < n; i++) {
+        var record = {};
+        for (var j = 0; j < names.length; j++) {
+            record[names[j]] = values[j][i];
+        }
+        records[i] = record;
+    }
+    return records;
+}
+"""
+
+
 class DataTable(FigureData):
-    def __init__(self, id: str, df: pd.DataFrame, columns: List[str] = []) -> None:
+    def __init__(self, id: str, df: pd.DataFrame, columns: List[str] = [], transfer_mode: str = 'records',
+                 virtualization: bool = False, height: str = '600px') -> None:
         """
         Initializes a DataTable instance with the given ID, DataFrame, and list of columns.
         This class can be used to display a table in a Dash app.
@@ -238,11 +274,20 @@ class DataTable(FigureData):
             id (str): The ID of the table.
             df (pd.DataFrame): The DataFrame to be used to populate the table.
             columns (List[str], optional): A list of columns to be displayed in the table. Defaults to [] which will display all columns.
+            transfer_mode (str, optional): 'records' sends the rows as a list of dicts. 'columnar' sends one list per column in a
+                `dcc.Store` and builds the rows in the browser with the callback registered by `register_columnar_callback`,
+                so column names are not repeated per row and no per row dicts are built on the server. Defaults to 'records'.
+            virtualization (bool, optional): If True, only the visible rows are rendered and the header row is fixed,
+                for smooth scrolling through long tables. Defaults to False.
+            height (str, optional): The height of the scrolling area of a virtualized table. Defaults to '600px'.
 
         Returns:
             None
         """
         self.id = id
+        self.transfer_mode = transfer_mode
+        self.virtualization = virtualization
+        self.height = height
         self.table = self.construct_table(df, columns)
 
         
@@ -269,8 +314,39 @@ class DataTable(FigureData):
         """
         return self.table
 
+    @staticmethod
+    def columnar_store_id(id: str) -> str:
+        """Returns the id of the `Store` holding the columns of a table in the 'columnar' transfer mode."""
+        return f'{id}-columnar'
+
+    @staticmethod
+    def columnar_data(df: pd.DataFrame) -> Dict[str, List[Any]]:
+        """
+        Converts a DataFrame to its columnar wire format, one vectorized `tolist` per column.
+
+        Args:
+            df (pd.DataFrame): The input data.
+
+        Returns:
+            Dict[str, List[Any]]: The column names and one list of values per column.
+        """
+        return {'columns': [str(i) for i in df.columns],
+                'values': [df[i].tolist() for i in df.columns]}
+
+    @staticmethod
+    def register_columnar_callback(app: Dash, id: str) -> None:
+        """
+        Registers the clientside callback that builds the rows of a 'columnar' table in the browser.
+
+        Args:
+            app (Dash): The Dash app.
+            id (str): The ID of the table.
+        """
+        app.clientside_callback(COLUMNAR_TABLE_JS,
+                                Output(id, 'data'),
+                                Input(DataTable.columnar_store_id(id), 'data'))
 
-    def construct_table(self, df: pd.DataFrame, cols: List[str]) -> dash_table.DataTable:
+    def construct_table(self, df: pd.DataFrame, cols: List[str]) -> Union[dash_table.DataTable, html.Div]:
         """
         Constructs a Dash DataTable from a Pandas DataFrame.
 
@@ -279,14 +355,30 @@ class DataTable(FigureData):
             cols (List[str]): The list of columns to include.
 
         Returns:
-            dash_table.DataTable: The constructed DataTable object.
+            Union[dash_table.DataTable, html.Div]: The constructed DataTable object, in a Div with its `Store`
+            in the 'columnar' transfer mode.
         """
         df = self.filter_df(df, cols)
-        return dash_table.DataTable(
-            id=self.id,
-            columns=[{"name": i, "id": i} for i in df.columns],
-            data=df.to_dict('records')
-        )
+        options: Dict[str, Any] = {}
+        if self.virtualization:
+            options = {'virtualization': True,
+                       'fixed_rows': {'headers': True},
+                       'page_action': 'none',
+                       'style_table': {'height': self.height, 'overflowY': 'auto'}}
+        columns = [{"name": i, "id": i} for i in df.columns]
+        if self.transfer_mode == 'records':
+            return dash_table.DataTable(
+                id=self.id,
+                columns=columns,
+                data=df.to_dict('records'),
+                **options
+            )
+        if self.transfer_mode == 'columnar':
+            return html.Div([
+                dcc.Store(id=self.columnar_store_id(self.id), data=self.columnar_data(df)),
+                dash_table.DataTable(id=self.id, columns=columns, data=[], **options)
+            ])
+        raise ValueError(f"Unknown transfer_mode: {self.transfer_mode}")
 
 
 class Graph:
@@ -338,6 +430,8 @@ class Graph:
         self.init_data(data)
         self.init_axis_titles(x_title, y_title)
         self.plot_graph()
+        # The figure holds the arrays of the subplots, so the subplots are released once it is built.
+        self.data = None
         
     def init_axis_titles(self, x_title: str = None, y_title: str = None) -> None:
         """
@@ -2,18 +2,146 @@
 This module contains the classes for creating the tabs for the dashboard.
 """
 
-from dash import Dash, html, dcc, callback, Output, Input
+from dash import Dash, html, dcc, callback, Output, Input, State
+from dash.exceptions import PreventUpdate
 import pandas as pd
+import numpy as np
 import dash_plots as dp
+import sql_source as sql
+import data_cache as dc
+import cross_filter as cf
+import shared_store as ss
+import ingestion as ig
+import time_index as ti
+import rollups as rp
+import streaming as st
+import transforms as tf
+import option_index as oi
 import os
+import time
 from pathlib import Path
 import plotly.express as px
-from typing import Any, Type, Dict, List, Union,Optional
+from typing import Any, Callable, Type, Dict, List, Union,Optional,Hashable
 from abc import ABC,abstractclassmethod,abstractmethod
 
-cache = {}
+cache = dc.DataCache()
+
+
+def tab_key(tab: Union["BaseTab", Type["BaseTab"]]) -> str:
+    """
+    Returns the key identifying a tab class in the shared `cache` and the other process wide stores. Tabs
+    configured from yaml are keyed by the `spec_digest` of their spec, every other tab by the module and qualified
+    name of its class. Tabs of different dashboards with the same label therefore never share an entry, even when
+    one process serves both dashboards.
+    """
+    tab_cls = tab if isinstance(tab, type) else type(tab)
+    spec_digest = getattr(tab_cls, 'spec_digest', None)
+    if spec_digest is not None:
+        return f'yaml:{spec_digest}'
+    return f'{tab_cls.__module__}.{tab_cls.__qualname__}'
+
+
+def data_key(tab: Union["BaseTab", Type["BaseTab"]]) -> str:
+    """
+    Returns the key the data of a tab is cached under. Tabs naming a `source` are keyed by the csv file, the
+    columns read from it and the csv engine, so tabs reading a file the same way share one entry, even across
+    dashboards. Every other tab is cached under its `tab_key`.
+    """
+    if tab.source is None:
+        return tab_key(tab)
+    usecols = getattr(tab, 'usecols', None)
+    columns = '*' if usecols is None else ','.join(sorted(usecols))
+    return f'source:{os.path.abspath(tab.csv_path)}[{columns}]:{getattr(tab, "csv_engine", "c")}'
+
+
+def bare_instance(tab: Union["BaseTab", Type["BaseTab"]]) -> "BaseTab":
+    """
+    Returns an instance of a tab class created without `__init__`, so its loader and data version methods can be
+    called from the static callback methods without rendering the tab. Instances are returned as they are.
+    """
+    return tab.__new__(tab) if isinstance(tab, type) else tab
+
+
+def load_tab_data(tab: Union["BaseTab", Type["BaseTab"]]) -> Any:
+    """
+    Fetch the data of a tab from the shared `cache`, loading it if it is missing or stale.
+    With `data_backend = 'mmap'` the data is materialized once into the memory mapped store
+    under `mmap_dir` and every worker process maps the same files. The store outlives the process and only
+    materializes a source again when its version changes, so the 'mmap' backend requires a `data_version`.
+
+    Args:
+        tab (Union[BaseTab, Type[BaseTab]]): A tab instance, or a tab class as passed to the static callback methods.
+
+    Returns:
+        Any: The data of the tab.
+
+    Raises:
+        ValueError: If the data backend is unknown, or is 'mmap' and the data version of the tab is unknown.
+    """
+    tab = bare_instance(tab)
+    loader, version = tab.data_loader, tab.data_version()
+    if tab.data_backend == 'mmap':
+        if version is None:
+            raise ValueError(f"{tab.label}: data_backend='mmap' requires a data_version, otherwise the memory mapped "
+                             f"copy is never refreshed. Override data_version or use data_backend='memory'.")
+        source_loader = loader
+        loader = lambda: ss.get_store(tab.mmap_dir).load(data_key(tab), source_loader, version)
+    elif tab.data_backend != 'memory':
+        raise ValueError(f"Unknown data_backend: {tab.data_backend}")
+    return cache.get(data_key(tab), loader, version)
+
+
+def tab_version(tab_cls: Type["BaseTab"]) -> Hashable:
+    """
+    Returns the data version of a tab class without rendering the tab.
+
+    Args:
+        tab_cls (Type[BaseTab]): The tab class.
+
+    Returns:
+        Hashable: The version stamp of the data of the tab, or None if it is unknown.
+    """
+    return bare_instance(tab_cls).data_version()
+
+
+def invalidate_unversioned(tab_cls: Type["BaseTab"]) -> None:
+    """
+    Drop the cached data of a tab, and of the tabs in its `tab_list`, whose data version is unknown,
+    so the next render reloads it.
+
+    Args:
+        tab_cls (Type[BaseTab]): The tab class.
+    """
+    if isinstance(getattr(tab_cls, 'tab_list', None), list):
+        for tab in tab_cls.tab_list:
+            invalidate_unversioned(tab)
+    if tab_version(tab_cls) is None:
+        cache.invalidate_related(tab_key(tab_cls))
+        cache.invalidate_related(data_key(tab_cls))
+
+
+def json_column(column: pd.Series) -> List[Any]:
+    """
+    Returns the values of a column as a list of json values. Datetimes become ISO strings, which plotly.js
+    parses as dates, instead of the integer nanoseconds of their numpy representation. Missing datetimes are None.
+    """
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return [None if pd.isna(i) else i.isoformat() for i in column]
+    return column.tolist()
+
 
 class BaseTab(object):
+    """
+    Attributes:
+        data_backend (str): Where the data of the tab is held. 'memory' keeps a DataFrame per worker process,
+            'mmap' shares one memory mapped copy between the worker processes, and requires a `data_version`.
+        mmap_dir (Union[str, Path]): The directory of the memory mapped store used by the 'mmap' backend.
+        source (str): The name of a csv data source shared with other tabs. Tabs with a source reading the same
+            `csv_path` and `usecols` with the same `csv_engine` are loaded once and share the cached data, so they must load it the same way.
+    """
+    data_backend: str = 'memory'
+    mmap_dir: Union[str, Path] = ss.DEFAULT_MMAP_DIR
+    source: Optional[str] = None
     
     @property
     def sync_type(self) -> str:
@@ -42,6 +170,19 @@ class BaseTab(object):
         """Generates the div for the tab. This method is intended to be implemented by subclasses."""
         pass
 
+    def data_version(self) -> Hashable:
+        """
+        Returns the version stamp of the data source. The data held in the shared `cache` is reloaded
+        whenever the version changes. Defaults to None, meaning the version is unknown: the data is then
+        only reloaded when the dashboard refreshes the tab on its resync interval.
+        """
+        return None
+
+    @classmethod
+    def register_callbacks(cls, app: Dash) -> None:
+        """Registers the callbacks used by the tab with the Dash app. Tabs without callbacks do nothing."""
+        pass
+
 
 class SingleTAB(BaseTab):
     """Represents a generic single tab for the dashboard.
@@ -98,6 +239,7 @@ class SingleTAB(BaseTab):
         """Loads the data for the tab. This method is intended to be implemented by subclasses.
         """
         pass
+
        
     @abstractmethod 
     def init_tab(self):
@@ -123,7 +265,8 @@ class SingleTAB(BaseTab):
     def data(self) -> Any:
         """
         Getter method for the `data` property of the DashboardTab. If the `cached_data` attribute is None, 
-        the `data_loader()` method is called to load the data, and the result is saved in `cached_data`. 
+        the data is fetched from the shared `cache`, which calls the `data_loader()` method if the data is missing
+        or its `data_version()` has changed, and the result is saved in `cached_data`.
         The cached data is returned.
 
         Returns:
@@ -132,12 +275,51 @@ class SingleTAB(BaseTab):
             The cached data for the DashboardTab.
         """
         if self.cached_data is None:
-            self.cached_data=self.data_loader()
+            self.cached_data=load_tab_data(self)
         return self.cached_data
  
  
 class DashboardTab(SingleTAB):
+    """Represents a tab with a graph drawn from a csv file.
+
+    Attributes:
+        ingest_mode (str): How the csv file is loaded. 'full' reads the whole file. The streaming modes read it in chunks
+            of `chunk_size` rows, so peak memory follows the chunk size and not the file size:
+            'aggregate' keeps the `aggregate_function` of every y column per x value, 'reservoir' keeps a uniform sample of
+            `max_points` rows and 'minmax' keeps the rows holding the minimum and maximum of every y column per bucket of rows.
+        chunk_size (int): The number of rows read at a time in the streaming modes.
+        max_points (int): The maximum number of rows kept by the 'reservoir' and 'minmax' modes.
+        aggregate_function (str): The aggregate of the 'aggregate' mode: 'sum', 'mean', 'min', 'max' or 'count'.
+        ingest_stats (Dict[str, Any]): The rows, chunks, seconds and rows per second of the last streaming load.
+        time_column (str): The datetime column of a time series tab. When set, the tab gets a date range control and
+            the graph is redrawn on the server for just the selected window, found by binary search in a sorted index
+            that is built once per data version.
+        rollup_target_points (int): When set on a time series tab, the graph is drawn from a pyramid of minute, hour, day
+            and week rollups, using the coarsest level with at least this many points in the selected window. The pyramid
+            is built when the data loads and extended incrementally when a reload only appends rows. Every graph column
+            must plot against the `time_column`.
+        rollup_statistic (str): The statistic of each rollup bucket that is plotted: 'min', 'max', 'mean' or 'last'.
+        usecols (List[str]): The columns read from the csv file in the 'full' ingest mode. Defaults to every column.
+        csv_engine (str): The parser of the csv file in the 'full' ingest mode: 'c', 'python' or 'pyarrow'.
+            'pyarrow' is multi-threaded and returns Arrow-backed dtypes. It falls back to 'c' when pyarrow is not
+            installed. See `ingestion.read_csv_options`. The streaming modes always use the 'c' parser.
+
+    A graph column may plot a transform of its y column, e.g. {'x': 'date', 'y': 'price', 'transform': {'type': 'rolling',
+    'window': 20}}. See `transforms.parse_transform` for the transforms. The derived columns are computed once per data
+    version and extended with only the appended rows when a reload appends rows.
+    """
     graph=None
+    ingest_mode: str = 'full'
+    chunk_size: int = 100000
+    max_points: int = 5000
+    aggregate_function: str = 'sum'
+    ingest_stats: Optional[Dict[str, Any]] = None
+    time_column: Optional[str] = None
+    rollup_target_points: Optional[int] = None
+    rollup_statistic: str = 'mean'
+    usecols: Optional[List[str]] = None
+    csv_engine: str = 'c'
+
     def __init__(self):
         super().__init__()
     
@@ -158,7 +340,56 @@ class DashboardTab(SingleTAB):
         Returns:
             pd.DataFrame: A pandas DataFrame with data from the specified CSV file.
         """
-        return pd.read_csv(self.csv_path)
+        if self.ingest_mode != 'full':
+            return self.stream_loader()
+        return pd.read_csv(self.csv_path, usecols=self.usecols, **ig.read_csv_options(self.csv_engine))
+
+    def stream_aggregator(self) -> ig.Aggregator:
+        """
+        Build the running aggregate of the `ingest_mode` over the `graph_columns` of the tab.
+
+        Returns:
+            ig.Aggregator: The aggregator the csv chunks are folded into.
+        """
+        graph_columns = [self.graph_columns] if isinstance(self.graph_columns, dict) else self.graph_columns
+        x_columns = {column['x'] for column in graph_columns}
+        y_columns = [column['y'] for column in graph_columns]
+        if self.ingest_mode == 'reservoir':
+            return ig.ReservoirSample(self.max_points, [column['x'] for column in graph_columns] + y_columns)
+        if len(x_columns) != 1:
+            raise ValueError(f"ingest_mode '{self.ingest_mode}' requires every graph column to share the same x column.")
+        if self.ingest_mode == 'aggregate':
+            return ig.GroupAggregate(x_columns.pop(), y_columns, self.aggregate_function)
+        if self.ingest_mode == 'minmax':
+            return ig.MinMaxDownsample(x_columns.pop(), y_columns, self.max_points)
+        raise ValueError(f"Unknown ingest_mode: {self.ingest_mode}")
+
+    def stream_loader(self) -> pd.DataFrame:
+        """
+        Stream the CSV file in chunks through the aggregator of the `ingest_mode`, reading only the graph columns.
+        The ingestion rate is reported after every chunk and the final statistics are kept in `ingest_stats`.
+
+        Returns:
+            pd.DataFrame: The aggregated or downsampled data.
+        """
+        aggregator = self.stream_aggregator()
+        result = ig.ingest_csv(self.csv_path, aggregator,
+                               chunk_size=self.chunk_size,
+                               usecols=aggregator.usecols,
+                               label=self.label)
+        self.ingest_stats = {key: value for key, value in result.items() if key != 'data'}
+        return result['data']
+
+    def data_version(self) -> Hashable:
+        """
+        Returns the modification time and size of the csv file so the cached data is reloaded when the file changes.
+        Tabs that override `data_loader` without a csv file never go stale.
+        """
+        try:
+            csv_path = self.csv_path
+        except ValueError:
+            return None
+        return dc.file_version(csv_path)
 
     def data_loader(self) -> pd.DataFrame:
         """
@@ -179,16 +410,173 @@ class DashboardTab(SingleTAB):
         graph_data=[]
         if isinstance(self.graph_columns,dict):
             self.graph_columns=[self.graph_columns]
+        data = self.plot_data(type(self)) if self.time_column is None else self.window_data(type(self), None, None)
         for column in self.graph_columns:
-            graph_data.append(self.plot_function(self.data,column['x'],column['y']))
+            graph_data.append(self.plot_function(data,column['x'],tf.output_column(column)))
         self.graph=dp.Graph(id=self.label,data=graph_data,top_margin=self.top_margin).plot
   
     def init_tab(self):
         self.init_graph()
         self.generate_tab()
+
+    def generate_tab(self) -> html.Div:
+        """
+        Generate the tab for the DashboardTab object, with a date range control above the graph of time series tabs.
+
+        Returns:
+            html.Div: The generated tab with the label and graph.
+        """
+        if self.time_column is None:
+            return super().generate_tab()
+        self.tab = html.Div([
+            html.H3(self.label), self.date_range, self.graph
+        ], style=self.style)
+        return self.tab
+
+    @staticmethod
+    def plot_data(cls: Type["DashboardTab"]) -> pd.DataFrame:
+        """
+        Returns the data plotted by the tab. Without transforms in `graph_columns` this is the data of the tab.
+        With transforms it holds the x, y and time columns and the derived columns, built once per data version
+        and extended when a reload only appends rows.
+        """
+        df = load_tab_data(cls)
+        transforms = tf.graph_transforms(cls.graph_columns)
+        if not transforms:
+            return df
+        graph_columns = [cls.graph_columns] if isinstance(cls.graph_columns, dict) else cls.graph_columns
+        columns = [i['x'] for i in graph_columns] + [i['y'] for i in graph_columns]
+        if cls.time_column is not None:
+            columns.insert(0, cls.time_column)
+        columns = list(dict.fromkeys(columns))
+        return cache.get((tab_key(cls), 'transforms'),
+                         lambda: tf.DerivedColumns.refresh(cache.peek((tab_key(cls), 'transforms')), df, columns, transforms),
+                         tab_version(cls)).frame
+
+    @staticmethod
+    def date_range_id(cls: Type["DashboardTab"]) -> str:
+        """Returns the id of the date range control of a time series tab."""
+        return f'{cls.value}-date-range'
+
+    @staticmethod
+    def time_index(cls: Type["DashboardTab"]) -> ti.SortedTimeIndex:
+        """Returns the sorted index of the `time_column`, built once per data version."""
+        return cache.get((tab_key(cls), 'time_index'),
+                         lambda: ti.SortedTimeIndex(load_tab_data(cls), cls.time_column),
+                         tab_version(cls))
+
+    @staticmethod
+    def rollup_pyramid(cls: Type["DashboardTab"]) -> rp.RollupPyramid:
+        """
+        Returns the rollups of the y columns of a time series tab, built once per data version. When the data
+        is reloaded the previous rollups are extended with the appended rows instead of being rebuilt.
+
+        Raises:
+            ValueError: If a graph column plots against another x than the `time_column`, since the buckets are
+                indexed by time only.
+        """
+        graph_columns = [cls.graph_columns] if isinstance(cls.graph_columns, dict) else cls.graph_columns
+        for column in graph_columns:
+            if column['x'] != cls.time_column:
+                raise ValueError(f"rollup_target_points requires every graph column of {cls.label} to plot against "
+                                 f"the time_column {cls.time_column!r}, not {column['x']!r}")
+
+        def build() -> rp.RollupPyramid:
+            index = cls.time_index(cls)
+            df = cls.plot_data(cls)
+            values = {}
+            for column in dict.fromkeys(tf.output_column(i) for i in graph_columns):
+                values[column] = df[column].to_numpy() if index.order is None else df[column].to_numpy()[index.order]
+            return rp.RollupPyramid.refresh(cache.peek((tab_key(cls), 'rollups')), index.times, values)
+        return cache.get((tab_key(cls), 'rollups'), build, tab_version(cls))
+
+    @staticmethod
+    def window_data(cls: Type["DashboardTab"], start: Any, end: Any) -> pd.DataFrame:
+        """
+        Returns the data of a time series tab within a date range: the buckets of the coarsest rollup level that
+        meets `rollup_target_points`, or the raw rows when rollups are off or every level is too coarse.
+
+        Parameters:
+        -----------
+        cls: Type[DashboardTab]
+            The DashboardTab class.
+        start: Any
+            The first time of the range, or None for the earliest time.
+        end: Any
+            The last time of the range, or None for the latest time.
+
+        Returns:
+        --------
+        pd.DataFrame
+            The data to plot.
+        """
+        if cls.rollup_target_points is not None:
+            pyramid = cls.rollup_pyramid(cls)
+            level, bounds = pyramid.select(start, end, cls.rollup_target_points)
+            if level is not None:
+                return pyramid.levels[level].frame(bounds, cls.time_column, cls.rollup_statistic)
+        return cls.time_index(cls).window(cls.plot_data(cls), start, end)
+
+    @property
+    def date_range(self) -> dcc.DatePickerRange:
+        """Return a date range control spanning the `time_column`."""
+        index = self.time_index(type(self))
+        return dcc.DatePickerRange(id=self.date_range_id(type(self)),
+                                   min_date_allowed=index.start,
+                                   max_date_allowed=index.end,
+                                   start_date=index.start,
+                                   end_date=index.end)
+
+    @staticmethod
+    def window_figure(cls: Type["DashboardTab"], start: Optional[str], end: Optional[str]) -> dict:
+        """
+        Draw the graph of a time series tab for the rows within a date range.
+
+        Parameters:
+        -----------
+        cls: Type[DashboardTab]
+            The DashboardTab class.
+        start: str, optional
+            The first date of the range, inclusive.
+        end: str, optional
+            The last date of the range, inclusive. A date without a time includes the whole day.
+
+        Returns:
+        --------
+        dict
+            The figure of the graph.
+        """
+        if end is not None and len(str(end)) <= 10:
+            end = pd.Timestamp(end) + pd.Timedelta(days=1) - pd.Timedelta(1)
+        dff = cls.window_data(cls, start, end)
+        graph_columns = [cls.graph_columns] if isinstance(cls.graph_columns, dict) else cls.graph_columns
+        graph_data = [cls.plot_function(dff, column['x'], tf.output_column(column)) for column in graph_columns]
+        return dp.Graph(id=cls.label, data=graph_data, top_margin=cls.top_margin).plot.figure
+
+    @classmethod
+    def register_callbacks(cls, app: Dash) -> None:
+        """Registers the callback that redraws the graph of a time series tab when the date range changes."""
+        if cls.time_column is None:
+            return
+
+        @app.callback(Output(cls.label, 'figure'),
+                      [Input(cls.date_range_id(cls), 'start_date'),
+                       Input(cls.date_range_id(cls), 'end_date')],
+                      prevent_initial_call=True)
+        def update_window(start: Optional[str], end: Optional[str]) -> dict:
+            return cls.window_figure(cls, start, end)
   
 
 class TableTab(DashboardTab):
+    """Represents a tab with a data table.
+
+    Attributes:
+        table_transfer_mode (str): 'records' sends the rows as a list of dicts, 'columnar' sends one list per column and
+            builds the rows in the browser. See `dp.DataTable`.
+        table_virtualization (bool): If True, only the visible rows are rendered and the header row is fixed.
+    """
+    table_transfer_mode: str = 'records'
+    table_virtualization: bool = False
     
     @property
     def graph_columns(self)->None:
@@ -204,15 +592,72 @@ class TableTab(DashboardTab):
     def init_graph(self) -> None:
         self.graph= dp.DataTable(self.value,
                             self.data,
-                            columns=self.table_columns
+                            columns=self.table_columns,
+                            transfer_mode=self.table_transfer_mode,
+                            virtualization=self.table_virtualization
                             ).table
+
+    @classmethod
+    def register_callbacks(cls, app: Dash) -> None:
+        """Registers the clientside callback that builds the table rows in the 'columnar' transfer mode."""
+        if cls.table_transfer_mode == 'columnar':
+            dp.DataTable.register_columnar_callback(app, cls.value)
   
 
+FILTER_MODES = ('server', 'client', 'auto')
+OPTIONS_MODES = ('full', 'search', 'auto')
+
+CLIENT_FILTER_JS = """
+function(value, data) {
+    if (!data) {
+        return window.dash_clientside.no_update;
+    }
+    if (data.figure) {
+        return data.value === value ? data.figure : window.dash_clientside.no_update;
+    }
+    var i = data.options.indexOf(value);
+    var x = [], y = [];
+    if (i >= 0) {
+        x = data.x.slice(data.offsets[i], data.offsets[i + 1]);
+        y = data.y.slice(data.offsets[i], data.offsets[i + 1]);
+    }
+    return {
+        data: [{type: 'scatter', mode: 'lines', x: x, y: y}],
+        layout: {xaxis: {title: {text: data.x_name}}, yaxis: {title: {text: data.y_name}}}
+    };
+}
+"""
+
+
 class DropDownTab(DashboardTab):
+    """Represents a tab with a dropdown that filters the data shown in a line graph.
+
+    Attributes:
+        graph_id (str): The id of the graph.
+        dropdown_id (str): The id of the dropdown.
+        start_value (Union[str, int]): The value selected when the tab is first shown.
+        options_column (str): The column whose unique values are the dropdown options.
+        filter_mode (str): Where the dropdown filtering runs. 'server' filters in the `update_graph` callback, which the
+            dashboard registers. 'client' ships the projected columns to the browser once and filters them in a clientside
+            callback. 'auto' uses the client mode for data up to `client_max_rows` rows and the server above it, decided
+            again on every call so a data version crossing the limit switches modes. In the 'client' and 'auto' modes
+            the tab registers its own callbacks.
+        client_max_rows (int): The maximum number of rows shipped to the browser in the 'auto' mode.
+        options_mode (str): How the dropdown gets its options. 'full' embeds every option in the layout. 'search' embeds
+            none: the options matching the typed prefix are served by the `search_options` callback from a prefix index
+            built once per data version. 'auto' embeds up to `max_embedded_options` options and searches above it.
+        max_embedded_options (int): The maximum number of options embedded in the layout in the 'auto' mode.
+        search_limit (int): The maximum number of options returned by a search.
+    """
     graph_id: Optional[str] = None
     dropdown_id: Optional[str] = None
     start_value: Optional[Union[str, int]] = None
     options_column: Optional[str] = None
+    filter_mode: str = 'server'
+    client_max_rows: int = 50000
+    options_mode: str = 'full'
+    max_embedded_options: int = 1000
+    search_limit: int = 50
     
     def __init__(self):
         super().__init__()
@@ -230,10 +675,74 @@ class DropDownTab(DashboardTab):
 
     @property
     def dropdown(self) -> dcc.Dropdown:
-        """Return a dropdown component with the options and start value defined in the class."""
-        return dcc.Dropdown(self.options, 
+        """
+        Return a dropdown component with the options and start value defined in the class. When the options are
+        searched, only the start value is embedded.
+        """
+        if self.searches_options(type(self)):
+            options = [] if self.start_value is None else [{'label': str(self.start_value), 'value': self.start_value}]
+        else:
+            options = self.options
+        return dcc.Dropdown(options,
                             self.start_value, 
                             id=self.dropdown_id)
+
+    @staticmethod
+    def option_index(cls: Type["DropDownTab"]) -> oi.PrefixIndex:
+        """
+        Returns the prefix index of the dropdown options, built once per data version. The index is cached under the
+        data of the tab and the options column, so dropdowns over the same source and column share it.
+        """
+        return cache.get((data_key(cls), cls.options_column, 'option_index'),
+                         lambda: oi.PrefixIndex(bare_instance(cls).options),
+                         tab_version(cls))
+
+    @staticmethod
+    def searches_options(cls: Type["DropDownTab"]) -> bool:
+        """
+        Returns True if the options are searched on the server instead of embedded, based on `options_mode` and
+        `max_embedded_options`.
+        """
+        if cls.options_mode == 'full':
+            return False
+        if cls.options_mode == 'search':
+            return True
+        if cls.options_mode == 'auto':
+            return len(cls.option_index(cls)) > cls.max_embedded_options
+        raise ValueError(f"Unknown options_mode: {cls.options_mode}")
+
+    @staticmethod
+    def search_options(cls: Type["DropDownTab"], search_value: Optional[str],
+                       value: Optional[Union[str, int]]) -> List[Dict[str, Any]]:
+        """
+        Returns the first `search_limit` options starting with the typed text, and the selected option so it
+        stays displayed.
+
+        Parameters:
+        -----------
+        cls: Type[DropDownTab]
+            The DropDownTab class.
+        search_value: str, optional
+            The text typed in the dropdown.
+        value: str or int, optional
+            The selected value.
+
+        Returns:
+        --------
+        list
+            The options of the dropdown.
+
+        Raises:
+        -------
+        PreventUpdate
+            If nothing is typed or the options are embedded, so the current options are kept.
+        """
+        if not search_value or not cls.searches_options(cls):
+            raise PreventUpdate
+        options = cls.option_index(cls).search(search_value, cls.search_limit)
+        if value is not None and all(i['value'] != value for i in options):
+            options.append({'label': str(value), 'value': value})
+        return options
     
 
     def init_tab(self) -> None:
@@ -243,13 +752,12 @@ class DropDownTab(DashboardTab):
         Returns:
             None
         """
-        self.data_loader()
         self.init_global_vars()
         self.generate_tab()
 
     def init_global_vars(self)->None:
-        global cache
-        cache[self.label] = self.data
+        """Loads the data into the shared `cache` so `update_graph` can read it."""
+        self.data
         
 
     def generate_tab(self) -> html.Div:
@@ -261,14 +769,127 @@ class DropDownTab(DashboardTab):
         tab : dash_html_components.Div
             The layout of the `DropDownTab` instance.
         """
-        self.tab = html.Div([
+        children = [
             html.H3(self.label),
             self.dropdown,
             dcc.Graph(id=self.graph_id),
             html.Div(id=self.value)
-        ])
+        ]
+        if self.filter_mode != 'server':
+            data = self.client_data(type(self)) if self.filters_on_client(type(self)) else None
+            children.append(dcc.Store(id=self.client_store_id(type(self)), data=data))
+        self.tab = html.Div(children)
         return self.tab
-        
+
+    @staticmethod
+    def client_store_id(cls: Type["DropDownTab"]) -> str:
+        """
+        Returns the id of the `Store` holding the data filtered in the browser, or in the 'auto' mode above
+        `client_max_rows` the figure built on the server for the selected value.
+        """
+        return f'{cls.value}-client-data'
+
+    @staticmethod
+    def filters_on_client(cls: Type["DropDownTab"]) -> bool:
+        """
+        Returns True if the dropdown is filtered in the browser, based on `filter_mode` and `client_max_rows`.
+        """
+        if cls.filter_mode == 'server':
+            return False
+        if cls.filter_mode == 'client':
+            return True
+        if cls.filter_mode == 'auto':
+            return len(load_tab_data(cls)) <= cls.client_max_rows
+        raise ValueError(f"Unknown filter_mode: {cls.filter_mode}")
+
+    @staticmethod
+    def client_data(cls: Type["DropDownTab"]) -> Dict[str, Any]:
+        """
+        Builds the columnar data shipped to the browser for client side filtering.
+        Rows are grouped by option, so the rows of option `i` are `x[offsets[i]:offsets[i + 1]]`
+        and the option column itself is never sent per row.
+
+        Parameters:
+        -----------
+        cls: Type[DropDownTab]
+            The DropDownTab class.
+
+        Returns:
+        --------
+        dict
+            The options, their offsets, the x and y columns and their names.
+        """
+        df = load_tab_data(cls)
+        x_name, y_name = cls.graph_columns['x'], cls.graph_columns['y']
+        codes, options = pd.factorize(df[cls.options_column])
+        order = np.argsort(codes, kind='stable')
+        order = order[codes[order] >= 0]
+        counts = np.bincount(codes[codes >= 0], minlength=len(options))
+        return {
+            'options': options.tolist(),
+            'offsets': [0] + np.cumsum(counts).tolist(),
+            'x': json_column(df[x_name].iloc[order]),
+            'y': json_column(df[y_name].iloc[order]),
+            'x_name': x_name,
+            'y_name': y_name,
+        }
+
+    @classmethod
+    def register_callbacks(cls, app: Dash) -> None:
+        """
+        Registers the dropdown callbacks for the 'client' and 'auto' filter modes, and the `search_options` callback
+        unless `options_mode` is 'full'. In the 'server' filter mode the dashboard registers a callback calling
+        `update_graph`.
+
+        In the 'auto' mode both paths are registered and `filters_on_client` picks one on every call: the clientside
+        callback draws the figure from the `Store`, which holds either the columns or the figure that
+        `server_figure` built for the selected value.
+        """
+        if cls.options_mode != 'full':
+            @app.callback(Output(cls.dropdown_id, 'options'),
+                          Input(cls.dropdown_id, 'search_value'),
+                          State(cls.dropdown_id, 'value'))
+            def search_options(search_value: Optional[str], value: Optional[Union[str, int]]) -> List[Dict[str, Any]]:
+                return cls.search_options(cls, search_value, value)
+        if cls.filter_mode == 'server':
+            return
+        app.clientside_callback(CLIENT_FILTER_JS,
+                                Output(cls.graph_id, 'figure'),
+                                Input(cls.dropdown_id, 'value'),
+                                Input(cls.client_store_id(cls), 'data'))
+        if cls.filter_mode == 'auto':
+            @app.callback(Output(cls.client_store_id(cls), 'data'),
+                          Input(cls.dropdown_id, 'value'))
+            def server_figure(value: Union[str, int]) -> Dict[str, Any]:
+                return cls.server_figure(cls, value)
+
+    @staticmethod
+    def server_figure(cls: Type["DropDownTab"], value: Union[str, int]) -> Dict[str, Any]:
+        """
+        Builds the figure of the selected value on the server in the 'auto' filter mode, for the clientside callback
+        to draw.
+
+        Parameters:
+        -----------
+        cls: Type[DropDownTab]
+            The DropDownTab class.
+        value: str or int
+            The selected value from the dropdown.
+
+        Returns:
+        --------
+        dict
+            The selected value and its figure from `update_graph`.
+
+        Raises:
+        -------
+        PreventUpdate
+            If the data is filtered in the browser, which already holds the columns.
+        """
+        if cls.filters_on_client(cls):
+            raise PreventUpdate
+        return {'value': value, 'figure': cls.update_graph(cls, value)}
+
     @staticmethod
     def update_graph(cls: Type["DropDownTab"], value: Union[str, int]) -> px.line:
         """
@@ -288,26 +909,215 @@ class DropDownTab(DashboardTab):
         """
         # Create a function that updates the graph based on the dropdown value
         options_column = cls.options_column
-        df=cache[cls.label]
+        df=load_tab_data(cls)
         dff = df[df[options_column]==value]
         return px.line(dff, x=cls.graph_columns['x'], y=cls.graph_columns['y'])
 
 
+class SQLTab(DashboardTab):
+    """Represents a tab whose data is loaded from a SQL database instead of a csv file.
+
+    Attributes:
+        database (str): The database to query, e.g. the path to a SQLite file.
+        query (str): The query that selects the data for the tab.
+        query_ttl_seconds (float): How long query results are served from the query cache.
+        pool_size (int): The maximum number of pooled connections to the database.
+    """
+    database: Optional[str] = None
+    query: Optional[str] = None
+    query_ttl_seconds: float = 300
+    pool_size: int = 5
+
+    def __init__(self):
+        super().__init__()
+
+    @property
+    def sql_columns(self) -> List[str]:
+        """The columns to select from the query, taken from `graph_columns`."""
+        graph_columns = self.graph_columns
+        if isinstance(graph_columns, dict):
+            graph_columns = [graph_columns]
+        return [name for column in graph_columns for name in (column['x'], column['y'])]
+
+    def sql_loader(self) -> pd.DataFrame:
+        """
+        Load the projected columns of the tab query through the shared connection pool.
+
+        Returns:
+            pd.DataFrame: A pandas DataFrame with the query results.
+        """
+        if self.database is None or self.query is None:
+            raise ValueError("database and query must be defined in subclass to use SQLTab data_loader method.")
+        return sql.read_sql(self.database, self.query,
+                            columns=self.sql_columns,
+                            ttl_seconds=self.query_ttl_seconds,
+                            max_connections=self.pool_size)
+
+    def data_loader(self) -> pd.DataFrame:
+        return self.sql_loader()
+
+    def data_version(self) -> Hashable:
+        """Returns the current time to live window so the cached data expires with the query cache."""
+        return int(time.time() // self.query_ttl_seconds)
+
+
+class SQLDropDownTab(DropDownTab):
+    """Represents a dropdown tab backed by a SQL database.
+    The dropdown value is pushed into the WHERE clause of the query so only the selected rows are loaded.
+
+    Attributes:
+        database (str): The database to query, e.g. the path to a SQLite file.
+        query (str): The query that selects the data for the tab.
+        query_ttl_seconds (float): How long query results are served from the query cache.
+        pool_size (int): The maximum number of pooled connections to the database.
+    """
+    database: Optional[str] = None
+    query: Optional[str] = None
+    query_ttl_seconds: float = 300
+    pool_size: int = 5
+
+    def __init__(self):
+        super().__init__()
+
+    @property
+    def options(self) -> pd.Series:
+        """Return the distinct options for the dropdown, selected in the database."""
+        return sql.read_sql(self.database, self.query,
+                            columns=[self.options_column],
+                            distinct=True,
+                            ttl_seconds=self.query_ttl_seconds,
+                            max_connections=self.pool_size)[self.options_column]
+
+    def init_tab(self) -> None:
+        """
+        Initializes the tab. No data is loaded up front since every dropdown value is queried on demand.
+
+        Returns:
+            None
+        """
+        self.generate_tab()
+
+    @staticmethod
+    def update_graph(cls: Type["SQLDropDownTab"], value: Union[str, int]) -> px.line:
+        """
+        Update the graph based on the selected dropdown value, filtering in the database.
+
+        Parameters:
+        -----------
+        cls: Type[SQLDropDownTab]
+            The SQLDropDownTab class.
+        value: str or int
+            The selected value from the dropdown.
+
+        Returns:
+        --------
+        fig: px.line
+            The updated graph with the data filtered by the selected value.
+        """
+        dff = sql.read_sql(cls.database, cls.query,
+                           columns=[cls.graph_columns['x'], cls.graph_columns['y']],
+                           filters={cls.options_column: value},
+                           ttl_seconds=cls.query_ttl_seconds,
+                           max_connections=cls.pool_size)
+        return px.line(dff, x=cls.graph_columns['x'], y=cls.graph_columns['y'])
+
+
+class StreamingTab(DashboardTab):
+    """Represents a tab with a live graph of the latest rows of a stream.
+
+    The rows are appended by `stream_source` in a background thread to a ring buffer of `buffer_size` rows,
+    preallocated per column, and the graph is redrawn from the latest `window_points` rows every `refresh_ms`
+    milliseconds, only when new rows arrived. Sources bound to a socket can only be opened by one worker process.
+
+    Attributes:
+        stream_columns (Dict[str, str]): The name and dtype of every column, in the order of the values in a line.
+        stream_source (Callable[[], st.StreamSource]): Creates the source, e.g. `lambda: st.FileTailSource(path)`.
+        buffer_size (int): The number of rows kept.
+        window_points (int): The number of latest rows plotted.
+        refresh_ms (int): The refresh interval of the graph in milliseconds.
+    """
+    stream_columns: Dict[str, str] = {}
+    stream_source: Optional[Callable[[], st.StreamSource]] = None
+    buffer_size: int = 100000
+    window_points: int = 2000
+    refresh_ms: int = 500
+
+    def __init__(self):
+        super().__init__()
+
+    @staticmethod
+    def stream_buffer(cls: Type["StreamingTab"]) -> st.RingBuffer:
+        """Returns the ring buffer of the tab, starting its source on first use."""
+        if cls.stream_source is None:
+            raise ValueError("stream_source must be defined in subclass to use StreamingTab.")
+        return st.get_stream(tab_key(cls), cls.stream_columns, cls.buffer_size, cls.stream_source)
+
+    @staticmethod
+    def stream_interval_id(cls: Type["StreamingTab"]) -> str:
+        """Returns the id of the `Interval` component refreshing the graph."""
+        return f'{cls.value}-stream-interval'
+
+    @staticmethod
+    def stream_store_id(cls: Type["StreamingTab"]) -> str:
+        """Returns the id of the `Store` holding the number of rows plotted by the browser."""
+        return f'{cls.value}-stream-rows'
+
+    @staticmethod
+    def stream_graph(cls: Type["StreamingTab"]) -> dp.Graph:
+        """Draw the latest `window_points` rows of the stream."""
+        dff = cls.stream_buffer(cls).window(cls.window_points)
+        graph_columns = [cls.graph_columns] if isinstance(cls.graph_columns, dict) else cls.graph_columns
+        graph_data = [cls.plot_function(dff, column['x'], column['y']) for column in graph_columns]
+        return dp.Graph(id=cls.label, data=graph_data, top_margin=cls.top_margin)
+
+    def init_graph(self) -> None:
+        self.graph = self.stream_graph(type(self)).plot
+
+    def generate_tab(self) -> html.Div:
+        """
+        Generate the tab with the graph, the `Interval` component refreshing it and the `Store` of the rows plotted.
+
+        Returns:
+            html.Div: The generated tab.
+        """
+        cls = type(self)
+        self.tab = html.Div([
+            html.H3(self.label), self.graph,
+            dcc.Interval(id=self.stream_interval_id(cls), interval=self.refresh_ms),
+            dcc.Store(id=self.stream_store_id(cls), data=self.stream_buffer(cls).total)
+        ], style=self.style)
+        return self.tab
+
+    @classmethod
+    def register_callbacks(cls, app: Dash) -> None:
+        """Registers the callback that redraws the graph when new rows arrived since it was last drawn."""
+        @app.callback([Output(cls.label, 'figure'), Output(cls.stream_store_id(cls), 'data')],
+                      Input(cls.stream_interval_id(cls), 'n_intervals'),
+                      State(cls.stream_store_id(cls), 'data'),
+                      prevent_initial_call=True)
+        def update_stream(n_intervals: int, rows: Optional[int]) -> list:
+            total = cls.stream_buffer(cls).total
+            if total == rows:
+                raise PreventUpdate
+            return [cls.stream_graph(cls).plot.figure, total]
+
+
 class MultiTab(BaseTab):
     flex_style: Dict[str, str] = {'display': 'flex', 'flex-direction': 'row','width': '100%'}
     tab: Optional[html.Div] = None
 
-    def __init__(self, tab_list: List[DashboardTab]):
+    def __init__(self, tab_list: Optional[List[DashboardTab]] = None):
         """
         Initializes a new instance of the `MultiTab` class.
 
         Parameters
         ----------
-        tab_list : list
+        tab_list : list, optional
             A list of tab labels (subclasses of DashboardTab) that will be used to create the tabs.
+            Defaults to the `tab_list` of the class.
         """
         #super().__init__()
-        self.generate_tab(tab_list)
+        self.generate_tab(self.tab_list if tab_list is None else tab_list)
 
     @property
     @abstractclassmethod
@@ -315,6 +1125,17 @@ class MultiTab(BaseTab):
         """Defines the list of tabs to create. This method is intended to be implemented by subclasses."""
         pass
 
+    def data_version(self) -> Hashable:
+        """Returns the data versions of the tabs in `tab_list`, or None if any of them is unknown."""
+        versions = tuple(tab_version(tab) for tab in self.tab_list)
+        return None if any(i is None for i in versions) else versions
+
+    @classmethod
+    def register_callbacks(cls, app: Dash) -> None:
+        """Registers the callbacks of every tab in `tab_list`."""
+        for tab in cls.tab_list:
+            tab.register_callbacks(app)
+
     def flex_row(self, data: List[Union[dcc.Graph, html.Div]]) -> html.Div:
         """
         Given a list of dcc.Graph or html.Div instances, this function creates a flex row
@@ -357,6 +1178,179 @@ class MultiTab(BaseTab):
         children=[self.flex_row(i) for i in chunks]
         self.tab = html.Div(className='row', children=children)
         return self.tab
-    
 
 
+class CrossFilterMultiTab(MultiTab):
+    """Represents a multi tab whose graphs share one DataFrame and filter each other.
+    Selecting values in a filter dropdown filters every graph. Clicking or box selecting points on a graph
+    whose x column is a filter column filters the other graphs. Filtering uses categorical indexes
+    precomputed once per data version, so an interaction costs roughly the number of selected rows.
+
+    Attributes:
+        csv_path (str): The csv file holding the shared data.
+        filter_columns (List[str]): The categorical columns that can be filtered on.
+        tab_list (List[DashboardTab]): The tabs defining the `graph_columns` and `plot_function` of each linked graph.
+            The tabs are not instantiated, their graphs are drawn from the shared data.
+    """
+    filter_columns: List[str] = []
+
+    def __init__(self):
+        super().__init__(self.tab_list)
+
+    @property
+    def csv_path(cls) -> str:
+        """Defines the csv path to load the shared data. This method is intended to be implemented by subclasses."""
+        raise ValueError("csv_path must be defined in subclass to use default CrossFilterMultiTab data_loader method.")
+
+    def data_loader(self) -> pd.DataFrame:
+        """
+        Load the shared data from the CSV file.
+
+        Returns:
+            pd.DataFrame: A pandas DataFrame with data from the specified CSV file.
+        """
+        return pd.read_csv(self.csv_path)
+
+    def data_version(self) -> Hashable:
+        """Returns the modification time and size of the csv file."""
+        return dc.file_version(self.csv_path)
+
+    @staticmethod
+    def shared_data(cls: Type["CrossFilterMultiTab"]) -> pd.DataFrame:
+        """Returns the shared data from the data cache."""
+        return load_tab_data(cls)
+
+    @staticmethod
+    def filter_index(cls: Type["CrossFilterMultiTab"]) -> cf.CrossFilterIndex:
+        """Returns the indexes of the filter columns, built once per data version."""
+        return cache.get((tab_key(cls), 'cross_filter'),
+                         lambda: cf.CrossFilterIndex(cls.shared_data(cls), cls.filter_columns),
+                         cls.data_version(cls))
+
+    @staticmethod
+    def filter_id(cls: Type["CrossFilterMultiTab"], column: str) -> str:
+        """Returns the id of the dropdown filtering `column`."""
+        return f'{cls.value}-{column}-filter'
+
+    @staticmethod
+    def graph_id(cls: Type["CrossFilterMultiTab"], position: int) -> str:
+        """Returns the id of the graph drawn for the tab at `position` in `tab_list`."""
+        return f'{cls.value}-graph-{position}'
+
+    @staticmethod
+    def tab_graph_columns(tab: Type[DashboardTab]) -> List[Dict[str, str]]:
+        """Returns the `graph_columns` of a linked tab as a list."""
+        return [tab.graph_columns] if isinstance(tab.graph_columns, dict) else tab.graph_columns
+
+    @staticmethod
+    def linked_figure(cls: Type["CrossFilterMultiTab"], position: int, rows: Optional[np.ndarray]) -> dict:
+        """
+        Draws the figure of a linked tab from the selected rows of the shared data.
+
+        Parameters:
+        -----------
+        cls: Type[CrossFilterMultiTab]
+            The CrossFilterMultiTab class.
+        position: int
+            The position of the linked tab in `tab_list`.
+        rows: np.ndarray, optional
+            The selected row positions, or None for every row.
+
+        Returns:
+        --------
+        dict
+            The figure of the graph.
+        """
+        tab = cls.tab_list[position]
+        graph_columns = cls.tab_graph_columns(tab)
+        dff = cf.take_columns(cls.shared_data(cls),
+                              [name for column in graph_columns for name in (column['x'], column['y'])],
+                              rows)
+        graph_data = [tab.plot_function(dff, column['x'], column['y']) for column in graph_columns]
+        return dp.Graph(id=cls.graph_id(cls, position), data=graph_data,
+                        title=tab.label, top_margin=tab.top_margin).plot.figure
+
+    @staticmethod
+    def update_graphs(cls: Type["CrossFilterMultiTab"], filter_values: List[Any],
+                      selections: List[Optional[dict]]) -> List[dict]:
+        """
+        Redraw every linked graph from the current dropdown values and graph selections.
+        A graph is filtered by the dropdowns and by the selections made on the other graphs.
+
+        Parameters:
+        -----------
+        cls: Type[CrossFilterMultiTab]
+            The CrossFilterMultiTab class.
+        filter_values: List[Any]
+            The value of each filter dropdown, in the order of `filter_columns`.
+        selections: List[dict, optional]
+            The selected or clicked points of each graph, in the order of `tab_list`.
+
+        Returns:
+        --------
+        List[dict]
+            The figure of every linked graph.
+        """
+        index = cls.filter_index(cls)
+        dropdown_selections = [(column, [value] if isinstance(value, (str, int, float)) else value)
+                               for column, value in zip(cls.filter_columns, filter_values)]
+        graph_selections = []
+        for tab, selection in zip(cls.tab_list, selections):
+            x_column = cls.tab_graph_columns(tab)[0]['x']
+            graph_selections.append((x_column, cf.selected_points(selection)))
+        rows_by_selection: Dict[tuple, Any] = {}
+        figures = []
+        for position in range(len(cls.tab_list)):
+            active = dropdown_selections + [selection for i, selection in enumerate(graph_selections)
+                                            if i != position and selection[1]]
+            key = tuple((column, tuple(values)) for column, values in active if values)
+            if key not in rows_by_selection:
+                rows_by_selection[key] = index.select(active)
+            figures.append(cls.linked_figure(cls, position, rows_by_selection[key]))
+        return figures
+
+    @classmethod
+    def register_callbacks(cls, app: Dash) -> None:
+        """Registers the callback that redraws the linked graphs when a dropdown or graph selection changes."""
+        graph_ids = [cls.graph_id(cls, i) for i in range(len(cls.tab_list))]
+        n_filters = len(cls.filter_columns)
+
+        @app.callback([Output(i, 'figure') for i in graph_ids],
+                      [Input(cls.filter_id(cls, column), 'value') for column in cls.filter_columns] +
+                      [Input(i, 'selectedData') for i in graph_ids] +
+                      [Input(i, 'clickData') for i in graph_ids])
+        def cross_filter(*values: Any) -> List[dict]:
+            filter_values = list(values[:n_filters])
+            selected = values[n_filters:n_filters + len(graph_ids)]
+            clicked = values[n_filters + len(graph_ids):]
+            selections = [s if s else c for s, c in zip(selected, clicked)]
+            return cls.update_graphs(cls, filter_values, selections)
+
+    def generate_tab(self, tab_list: List[DashboardTab]) -> html.Div:
+        """
+        Generates the layout of the `CrossFilterMultiTab` instance as a `html.Div`, with a row of filter dropdowns
+        above the linked graphs.
+
+        Parameters:
+        -----------
+        tab_list : List[DashboardTab]
+            The tabs defining the linked graphs.
+
+        Returns:
+        --------
+        tab : dash_html_components.Div
+            The layout of the `CrossFilterMultiTab` instance.
+        """
+        cls = type(self)
+        index = cls.filter_index(cls)
+        dropdowns = [html.Div([html.Label(column),
+                               dcc.Dropdown(list(index.indexes[column].categories), None,
+                                            id=cls.filter_id(cls, column), multi=True)],
+                              style={'flex': 1})
+                     for column in self.filter_columns]
+        data = [dcc.Graph(id=cls.graph_id(cls, i), figure=cls.linked_figure(cls, i, None))
+                for i in range(len(tab_list))]
+        chunks = [data[i:i+2] for i in range(0, len(data), 2)]
+        children = [html.Div(dropdowns, style=self.flex_style)] + [self.flex_row(i) for i in chunks]
+        self.tab = html.Div(className='row', children=children)
+        return self.tab
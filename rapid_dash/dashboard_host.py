@@ -0,0 +1,192 @@
+""" A module for serving many dashboards from one process, each mounted under its own URL prefix. """
+
+import html
+import time
+import threading
+from pathlib import Path
+from werkzeug.serving import run_simple
+from werkzeug.utils import redirect
+from werkzeug.wrappers import Response
+from dash import _callback
+import dashboards as db
+import custom_dashboards as cd
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type, Union
+
+PROCESS_SETTINGS = ('data_cache_max_entries', 'data_cache_max_bytes', 'json_engine')
+
+INDEX_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Dashboards</title>
+</head>
+<body>
+<h1>Dashboards</h1>
+<ul>
+{items}
+</ul>
+</body>
+</html>
+"""
+
+
+class DashboardHost:
+    """
+    A WSGI application serving many dashboards from one process. Every dashboard is mounted under a URL prefix
+    and keeps its own Dash app, built on the first request under its prefix. The dashboards share the data cache
+    of the process, so a csv file read by several dashboards through a yaml `source` is loaded once.
+
+    Tabs without a source, and the indexes and derived columns of every tab, are cached under the `dt.tab_key`
+    of their class, so tabs of different dashboards never share an entry because they share a label.
+
+    The data cache limits and the json engine (`PROCESS_SETTINGS`) apply to the whole process, so the hosted
+    dashboards that set them must agree: a dashboard setting a different value than one mounted or built before
+    it is refused. Callbacks must be registered on the app of their dashboard, in `register_callbacks`. Callbacks
+    registered with the global `dash.callback` are taken by the first app that handles a request, so a
+    dashboard cannot be built while any are pending.
+
+    Attributes:
+        factories (Dict[str, Callable[[], Type[db.Dashboard]]]): Returns the class of the dashboard mounted under
+            every prefix.
+        names (Dict[str, str]): The name of the dashboard mounted under every prefix, shown on the index page.
+        dashboards (Dict[str, db.Dashboard]): The dashboards built so far, keyed by prefix.
+        apps (Dict[str, Any]): The WSGI application of every dashboard built so far, keyed by prefix.
+    """
+
+    def __init__(self) -> None:
+        self.factories: Dict[str, Callable[[], Type[db.Dashboard]]] = {}
+        self.names: Dict[str, str] = {}
+        self.process_settings: Dict[str, Tuple[Any, str]] = {}
+        self.dashboards: Dict[str, db.Dashboard] = {}
+        self.apps: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def normalize_prefix(prefix: str) -> str:
+        """Returns a URL prefix with a leading and a trailing slash, e.g. '/sales/'."""
+        prefix = '/' + prefix.strip('/') + '/'
+        if prefix == '//':
+            raise ValueError("A dashboard cannot be mounted at the root, which serves the index page.")
+        return prefix
+
+    def mount(self, prefix: str, dashboard: Union[Type[db.Dashboard], str, Path]) -> None:
+        """
+        Mount a dashboard under a URL prefix. The dashboard is not built until the first request under the prefix.
+
+        Args:
+            prefix (str): The URL prefix, e.g. '/sales'.
+            dashboard (Union[Type[db.Dashboard], str, Path]): A `Dashboard` subclass, or the path to the yaml
+                config of an `AutoDash` dashboard.
+        """
+        prefix = self.normalize_prefix(prefix)
+        if prefix in self.factories:
+            raise ValueError(f"A dashboard is already mounted under {prefix}")
+        if isinstance(dashboard, type):
+            self.claim_process_settings(prefix, dashboard)
+            self.factories[prefix] = lambda: dashboard
+            self.names[prefix] = dashboard.__name__
+        else:
+            path = str(dashboard)
+            self.factories[prefix] = lambda: db.AutoDash.yaml_class(path)
+            self.names[prefix] = path
+
+    def claim_process_settings(self, prefix: str, dashboard: Type[db.Dashboard]) -> None:
+        """
+        Record the process wide settings of a dashboard, raising a ValueError if they differ from those of a
+        dashboard mounted before it. Settings left to None are not claimed.
+        """
+        for name in PROCESS_SETTINGS:
+            value = getattr(dashboard, name)
+            if value is None:
+                continue
+            claimed, owner = self.process_settings.setdefault(name, (value, prefix))
+            if claimed != value:
+                raise ValueError(f"{prefix} sets {name}={value!r} but {owner} sets {name}={claimed!r}. "
+                                 f"{name} applies to the whole process, so the hosted dashboards must agree on it.")
+
+    def get_app(self, prefix: str) -> Any:
+        """
+        Returns the WSGI application of the dashboard mounted under `prefix`, building the dashboard on first use.
+        Concurrent first requests wait for a single build.
+        """
+        app = self.apps.get(prefix)
+        if app is not None:
+            return app
+        with self.lock:
+            if prefix not in self.apps:
+                if _callback.GLOBAL_CALLBACK_LIST:
+                    raise ValueError("Callbacks registered with dash.callback cannot be hosted, since they are taken by "
+                                     "the first app that handles a request. Register them in register_callbacks.")
+                start = time.perf_counter()
+                dashboard_cls = self.factories[prefix]()
+                self.claim_process_settings(prefix, dashboard_cls)
+                dashboard = dashboard_cls()
+                self.apps[prefix] = dashboard.create_app(url_prefix=prefix).server
+                self.dashboards[prefix] = dashboard
+                print(f'{prefix}: {self.names[prefix]} built in {time.perf_counter() - start:.2f}s')
+            return self.apps[prefix]
+
+    def match(self, path: str) -> Optional[str]:
+        """Returns the longest mounted prefix of a request path, or None."""
+        prefixes = [i for i in self.factories if (path + '/').startswith(i)]
+        return max(prefixes, key=len) if prefixes else None
+
+    def index(self) -> Response:
+        """Returns the index page linking to every mounted dashboard."""
+        items = '\n'.join(f'<li><a href="{html.escape(prefix)}">{html.escape(prefix)}</a> '
+                          f'{html.escape(self.names[prefix])}{"" if prefix in self.apps else " (not loaded)"}</li>'
+                          for prefix in sorted(self.factories))
+        return Response(INDEX_HTML.format(items=items), mimetype='text/html')
+
+    def __call__(self, environ: Dict[str, Any], start_response: Callable) -> Iterable[bytes]:
+        path = environ.get('PATH_INFO', '') or '/'
+        prefix = self.match(path)
+        if prefix is None:
+            response = self.index() if path == '/' else Response('Not Found', status=404)
+            return response(environ, start_response)
+        if path + '/' == prefix:
+            return redirect(environ.get('SCRIPT_NAME', '') + prefix, code=301)(environ, start_response)
+        app = self.get_app(prefix)
+        environ['SCRIPT_NAME'] = environ.get('SCRIPT_NAME', '') + prefix.rstrip('/')
+        environ['PATH_INFO'] = path[len(prefix) - 1:]
+        return app(environ, start_response)
+
+    def run(self, debug: bool = False, port: int = 8080) -> None:
+        """
+        Serve the mounted dashboards.
+
+        Args:
+            debug (bool): If True, enable the interactive debugger.
+            port (int): The port number to run the server on.
+        """
+        run_simple('127.0.0.1', port, self, threaded=True, use_debugger=debug)
+
+
+def resolve_dashboard(target: str) -> Union[Type[db.Dashboard], str]:
+    """Returns the dashboard class named `target` in `custom_dashboards`, or `target` as the path to a yaml config."""
+    obj = getattr(cd, target, None)
+    if isinstance(obj, type) and issubclass(obj, db.Dashboard):
+        return obj
+    if not Path(target).is_file():
+        raise ValueError(f"{target} is neither a dashboard in custom_dashboards nor a yaml file")
+    return target
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Serve many dashboards from one process')
+    parser.add_argument('--mount',
+                        help='A dashboard to serve, as PREFIX=DASHBOARD where DASHBOARD is the name of a dashboard '
+                             'in custom_dashboards or the path to a yaml config, e.g. /sales=ExampleDashboard',
+                        action='append',
+                        required=True)
+    parser.add_argument('--port',
+                        help='The port number to run the server on',
+                        type=int,
+                        default=8080)
+    args = parser.parse_args()
+    host = DashboardHost()
+    for mount in args.mount:
+        prefix, _, target = mount.partition('=')
+        host.mount(prefix, resolve_dashboard(target))
+    host.run(port=args.port)
@@ -1,18 +1,35 @@
 """ This module contains the base classes for creating dashboards."""
-from dash import Dash, html, dcc, callback, Output, Input, State
+import dash
+from dash import Dash, html, dcc, callback, Output, Input, State, ctx
 from dash.dependencies import Input, Output
+from dash.exceptions import PreventUpdate
 import plotly.graph_objs as go
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
 import pandas as pd
 import custom_tabs as ct
 import dash_tabs as dt
 import dash_plots as dp
+import compression
+import ingestion as ig
+import payload_cache as pc
 import datetime
-from typing import Any, Type, Dict, List, Union
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Type, Dict, List, Union, Optional, Tuple
 from abc import ABC,abstractclassmethod
 import yaml
 import re
 import copy
+from collections import OrderedDict
+import data_cache as dc
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
+# The Dash releases whose private callback registry (`Dash._callback_list`, `Dash._inline_scripts`) is edited by
+# `AutoDash.replace_callbacks`.
+CALLBACK_REGISTRY_DASH_VERSIONS = ('2.9',)
 
 class Dashboard:
     """
@@ -38,18 +55,69 @@ class Dashboard:
         The ID of the `Store` component that stores the content of dynamic tabs.
     init_store_data : dict
         The initial data for the `Store` component.
+    store_max_tabs : int or None
+        The maximum number of rendered tabs kept in the `Store` component. The least recently used tabs are evicted first.
+    store_max_bytes : int or None
+        The maximum serialized size, in bytes, of the rendered tabs kept in the `Store` component.
+    data_cache_max_entries : int or None
+        The maximum number of tab data sets kept in the shared data cache.
+    data_cache_max_bytes : int or None
+        The maximum size, in bytes, of the tab data kept in the shared data cache.
+        The data cache limits apply to the whole process, see `dashboard_host.DashboardHost`.
+    json_engine : str or None
+        The plotly JSON engine used to serialize the layout and callback responses: 'json', 'orjson' or 'auto'.
+        'orjson' encodes NumPy arrays and datetimes natively and is several times faster on large figures.
+        None leaves plotly's default, which is 'auto' and picks orjson when it is installed.
+        The engine is a process wide setting.
+    compress_responses : bool
+        If True, compress the layout and callback responses with brotli or gzip and answer conditional
+        GET requests for unchanged content with 304 Not Modified.
+    compression_min_size : int
+        Responses smaller than this number of bytes are sent uncompressed.
+    compression_level : int
+        The brotli or gzip compression level.
+    memory_budget_bytes : int or None
+        The memory budget of the tab data, indexes and rendered tabs held by the worker, in bytes. When a render
+        takes the total over the budget, the least recently used rendered copies are dropped first, then the least
+        recently used tab data is evicted from the shared data cache and reloaded on demand. See `memory_report`.
+    payload_cache_dir : str or None
+        The directory of the persistent payload cache. Rendered tabs with a known data version are stored there
+        under a hash of their spec and data version, so a restarted server or another worker serves them without
+        rendering them again. None disables the cache. The directory can be shared by every worker.
+    payload_cache_max_bytes : int or None
+        The maximum size, in bytes, of the payloads kept in `payload_cache_dir`. The least recently used payloads
+        are removed first.
     """
     resync_interval_minutes: int = 15
     n_intervals: int = 0
     interval_id: str = 'interval-component'
     store_id: str = 'tab-data'
     init_store_data: dict = {'n_intervals': 0}
+    store_max_tabs: Optional[int] = None
+    store_max_bytes: Optional[int] = None
+    data_cache_max_entries: Optional[int] = None
+    data_cache_max_bytes: Optional[int] = None
+    json_engine: Optional[str] = None
+    compress_responses: bool = False
+    compression_min_size: int = 1024
+    compression_level: int = 6
+    memory_budget_bytes: Optional[int] = None
+    payload_cache_dir: Optional[str] = None
+    payload_cache_max_bytes: Optional[int] = 512 * 1024 * 1024
     
     
     def __init__(self) -> None:
         """
         Initialize the `Dashboard` class. Sets up the `Store` component, the update interval, and the layout of the dashboard.
         """
+        self.rendered_tabs: "OrderedDict[str, Tuple[str, Any, int, int]]" = OrderedDict()
+        self.store_metrics: Dict[str, int] = {'requests': 0, 'evictions': 0, 'store_tabs': 0,
+                                              'store_bytes': 0, 'max_store_bytes': 0}
+        self.render_locks: Dict[str, threading.Lock] = {}
+        self.render_metrics_lock = threading.Lock()
+        self.render_metrics: Dict[str, int] = {'renders': 0, 'reused': 0, 'coalesced': 0, 'restored': 0}
+        self.init_data_cache()
+        self.init_payload_cache()
         self.init_store()
         self.set_update_interval()
         self.init_layout()
@@ -85,6 +153,22 @@ class Dashboard:
 
 
 
+    def init_data_cache(self) -> None:
+        """
+        Apply the eviction limits of the dashboard to the data cache shared by the tabs.
+        """
+        if self.data_cache_max_entries is not None or self.data_cache_max_bytes is not None:
+            dt.cache.configure(max_entries=self.data_cache_max_entries,
+                               max_bytes=self.data_cache_max_bytes)
+
+    def init_payload_cache(self) -> None:
+        """
+        Open the persistent payload cache in `payload_cache_dir`, if any.
+        """
+        self.payload_cache = None
+        if self.payload_cache_dir is not None:
+            self.payload_cache = pc.PayloadCache(self.payload_cache_dir, self.payload_cache_max_bytes)
+
     def init_store(self) -> None:
         """
         Initialize the Dash store component with an ID and initial data.
@@ -206,9 +290,243 @@ class Dashboard:
                 return cls
         raise ValueError(f"Tab not found: {tab}")
 
-    def update_store(self, tab: str, store: Dict[str, Union[int, str]], interval: int) -> Dict[str, Union[int, str]]:
+    def resync_window(self) -> int:
+        """
+        Returns the number of `resync_interval_minutes` periods elapsed on the server clock. It is the same for
+        every client, unlike the `n_intervals` of a client, which starts at 0 when the page is opened.
+        """
+        return int(time.time() // (self.resync_interval_minutes * 60))
+
+    def tab_etag(self, tab: str) -> str:
+        """
+        Returns a content hash identifying the rendered version of a tab. The hash follows the data version
+        of the tab, so an unchanged data source keeps the same ETag across intervals. Tabs whose data version
+        is unknown get a new ETag in every `resync_window`, so every client, including one that just opened the
+        page, is served a copy rendered in the current window. Tabs configured from a yaml file also hash their
+        `spec_digest`, so a reloaded config renders them again.
+
+        Args:
+            tab (str): The value of the tab.
+
+        Returns:
+            str: The ETag of the tab.
+        """
+        tab_cls = self.get_tab_cls(tab)
+        version = dt.tab_version(tab_cls)
+        key = (tab, version) if version is not None else (tab, None, self.resync_window())
+        if getattr(tab_cls, 'spec_digest', None) is not None:
+            key += (tab_cls.spec_digest,)
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def render_lock(self, tab: str) -> threading.Lock:
+        """Returns the lock that serializes the renders of `tab`."""
+        with self.render_metrics_lock:
+            if tab not in self.render_locks:
+                self.render_locks[tab] = threading.Lock()
+            return self.render_locks[tab]
+
+    def count_render(self, outcome: str) -> None:
+        """Increment the `render_metrics` counter of a render outcome: 'renders', 'reused' or 'coalesced'."""
+        with self.render_metrics_lock:
+            self.render_metrics[outcome] += 1
+
+    def render_tab(self, tab: str, etag: str) -> Tuple[Any, int]:
+        """
+        Render a tab, reusing the server side copy rendered for the same ETag.
+        This is how tabs evicted from the `Store` component are restored without rebuilding them.
+        Concurrent requests for a tab that is not rendered yet wait on a single render and share its result,
+        counted as 'coalesced' in `render_metrics`. With a `payload_cache_dir`, a tab rendered before at the same
+        data version, e.g. before a restart, is read from the payload cache instead, counted as 'restored'.
+
+        Args:
+            tab (str): The value of the tab to render.
+            etag (str): The ETag of the version to render, from `tab_etag`.
+
+        Returns:
+            Tuple[Any, int]: The tab content and its serialized size in bytes.
+
+        The rendered copy is kept as the decoded payload, the form restored payloads take, so it holds plain json
+        values and no component, figure or data of the tab instance. `rendered_tabs` also records its deep size in
+        memory for the memory budget.
+        """
+        rendered = self.rendered_tabs.get(tab)
+        if rendered is not None and rendered[0] == etag:
+            self.count_render('reused')
+            self.touch_rendered(tab)
+            return rendered[1], rendered[2]
+        with self.render_lock(tab):
+            rendered = self.rendered_tabs.get(tab)
+            if rendered is not None and rendered[0] == etag:
+                self.count_render('coalesced')
+                return rendered[1], rendered[2]
+            tab_cls = self.get_tab_cls(tab)
+            if rendered is not None:
+                dt.invalidate_unversioned(tab_cls)
+            version = dt.tab_version(tab_cls) if self.payload_cache is not None else None
+            key = pc.payload_key(tab_cls, version) if version is not None else None
+            payload = self.payload_cache.get(key) if key is not None else None
+            if payload is not None:
+                self.count_render('restored')
+            else:
+                payload = to_json_plotly(tab_cls().tab)
+                if key is not None:
+                    self.payload_cache.put(key, payload)
+                self.count_render('renders')
+            content = json.loads(payload)
+            size = len(payload)
+            with self.render_metrics_lock:
+                self.rendered_tabs[tab] = (etag, content, size, dc.data_size(content))
+                self.rendered_tabs.move_to_end(tab)
+        self.enforce_memory_budget(keep=tab)
+        return content, size
+
+    def touch_rendered(self, tab: str) -> None:
+        """Mark the rendered copy of a tab as the most recently used."""
+        with self.render_metrics_lock:
+            if tab in self.rendered_tabs:
+                self.rendered_tabs.move_to_end(tab)
+
+    @staticmethod
+    def flatten_tabs(tabs: List[Type["dt.BaseTab"]]) -> List[Type["dt.BaseTab"]]:
+        """Returns the tab classes in `tabs` and in the `tab_list` of the multi tabs among them."""
+        flat = []
+        for tab in tabs:
+            flat.append(tab)
+            if isinstance(getattr(tab, 'tab_list', None), list):
+                flat.extend(Dashboard.flatten_tabs(tab.tab_list))
+        return flat
+
+    def memory_report(self) -> List[Dict[str, Any]]:
         """
-        Update the contents of a tab in the store with a new version if the specified interval has passed.
+        Report the memory held for each tab of the dashboard by this worker.
+
+        Returns:
+        --------
+        List[Dict[str, Any]]
+            One row per tab with the deep size in bytes of its data in the shared data cache (`data_bytes`),
+            of the indexes and rollups built over it (`index_bytes`) and of its rendered copy (`rendered_bytes`),
+            and their total. The data of tabs sharing a source is reported under each of them, `data_keys` shows
+            the cache entries a tab reads. Data assigned to the `cached_data` attribute of a tab class is held
+            outside the data cache and is counted in `data_bytes` too.
+        """
+        sizes = dt.cache.sizes()
+        report = []
+        for tab in self.tabs:
+            tabs = self.flatten_tabs([tab])
+            data_keys = list(dict.fromkeys(dt.data_key(i) for i in tabs))
+            tab_keys = {dt.tab_key(i) for i in tabs}
+            rendered = self.rendered_tabs.get(tab.value)
+            row = {
+                'tab': tab.value,
+                'data_keys': data_keys,
+                'data_bytes': sum(sizes.get(key, 0) for key in data_keys)
+                              + sum(dc.data_size(i.cached_data) for i in tabs if getattr(i, 'cached_data', None) is not None),
+                'index_bytes': sum(size for key, size in sizes.items()
+                                   if isinstance(key, tuple) and key and (key[0] in tab_keys or key[0] in data_keys)),
+                'rendered_bytes': rendered[3] if rendered is not None else 0,
+            }
+            row['total_bytes'] = row['data_bytes'] + row['index_bytes'] + row['rendered_bytes']
+            report.append(row)
+        return report
+
+    def enforce_memory_budget(self, keep: Optional[str] = None) -> None:
+        """
+        Fit the data, indexes and rendered tabs in `memory_budget_bytes`. The least recently used rendered copies
+        are dropped first, since rebuilding one from cached data is cheaper than reloading the data, then the least
+        recently used tab data is evicted from the shared data cache. Both are rebuilt by the next render that
+        needs them.
+
+        Args:
+            keep (str, optional): The value of a tab whose rendered copy is kept, e.g. the tab just rendered.
+        """
+        if self.memory_budget_bytes is None:
+            return
+        data = dt.cache.total_bytes()
+        dropped = 0
+        with self.render_metrics_lock:
+            rendered = sum(i[3] for i in self.rendered_tabs.values())
+            for tab in list(self.rendered_tabs):
+                if data + rendered <= self.memory_budget_bytes:
+                    break
+                if tab != keep:
+                    rendered -= self.rendered_tabs.pop(tab)[3]
+                    dropped += 1
+        evicted = dt.cache.evict_to(max(self.memory_budget_bytes - rendered, 0))
+        if dropped or evicted:
+            print(f'Dropped {dropped} rendered tabs and evicted {evicted} data cache entries '
+                  f'to fit the memory budget of {self.memory_budget_bytes} bytes')
+
+    def tab_modified(self, tab: str, store: Dict[str, Any]) -> bool:
+        """
+        Check whether the copy of a tab held in the store is missing or out of date.
+
+        Args:
+            tab (str): The value of the tab.
+            store (dict): The current state of the store.
+
+        Returns:
+            bool: True if the tab has to be rendered and sent again.
+        """
+        if tab not in store:
+            return True
+        return store.get('etags', {}).get(tab) != self.tab_etag(tab)
+
+    def store_tabs(self, store: Dict[str, Any]) -> List[str]:
+        """
+        Returns the values of the tabs held in the store, least recently used first.
+
+        Args:
+            store (dict): The current state of the store.
+
+        Returns:
+            List[str]: The tab values.
+        """
+        return [tab for tab in store.get('lru', []) if tab in store]
+
+    def evict_store(self, store: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Evict the least recently used tabs from the store until it fits within `store_max_tabs` and `store_max_bytes`.
+        The most recently used tab is always kept.
+
+        Args:
+            store (dict): The current state of the store.
+
+        Returns:
+            dict: The store after eviction.
+        """
+        tabs = self.store_tabs(store)
+        sizes = store['sizes']
+        while len(tabs) > 1 and (
+                (self.store_max_tabs is not None and len(tabs) > self.store_max_tabs) or
+                (self.store_max_bytes is not None and sum(sizes.get(i, 0) for i in tabs) > self.store_max_bytes)):
+            evicted = tabs.pop(0)
+            store.pop(evicted, None)
+            sizes.pop(evicted, None)
+            store['etags'].pop(evicted, None)
+            self.store_metrics['evictions'] += 1
+            print(f'Evicted {evicted} from {self.store_id}')
+        store['lru'] = tabs
+        return store
+
+    def record_store_metrics(self, store: Dict[str, Any]) -> None:
+        """
+        Record the number of tabs and the serialized size of the store for the current request.
+
+        Args:
+            store (dict): The current state of the store.
+        """
+        tabs = self.store_tabs(store)
+        size = sum(store['sizes'].get(i, 0) for i in tabs)
+        self.store_metrics['requests'] += 1
+        self.store_metrics['store_tabs'] = len(tabs)
+        self.store_metrics['store_bytes'] = size
+        self.store_metrics['max_store_bytes'] = max(self.store_metrics['max_store_bytes'], size)
+
+    def update_store(self, tab: str, store: Dict[str, Any], interval: int) -> Dict[str, Any]:
+        """
+        Update the contents of a tab in the store with a new version if its ETag has changed, i.e. its data version
+        changed or, for tabs without a known data version, a new `resync_window` started.
+        The store keeps the tabs in least recently used order and is bounded by `store_max_tabs` and `store_max_bytes`.
 
         Args:
             tab (str): The name of the tab to update in the store.
@@ -219,39 +537,89 @@ class Dashboard:
             dict: The updated store after updating the specified tab.
 
         """
-        if tab not in store.keys():
-            tab_cls = self.get_tab_cls(tab)
-            store[tab] = tab_cls().tab
+        store.setdefault('lru', [])
+        store.setdefault('sizes', {})
+        store.setdefault('etags', {})
+        interval = max(interval, store['n_intervals'])
+        if self.tab_modified(tab, store):
+            etag = self.tab_etag(tab)
+            store[tab], store['sizes'][tab] = self.render_tab(tab, etag)
+            store['etags'][tab] = etag
         else:
             print(f'Data for {tab} retrieved from {self.store_id}')
+        store['n_intervals'] = interval
 
-        if interval > store['n_intervals']:
-            tab_cls = self.get_tab_cls(tab)
-            store[tab] = tab_cls().tab
-            store['n_intervals'] = interval
-
+        store['lru'] = [i for i in store['lru'] if i != tab] + [tab]
+        self.evict_store(store)
+        self.record_store_metrics(store)
         return store
 
-    def run(self, debug: bool = False, port: int = 8080) -> None:
+    def create_app(self, url_prefix: Optional[str] = None) -> Dash:
         """
-        Start the dashboard application.
+        Create the Dash application for the dashboard and register its callbacks.
 
         Parameters:
         -----------
-        debug : bool, optional
-            If True, enable debug mode, which will display error messages in the browser. Default is False.
-        port : int, optional
-            The port number to run the server on. Default is 8080.
+        url_prefix : str, optional
+            The URL prefix the application is mounted under by a WSGI dispatcher, e.g. '/sales/'. The
+            dispatcher strips the prefix from the routes, so only the requests of the browser use it.
 
         Returns:
         --------
-        None
+        Dash
+            The Dash application.
         """
+        self.init_json_engine()
+        prefixes = {} if url_prefix is None else {'routes_pathname_prefix': '/',
+                                                  'requests_pathname_prefix': url_prefix}
         app = Dash(__name__,
                 external_stylesheets=external_stylesheets,
-                suppress_callback_exceptions=True)
+                suppress_callback_exceptions=True,
+                **prefixes)
         
         app.layout = self.get_layout
+        if self.compress_responses:
+            compression.install_compression(app.server,
+                                            min_size=self.compression_min_size,
+                                            level=self.compression_level)
+        self.register_callbacks(app)
+        return app
+
+    def init_json_engine(self) -> None:
+        """
+        Select the plotly JSON engine Dash uses for the layout and callback responses.
+        The engine is a process wide plotly setting.
+
+        Raises:
+        -------
+        ValueError
+            If the engine is unknown, or is 'orjson' and orjson is not installed.
+        """
+        if self.json_engine is not None:
+            pio.json.config.default_engine = self.json_engine
+
+    def register_tab_callbacks(self, app: Dash) -> None:
+        """
+        Register the callbacks declared by the tabs of the dashboard.
+
+        Parameters:
+        -----------
+        app : Dash
+            The Dash application to register the callbacks with.
+        """
+        for tab in self.tabs:
+            tab.register_callbacks(app)
+
+    def register_callbacks(self, app: Dash) -> None:
+        """
+        Register the callbacks of the dashboard and its tabs.
+
+        Parameters:
+        -----------
+        app : Dash
+            The Dash application to register the callbacks with.
+        """
+        self.register_tab_callbacks(app)
 
         @app.callback(Output(self.interval_id, 'disabled'),
                     [Input(self.tabs_value, 'value')])
@@ -293,43 +661,312 @@ class Dashboard:
             --------
             tuple
                 A tuple containing the rendered content and the updated data for the `Store` component.
+
+            Raises:
+            -------
+            PreventUpdate
+                If the interval triggered the callback and the tab is unchanged, which Dash answers with
+                an empty 204 response instead of the full tab.
             """
+            if ctx.triggered_id == self.interval_id and not self.tab_modified(tab, store):
+                raise PreventUpdate
             store = self.update_store(tab, store, interval)
             return store[tab], store
 
+    def run(self, debug: bool = False, port: int = 8080) -> None:
+        """
+        Start the dashboard application.
+
+        Parameters:
+        -----------
+        debug : bool, optional
+            If True, enable debug mode, which will display error messages in the browser. Default is False.
+        port : int, optional
+            The port number to run the server on. Default is 8080.
+
+        Returns:
+        --------
+        None
+        """
+        app = self.create_app()
         app.run_server(debug=debug, port=port)
         
 
 class ConfigureMethods(ABC):
-    @staticmethod 
+    @staticmethod
+    def copy_tab_class(base):
+        return type(base.__name__, (base,), {})
+
+    @staticmethod
     def chart(tab):
-        cls=type('DashboardTab', dt.DashboardTab.__bases__, dict(dt.DashboardTab.__dict__))
+        if 'sql' in tab:
+            cls=ConfigureMethods.copy_tab_class(dt.SQLTab)
+            cls.database = tab['sql']['database']
+            cls.query = tab['sql']['query']
+            cls.query_ttl_seconds = tab['sql'].get('ttl_seconds', dt.SQLTab.query_ttl_seconds)
+            cls.pool_size = tab['sql'].get('pool_size', dt.SQLTab.pool_size)
+        else:
+            cls=ConfigureMethods.copy_tab_class(dt.DashboardTab)
         cls.graph_columns = tab['graph_columns']
         cls.plot_function=AutoDash.plot_map[tab['chart_type']]
         return cls
     
     @staticmethod
     def table(tab):
-        raise NotImplementedError("Dropdown tab is not ready yet for auto dashboard creation.")
+        cls=ConfigureMethods.copy_tab_class(dt.TableTab)
+        cls.table_columns = tab.get('columns', [])
+        cls.table_transfer_mode = tab.get('transfer_mode', dt.TableTab.table_transfer_mode)
+        cls.table_virtualization = tab.get('virtualization', dt.TableTab.table_virtualization)
+        return cls
 
     @staticmethod
     def dropdown(tab):
-        raise NotImplementedError("Dropdown tab is not ready yet for auto dashboard creation.")
+        cls=ConfigureMethods.copy_tab_class(dt.DropDownTab)
+        cls.options_column = tab['options_column']
+        cls.graph_columns = tab['graph_columns']
+        cls.start_value = tab.get('start_value')
+        cls.filter_mode = tab.get('filter_mode', dt.DropDownTab.filter_mode)
+        cls.options_mode = tab.get('options_mode', dt.DropDownTab.options_mode)
+        cls.search_limit = tab.get('search_limit', dt.DropDownTab.search_limit)
+        cls.max_embedded_options = tab.get('max_embedded_options', dt.DropDownTab.max_embedded_options)
+        return cls
     
     @staticmethod
     def multi(tab):
-        raise NotImplementedError("Dropdown tab is not ready yet for auto dashboard creation.")
+        # The nested tabs are configured by `AutoDash.configure_tab`, with the sources of the dashboard.
+        return ConfigureMethods.copy_tab_class(dt.MultiTab)
+
+    @staticmethod
+    def columns(tab):
+        """
+        Returns the columns a tab spec reads from its data, or None if it reads every column.
+        """
+        if tab['type'] == 'table':
+            return tab.get('columns') or None
+        graph_columns = tab.get('graph_columns', [])
+        if isinstance(graph_columns, dict):
+            graph_columns = [graph_columns]
+        columns = [name for column in graph_columns for name in (column['x'], column['y'])]
+        if tab['type'] == 'dropdown':
+            columns.insert(0, tab['options_column'])
+        return columns
+
+    @staticmethod
+    def flatten(tabs):
+        """Yields every tab spec, replacing the multi tabs by the tabs nested in them."""
+        for tab in tabs:
+            if tab['type'] == 'multi':
+                yield from ConfigureMethods.flatten(tab['tabs'])
+            else:
+                yield tab
+
+    @staticmethod
+    def source_columns(sources, tabs):
+        """
+        Merges the column projections of every tab spec reading each source, including the tabs nested in multi tabs.
+
+        Parameters:
+        -----------
+        sources : dict
+            The `sources` section of the yaml config, keyed by source name.
+        tabs : list
+            The tab specs of the yaml config.
+
+        Returns:
+        --------
+        dict
+            The columns to read from each source, or None for the sources some tab reads in full.
+        """
+        merged = {}
+        for tab in ConfigureMethods.flatten(tabs):
+            if 'source' not in tab:
+                continue
+            if tab['source'] not in sources:
+                raise ValueError(f"Unknown source '{tab['source']}' in tab '{tab['label']}'")
+            columns = ConfigureMethods.columns(tab)
+            previous = merged.get(tab['source'], [])
+            merged[tab['source']] = None if columns is None or previous is None else \
+                list(dict.fromkeys(previous + columns))
+        return merged
 
 class AutoDash(Dashboard):
+    """
+    A dashboard configured from a yaml file.
+
+    Attributes
+    ----------
+    sources : dict
+        The `sources` section of the yaml config. Each source names a csv file that is loaded once and shared by
+        every tab referencing it with `source: <name>`, and optionally the `csv_engine` parsing it. A tab can also
+        set its own `csv_engine`, see `dt.DashboardTab`.
+    source_usecols : dict
+        The columns read from each source, merged across the tabs reading it, or None to read every column.
+    yaml_file : str or None
+        The yaml file the dashboard was configured from.
+    watch_yaml : bool
+        If True, the app created by `create_app` polls `yaml_file` every `watch_interval_seconds` and reloads the
+        tabs when it changes. See `reload_yaml`. Requires a Dash release in `CALLBACK_REGISTRY_DASH_VERSIONS`.
+    watch_interval_seconds : float
+        The interval, in seconds, between two checks of `yaml_file`.
+
+    Every configured tab class holds the `spec_digest` of its yaml spec, with the sources it reads resolved.
+    """
     plot_map = {
         "bar": dp.BarPlot,
         "line": dp.LinePlot,
         "scatter": dp.ScatterPlot,
         "scatter+line": dp.ScatterLinePlot,
     }
+    sources: Dict[str, dict] = {}
+    source_usecols: Dict[str, Optional[List[str]]] = {}
+    yaml_file: Optional[str] = None
+    watch_yaml: bool = False
+    watch_interval_seconds: float = 1.0
 
     def __init__(self):
         super().__init__()
+        self.reload_lock = threading.Lock()
+
+    def create_app(self, url_prefix: Optional[str] = None) -> Dash:
+        """
+        Create the Dash application for the dashboard, watching its yaml file if `watch_yaml` is True.
+        """
+        if self.watch_yaml:
+            self.check_dash_version()
+        app = super().create_app(url_prefix)
+        if self.watch_yaml:
+            self.watch(app)
+        return app
+
+    @staticmethod
+    def check_dash_version() -> None:
+        """
+        Raise a ValueError unless the installed Dash release is one whose private callback registry
+        `replace_callbacks` was written against, see `CALLBACK_REGISTRY_DASH_VERSIONS`.
+        """
+        if not dash.__version__.startswith(tuple(i + '.' for i in CALLBACK_REGISTRY_DASH_VERSIONS)):
+            raise ValueError(f"Reloading the callbacks of a running app is only supported on Dash "
+                             f"{', '.join(CALLBACK_REGISTRY_DASH_VERSIONS)}, not {dash.__version__}. "
+                             f"Disable watch_yaml or restart the app to apply config changes.")
+
+    def register_tab_callbacks(self, app: Dash) -> None:
+        """
+        Register the callbacks declared by the tabs, and the `update_graph` callback of every dropdown tab
+        filtered on the server, including the dropdown tabs nested in multi tabs.
+        """
+        self.register_tabs(app, self.tabs)
+
+    @staticmethod
+    def register_tabs(app: Dash, tabs) -> None:
+        """Register the callbacks of `tabs`, see `register_tab_callbacks`."""
+        for tab in tabs:
+            tab.register_callbacks(app)
+        for tab in Dashboard.flatten_tabs(tabs):
+            if issubclass(tab, dt.DropDownTab) and tab.filter_mode == 'server':
+                AutoDash.register_dropdown_callback(app, tab)
+
+    @staticmethod
+    def replace_callbacks(app: Dash, tabs) -> None:
+        """
+        Register the callbacks of reloaded tabs on a running app. A callback with the same outputs as a callback
+        already registered replaces it, so the components of a rebuilt tab are served by the new tab class.
+
+        Dash has no public API for this, so the private registry of the app is edited, see `check_dash_version`.
+        Browsers load the callback graph once per page load: a replaced callback is served to open pages at once,
+        but a callback added or removed by the reload, e.g. for a new tab or a changed filter mode, only takes effect
+        in a page loaded after the reload.
+        """
+        AutoDash.check_dash_version()
+        start = len(app._callback_list)
+        AutoDash.register_tabs(app, tabs)
+        added = app._callback_list[start:]
+        outputs = {i['output'] for i in added}
+        app._callback_list[:] = [i for i in app._callback_list[:start] if i['output'] not in outputs] + added
+        app._inline_scripts[:] = list(dict.fromkeys(app._inline_scripts))
+
+    def reload_yaml(self, app: Optional[Dash] = None) -> Dict[str, List[str]]:
+        """
+        Configure the tabs again from `yaml_file`, keeping the tab classes whose spec is unchanged with their data,
+        indexes and rendered copies. The new tab list replaces the old one in a single assignment, so a request
+        sees either the old or the new tabs, and requests in flight finish with the tab classes they started with.
+        The cached data of the rebuilt and removed tabs is dropped unless a kept tab reads it.
+        The ids of the dashboard components do not change, even if the title does. Pages opened before the reload
+        must be reloaded to use callbacks it added or removed, see `replace_callbacks`.
+
+        Parameters:
+        -----------
+        app : Dash, optional
+            The running app, to register the callbacks of the rebuilt tabs with.
+
+        Returns:
+        --------
+        dict
+            The values of the 'added', 'changed', 'removed' and 'unchanged' tabs.
+        """
+        with self.reload_lock:
+            cls = type(self)
+            staged = cls.configure(type(cls.__name__, (cls,), {}), cls.yaml_file)
+            old = {tab.value: tab for tab in cls.tabs}
+            tabs = [old[tab.value] if tab.value in old and old[tab.value].spec_digest == tab.spec_digest else tab
+                    for tab in staged.tabs]
+            values = [tab.value for tab in tabs]
+            changes = {
+                'added': [i for i in values if i not in old],
+                'changed': [tab.value for tab in tabs if tab.value in old and tab is not old[tab.value]],
+                'removed': [i for i in old if i not in values],
+                'unchanged': [tab.value for tab in tabs if old.get(tab.value) is tab],
+            }
+            rebuilt = [tab for tab in tabs if old.get(tab.value) is not tab]
+            if app is not None and rebuilt:
+                self.replace_callbacks(app, rebuilt)
+            cls.h1_title = staged.h1_title
+            cls.sources = staged.sources
+            cls.source_usecols = staged.source_usecols
+            cls.tabs = tabs
+            kept = self.flatten_tabs(tabs)
+            kept_keys = {dt.data_key(i) for i in kept}
+            for value in changes['changed'] + changes['removed']:
+                with self.render_metrics_lock:
+                    self.rendered_tabs.pop(value, None)
+                for tab in self.flatten_tabs([old[value]]):
+                    dt.cache.invalidate_derived(dt.tab_key(tab))
+                    if dt.data_key(tab) not in kept_keys:
+                        dt.cache.invalidate_related(dt.data_key(tab))
+            print(f'Reloaded {cls.yaml_file}: ' + ', '.join(f'{len(v)} {k}' for k, v in changes.items()))
+            return changes
+
+    def watch(self, app: Optional[Dash] = None) -> threading.Thread:
+        """
+        Start a daemon thread reloading the tabs with `reload_yaml` whenever `yaml_file` is modified.
+        A config that fails to load is reported and the current tabs are kept.
+        """
+        def poll() -> None:
+            mtime = os.stat(self.yaml_file).st_mtime_ns
+            while True:
+                time.sleep(self.watch_interval_seconds)
+                try:
+                    modified = os.stat(self.yaml_file).st_mtime_ns
+                except OSError:
+                    continue
+                if modified == mtime:
+                    continue
+                mtime = modified
+                try:
+                    self.reload_yaml(app)
+                except Exception as exc:
+                    print(f'Failed to reload {self.yaml_file}, keeping the current tabs: {exc!r}')
+
+        thread = threading.Thread(target=poll, daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def register_dropdown_callback(app: Dash, tab) -> None:
+        """Register the callback redrawing the graph of a dropdown tab on the server."""
+        @app.callback(Output(tab.graph_id, 'figure'),
+                      Input(tab.dropdown_id, 'value'))
+        def update_graph(value):
+            return tab.update_graph(tab, value)
     
     
     @staticmethod
@@ -375,24 +1012,75 @@ class AutoDash(Dashboard):
     @staticmethod
     def configure_tab(cls,tab):
         tab_cls=cls.infer_dashboard_class(cls,tab)
-        tab_cls.csv_path = tab['csv_path']
+        if 'csv_path' in tab:
+            tab_cls.csv_path = tab['csv_path']
+        if 'source' in tab:
+            tab_cls.source = tab['source']
+            tab_cls.csv_path = cls.sources[tab['source']]['csv_path']
+            tab_cls.csv_engine = cls.sources[tab['source']].get('csv_engine', dt.DashboardTab.csv_engine)
+            tab_cls.usecols = cls.source_usecols[tab['source']]
+        if 'csv_engine' in tab:
+            if tab['csv_engine'] not in ig.CSV_ENGINES:
+                raise ValueError(f"Tab '{tab['label']}' has an unknown csv_engine: {tab['csv_engine']}")
+            tab_cls.csv_engine = tab['csv_engine']
         tab_cls.label=tab['label']
         tab_cls.value=cls.to_slug(tab['label'])
+        if issubclass(tab_cls, dt.DropDownTab):
+            if tab_cls.filter_mode not in dt.FILTER_MODES:
+                raise ValueError(f"Tab '{tab['label']}' has an unknown filter_mode: {tab_cls.filter_mode}")
+            if tab_cls.options_mode not in dt.OPTIONS_MODES:
+                raise ValueError(f"Tab '{tab['label']}' has an unknown options_mode: {tab_cls.options_mode}")
+            tab_cls.graph_id = f'{tab_cls.value}-graph'
+            tab_cls.dropdown_id = f'{tab_cls.value}-dropdown'
+        if issubclass(tab_cls, dt.MultiTab):
+            tab_cls.tab_list = [cls.configure_tab(cls, i) for i in tab['tabs']]
+        tab_cls.spec_digest = cls.digest_spec(cls, tab)
         print(tab_cls.value)
         return tab_cls
         
+    @staticmethod
+    def digest_spec(cls, tab) -> str:
+        """
+        Returns a hash of a tab spec, with the csv file and columns of its source and the specs of its nested tabs,
+        so a tab is rebuilt on reload whenever anything it reads changes.
+        """
+        def resolve(tab):
+            tab = dict(tab)
+            if 'source' in tab:
+                tab['source'] = [tab['source'], cls.sources[tab['source']], cls.source_usecols[tab['source']]]
+            if tab['type'] == 'multi':
+                tab['tabs'] = [resolve(i) for i in tab['tabs']]
+            return tab
+        return hashlib.sha1(json.dumps(resolve(tab), sort_keys=True, default=str).encode()).hexdigest()
+
     @staticmethod
     def configure(cls,yaml_file: str):
         yaml_ = cls.load_yaml(yaml_file)
+        cls.yaml_file = yaml_file
         cls.h1_title = yaml_['title']
         cls.tabs_value = cls.to_slug(yaml_['title'])
         cls.div_id = cls.to_slug(yaml_['title']+"-div")
+        cls.sources = yaml_.get('sources') or {}
+        for name, source in cls.sources.items():
+            if 'csv_path' not in source:
+                raise ValueError(f"Source '{name}' must define a csv_path")
+            if source.get('csv_engine', dt.DashboardTab.csv_engine) not in ig.CSV_ENGINES:
+                raise ValueError(f"Source '{name}' has an unknown csv_engine: {source['csv_engine']}")
+        cls.source_usecols = ConfigureMethods.source_columns(cls.sources, yaml_['tabs'])
         cls.tabs=[cls.configure_tab(cls, tab) for tab in yaml_['tabs']]
-        print([i.plot_function for i in cls.tabs])
+        print([i.label for i in cls.tabs])
         return cls
 
     @staticmethod
     def from_yaml(yaml_file: str):
         
         dashboard=AutoDash.configure(AutoDash,yaml_file)
-        return dashboard()
\ No newline at end of file
+        return dashboard()
+
+    @staticmethod
+    def yaml_class(yaml_file: str):
+        """
+        Returns a new `AutoDash` subclass configured from a yaml file, leaving `AutoDash` itself untouched,
+        so several yaml dashboards can be configured in one process.
+        """
+        return AutoDash.configure(type('AutoDash', (AutoDash,), {}), yaml_file)
\ No newline at end of file
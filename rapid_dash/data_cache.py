@@ -0,0 +1,285 @@
+"""
+This module contains the thread safe, versioned cache shared by the tabs of a dashboard.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Union
+
+
+class CacheEntry:
+    """
+    A value held by the `DataCache`.
+
+    Attributes:
+        value (Any): The cached value.
+        version (Hashable): The version stamp of the data source the value was loaded from.
+        size (int): The approximate size of the value in bytes.
+        loaded_at (float): The time the value was loaded.
+    """
+    __slots__ = ('value', 'version', 'size', 'loaded_at')
+
+    def __init__(self, value: Any, version: Hashable, size: int) -> None:
+        self.value = value
+        self.version = version
+        self.size = size
+        self.loaded_at = time.time()
+
+
+def data_size(value: Any, seen: Optional[set] = None) -> int:
+    """
+    Returns the approximate size of a cached value in bytes.
+
+    Args:
+        value (Any): The value to measure.
+        seen (set, optional): The ids of the objects already measured, so shared objects are counted once.
+
+    Returns:
+        int: The deep size of pandas objects and NumPy arrays, and of the containers and objects holding them,
+        e.g. the indexes built over the data of a tab.
+    """
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        return size + sum(data_size(k, seen) + data_size(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(data_size(i, seen) for i in value)
+    if hasattr(value, '__dict__'):
+        size += data_size(vars(value), seen)
+    for name in getattr(type(value), '__slots__', ()):
+        size += data_size(getattr(value, name, None), seen)
+    return size
+
+
+def file_version(path: Union[str, Path]) -> Optional[tuple]:
+    """
+    Returns a version stamp for a file that changes whenever the file is rewritten.
+
+    Args:
+        path (Union[str, Path]): The path to the file.
+
+    Returns:
+        Optional[tuple]: The modification time and size of the file, or None if it does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class DataCache:
+    """
+    A thread safe cache of tab data keyed by `dash_tabs.data_key`.
+    Every entry carries the version stamp of its data source. A lookup with a different version
+    reloads the entry, and concurrent lookups of the same key wait on a single load. The total size of the
+    entries is kept up to date as entries are added and removed, so eviction does not sum the entries again.
+
+    Attributes:
+        max_entries (int or None): The maximum number of entries kept. The least recently used entries are evicted first.
+        max_bytes (int or None): The maximum total size of the entries kept, in bytes.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.key_locks: Dict[Hashable, threading.Lock] = {}
+        self.lock = threading.RLock()
+        self.nbytes = 0
+        self.stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'reloads': 0, 'evictions': 0}
+
+    def configure(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """
+        Set the eviction limits of the cache and evict any entries over them.
+
+        Args:
+            max_entries (int, optional): The maximum number of entries kept.
+            max_bytes (int, optional): The maximum total size of the entries kept, in bytes.
+        """
+        with self.lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self.evict()
+
+    def key_lock(self, key: Hashable) -> threading.Lock:
+        """Returns the lock that serializes loads of `key`."""
+        with self.lock:
+            if key not in self.key_locks:
+                self.key_locks[key] = threading.Lock()
+            return self.key_locks[key]
+
+    def lookup(self, key: Hashable, version: Hashable) -> Optional[CacheEntry]:
+        """
+        Returns the entry for `key` if it is cached at `version`, marking it as recently used and counting a hit.
+
+        Args:
+            key (Hashable): The cache key.
+            version (Hashable): The current version of the data source.
+
+        Returns:
+            Optional[CacheEntry]: The entry, or None if it is missing or stale.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry.version != version:
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry
+
+    def get(self, key: Hashable, loader: Callable[[], Any], version: Hashable = None) -> Any:
+        """
+        Get the value cached for `key`, loading it with `loader` if it is missing or stale.
+
+        Args:
+            key (Hashable): The cache key, e.g. the `dash_tabs.data_key` of a tab.
+            loader (Callable[[], Any]): Loads the value from the data source.
+            version (Hashable, optional): The current version of the data source, e.g. from `file_version`.
+
+        Returns:
+            Any: The cached value.
+        """
+        entry = self.lookup(key, version)
+        if entry is not None:
+            return entry.value
+        with self.key_lock(key):
+            entry = self.lookup(key, version)
+            if entry is not None:
+                return entry.value
+            with self.lock:
+                stale = key in self.entries
+            value = loader()
+            self.set(key, value, version, 'reloads' if stale else 'misses')
+            return value
+
+    def set(self, key: Hashable, value: Any, version: Hashable = None, stat: Optional[str] = None) -> None:
+        """
+        Store a value in the cache and evict entries over the limits.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to cache.
+            version (Hashable, optional): The version of the data source the value was loaded from.
+            stat (str, optional): The `stats` counter incremented with the store, e.g. 'misses' for a load.
+        """
+        entry = CacheEntry(value, version, data_size(value))
+        with self.lock:
+            previous = self.entries.get(key)
+            if previous is not None:
+                self.nbytes -= previous.size
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self.nbytes += entry.size
+            if stat is not None:
+                self.stats[stat] += 1
+            self.evict()
+
+    def peek(self, key: Hashable) -> Any:
+        """Returns the value cached for `key` regardless of its version, or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            return None if entry is None else entry.value
+
+    def version(self, key: Hashable) -> Hashable:
+        """Returns the version stamp the value for `key` was loaded at, or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            return None if entry is None else entry.version
+
+    def remove(self, key: Optional[Hashable] = None) -> None:
+        """
+        Remove the entry of `key`, or the least recently used entry if `key` is None, with its load lock unless a
+        load of the key is running. Called with the lock held.
+        """
+        if key is None:
+            key, entry = self.entries.popitem(last=False)
+        else:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return
+        self.nbytes -= entry.size
+        key_lock = self.key_locks.get(key)
+        if key_lock is not None and not key_lock.locked():
+            del self.key_locks[key]
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove `key` from the cache so the next lookup reloads it."""
+        with self.lock:
+            self.remove(key)
+
+    def invalidate_related(self, key: Hashable) -> None:
+        """Remove `key` and the entries derived from it, keyed by tuples starting with `key`, e.g. indexes over its data."""
+        with self.lock:
+            for i in [i for i in self.entries if i == key or (isinstance(i, tuple) and i and i[0] == key)]:
+                self.remove(i)
+
+    def invalidate_derived(self, key: Hashable) -> None:
+        """Remove the entries derived from `key`, keyed by tuples starting with `key`, and keep `key` itself."""
+        with self.lock:
+            for i in [i for i in self.entries if isinstance(i, tuple) and i and i[0] == key]:
+                self.remove(i)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self.lock:
+            for key in list(self.entries):
+                self.remove(key)
+
+    def total_bytes(self) -> int:
+        """Returns the total size of the cached values in bytes."""
+        with self.lock:
+            return self.nbytes
+
+    def keys(self) -> List[Hashable]:
+        """Returns the cached keys, least recently used first."""
+        with self.lock:
+            return list(self.entries.keys())
+
+    def evict_to(self, max_bytes: int) -> int:
+        """
+        Evict the least recently used entries until the total size of the cache is at most `max_bytes`.
+        Evicted entries are reloaded on their next lookup.
+
+        Args:
+            max_bytes (int): The size to evict down to, in bytes.
+
+        Returns:
+            int: The number of entries evicted.
+        """
+        evicted = 0
+        with self.lock:
+            while self.entries and self.nbytes > max_bytes:
+                self.remove()
+                evicted += 1
+            self.stats['evictions'] += evicted
+        return evicted
+
+    def sizes(self) -> Dict[Hashable, int]:
+        """Returns the size of every cached value in bytes, keyed by cache key."""
+        with self.lock:
+            return {key: entry.size for key, entry in self.entries.items()}
+
+    def evict(self) -> None:
+        """Evict the least recently used entries until the cache is within `max_entries` and `max_bytes`."""
+        with self.lock:
+            while self.entries and (
+                    (self.max_entries is not None and len(self.entries) > self.max_entries) or
+                    (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+                self.remove()
+                self.stats['evictions'] += 1
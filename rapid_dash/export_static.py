@@ -0,0 +1,333 @@
+""" A module for exporting a dashboard as static files that any file server or CDN can serve. """
+
+import os
+import json
+import html
+import shutil
+import hashlib
+import plotly
+from pathlib import Path
+from plotly.io.json import to_json_plotly
+import dash_tabs as dt
+import dashboards as db
+import payload_cache as pc
+import custom_dashboards as cd
+from typing import Any, Dict, Optional, Union
+
+PLOTLY_JS = Path(plotly.__file__).parent / 'package_data' / 'plotly.min.js'
+
+STATIC_JS = """
+var stores = {};
+
+function applyStyle(el, style) {
+    for (var key in style || {}) {
+        if (key.indexOf('-') >= 0) {
+            el.style.setProperty(key, style[key]);
+        } else {
+            el.style[key] = style[key];
+        }
+    }
+}
+
+function renderTable(props) {
+    var columns = (props.columns || []).map(function(c) { return c.id; });
+    var rows = props.data || [];
+    var columnar = stores[props.id + '-columnar'];
+    if (!rows.length && columnar) {
+        rows = [];
+        for (var i = 0; i < (columnar.values.length ? columnar.values[0].length : 0); i++) {
+            var row = {};
+            columnar.columns.forEach(function(name, j) { row[name] = columnar.values[j][i]; });
+            rows.push(row);
+        }
+    }
+    var table = document.createElement('table');
+    var head = table.insertRow();
+    (props.columns || []).forEach(function(c) {
+        var th = document.createElement('th');
+        th.textContent = c.name;
+        head.appendChild(th);
+    });
+    rows.forEach(function(row) {
+        var tr = table.insertRow();
+        columns.forEach(function(c) { tr.insertCell().textContent = row[c] === undefined ? '' : row[c]; });
+    });
+    return table;
+}
+
+function filterGraph(data, value, graphId) {
+    if (!data || !data.options) {
+        return;
+    }
+    var i = data.options.map(String).indexOf(value);
+    var x = [], y = [];
+    if (i >= 0) {
+        x = data.x.slice(data.offsets[i], data.offsets[i + 1]);
+        y = data.y.slice(data.offsets[i], data.offsets[i + 1]);
+    }
+    Plotly.react(document.getElementById(graphId), [{type: 'scatter', mode: 'lines', x: x, y: y}],
+                 {xaxis: {title: {text: data.x_name}}, yaxis: {title: {text: data.y_name}}});
+}
+
+function render(node, graphs) {
+    if (node === null || node === undefined) {
+        return document.createTextNode('');
+    }
+    if (Array.isArray(node)) {
+        var fragment = document.createDocumentFragment();
+        node.forEach(function(child) { fragment.appendChild(render(child, graphs)); });
+        return fragment;
+    }
+    if (typeof node !== 'object') {
+        return document.createTextNode(String(node));
+    }
+    var props = node.props || {};
+    var el;
+    if (node.namespace === 'dash_html_components') {
+        el = document.createElement(node.type.toLowerCase());
+        el.appendChild(render(props.children, graphs));
+    } else if (node.type === 'Graph') {
+        el = document.createElement('div');
+        graphs.push([el, props.figure || {}, props.config || {}]);
+    } else if (node.type === 'DataTable') {
+        el = renderTable(props);
+    } else if (node.type === 'Store') {
+        stores[props.id] = props.data;
+        return document.createTextNode('');
+    } else if (node.type === 'Dropdown') {
+        el = document.createElement('select');
+        el.disabled = !props.clientStore;
+        (props.options || []).forEach(function(option) {
+            var label = typeof option === 'object' ? option.label : option;
+            var value = typeof option === 'object' ? option.value : option;
+            el.add(new Option(label, value, false, value === props.value));
+        });
+        if (props.clientStore) {
+            el.onchange = function() { filterGraph(stores[props.clientStore], el.value, props.graph); };
+        }
+    } else {
+        el = document.createElement('div');
+        el.appendChild(render(props.children, graphs));
+    }
+    if (props.id) { el.id = props.id; }
+    if (props.className) { el.className = props.className; }
+    applyStyle(el, props.style);
+    return el;
+}
+
+function showTab(tab) {
+    document.querySelectorAll('#tabs button').forEach(function(button) {
+        button.className = button.dataset.value === tab.value ? 'selected' : '';
+    });
+    fetch('tabs/' + tab.file + '?v=' + tab.etag).then(function(response) {
+        return response.json();
+    }).then(function(content) {
+        var graphs = [];
+        var div = document.getElementById('content');
+        div.replaceChildren(render(content, graphs));
+        graphs.forEach(function(graph) {
+            Plotly.newPlot(graph[0], graph[1].data || [], graph[1].layout || {}, graph[2]);
+        });
+    });
+}
+
+fetch('manifest.json').then(function(response) {
+    return response.json();
+}).then(function(manifest) {
+    var buttons = document.getElementById('tabs');
+    manifest.order.forEach(function(value) {
+        var tab = manifest.tabs[value];
+        var button = document.createElement('button');
+        button.textContent = tab.label;
+        button.dataset.value = value;
+        button.onclick = function() { showTab(tab); };
+        buttons.appendChild(button);
+    });
+    if (manifest.order.length) {
+        showTab(manifest.tabs[manifest.order[0]]);
+    }
+});
+"""
+
+INDEX_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="plotly.min.js"></script>
+<style>
+#tabs button {{ padding: 8px 16px; border: 1px solid #d6d6d6; background: #f9f9f9; cursor: pointer; }}
+#tabs button.selected {{ background: white; border-top: 2px solid #1975fa; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #d6d6d6; padding: 4px 8px; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<div id="tabs"></div>
+<div id="content"></div>
+<script src="dashboard.js"></script>
+</body>
+</html>
+"""
+
+
+def write_atomic(path: Path, content: Union[str, bytes]) -> None:
+    """
+    Write a file through a temporary file in the same directory, so a file server never serves a partial file.
+
+    Args:
+        path (Path): The file to write.
+        content (Union[str, bytes]): The content of the file.
+    """
+    tmp = path.with_name(f'.{path.name}.tmp')
+    with open(tmp, 'wb') as file:
+        file.write(content.encode() if isinstance(content, str) else content)
+    os.replace(tmp, path)
+
+
+def version_etag(tab_cls: type) -> Optional[str]:
+    """
+    Returns a hash of a tab at its data version, or None if the version is unknown. The hash is the
+    `payload_cache.payload_key` of the tab, so a change to the tab spec or to the code rendering it exports the
+    tab again even if its data is unchanged.
+
+    Args:
+        tab_cls (type): The tab class.
+
+    Returns:
+        Optional[str]: The hash of the code, the tab spec and its data version.
+    """
+    version = dt.tab_version(tab_cls)
+    if version is None:
+        return None
+    return pc.payload_key(tab_cls, version)
+
+
+def static_content(tab_cls: type) -> Any:
+    """
+    Render a tab as the json layout of its static file. Graphs filled by a callback in the dashboard, the graphs
+    of the dropdown tabs, are drawn on export for the start value. The dropdown of a tab filtering in the browser
+    is kept enabled and filters the `Store` shipped with the tab in `dashboard.js`, other dropdowns are shown
+    disabled at their start value.
+
+    Args:
+        tab_cls (type): The tab class.
+
+    Returns:
+        Any: The layout of the tab, as the json the Dash app would send.
+
+    Raises:
+        ValueError: If a graph of the tab has no figure, since it would be exported blank.
+    """
+    content = json.loads(to_json_plotly(tab_cls().tab))
+    figures, dropdowns = {}, {}
+    for tab in db.Dashboard.flatten_tabs([tab_cls]):
+        if issubclass(tab, dt.DropDownTab):
+            figures[tab.graph_id] = json.loads(to_json_plotly(tab.update_graph(tab, tab.start_value)))
+            if tab.filter_mode != 'server' and tab.filters_on_client(tab):
+                dropdowns[tab.dropdown_id] = {'clientStore': tab.client_store_id(tab), 'graph': tab.graph_id}
+    blank = []
+
+    def visit(node: Any) -> None:
+        if isinstance(node, list):
+            for child in node:
+                visit(child)
+        if not isinstance(node, dict):
+            return
+        props = node.get('props', {})
+        if node.get('type') == 'Graph':
+            if props.get('id') in figures:
+                props['figure'] = figures[props['id']]
+            if not props.get('figure'):
+                blank.append(props.get('id'))
+        if node.get('type') == 'Dropdown' and props.get('id') in dropdowns:
+            props.update(dropdowns[props['id']])
+        visit(props.get('children'))
+
+    visit(content)
+    if blank:
+        raise ValueError(f"{tab_cls.label}: the graphs {blank} have no figure and would be exported blank")
+    return content
+
+
+def load_manifest(out_dir: Path) -> Dict[str, Any]:
+    """Returns the manifest of a previous export to `out_dir`, or an empty manifest."""
+    try:
+        with open(out_dir / 'manifest.json') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {'tabs': {}, 'order': []}
+
+
+def export_dashboard(dashboard: db.Dashboard, out_dir: Union[str, Path], force: bool = False) -> Dict[str, Any]:
+    """
+    Export every tab of a dashboard to a static directory holding an `index.html`, the `dashboard.js` renderer,
+    `plotly.min.js`, one json file per tab and a `manifest.json`. Tabs are switched in the browser, so the
+    directory can be served by a plain file server or CDN.
+
+    The export is incremental: a tab is only rendered again when its data version, its spec or the code rendering
+    it differ from the ones in the manifest of the previous export, see `version_etag`. Tabs whose data version is unknown are always rendered again.
+    Tabs with callbacks are exported as their initial layout, with the graphs of dropdown tabs drawn for their
+    start value, see `static_content`.
+
+    Args:
+        dashboard (db.Dashboard): The dashboard to export.
+        out_dir (Union[str, Path]): The directory to export to.
+        force (bool): If True, every tab is rendered again.
+
+    Returns:
+        Dict[str, Any]: The manifest of the export.
+    """
+    out_dir = Path(out_dir)
+    (out_dir / 'tabs').mkdir(parents=True, exist_ok=True)
+    previous = {} if force else load_manifest(out_dir)['tabs']
+    manifest = {'title': dashboard.h1_title, 'tabs': {}, 'order': []}
+    for tab_cls in dashboard.tabs:
+        etag = version_etag(tab_cls)
+        entry = previous.get(tab_cls.value)
+        manifest['order'].append(tab_cls.value)
+        if etag is not None and entry is not None and entry['version'] == etag \
+                and (out_dir / 'tabs' / entry['file']).exists():
+            manifest['tabs'][tab_cls.value] = entry
+            print(f'{tab_cls.label}: unchanged')
+            continue
+        if tab_cls.sync_type == 'dynamic':
+            print(f'{tab_cls.label}: exported without its callbacks')
+        content = json.dumps(static_content(tab_cls), separators=(',', ':'))
+        file = f'{hashlib.sha1(tab_cls.value.encode()).hexdigest()[:16]}.json'
+        write_atomic(out_dir / 'tabs' / file, content)
+        manifest['tabs'][tab_cls.value] = {
+            'label': tab_cls.label,
+            'file': file,
+            'version': etag,
+            'etag': hashlib.sha1(content.encode()).hexdigest()[:16],
+            'bytes': len(content),
+        }
+        print(f'{tab_cls.label}: {len(content)} bytes written')
+    write_atomic(out_dir / 'index.html', INDEX_HTML.format(title=html.escape(dashboard.h1_title)))
+    write_atomic(out_dir / 'dashboard.js', STATIC_JS)
+    if not (out_dir / 'plotly.min.js').exists() or force:
+        shutil.copyfile(PLOTLY_JS, out_dir / 'plotly.min.js')
+    write_atomic(out_dir / 'manifest.json', json.dumps(manifest, indent=2))
+    return manifest
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Export a dashboard as static files')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--dashboard',
+                       help='The name of the dashboard to export',
+                       choices=[name for name, obj in vars(cd).items() if (isinstance(obj, type) and issubclass(obj, cd.Dashboard))])
+    group.add_argument('--yaml-path',
+                       help='The path to the yaml config for a dashboard.')
+    parser.add_argument('--out-dir',
+                        help='The directory to export to',
+                        default='static')
+    parser.add_argument('--force',
+                        help='Render every tab again, even if its data is unchanged',
+                        action='store_true')
+    args = parser.parse_args()
+    dashboard = getattr(cd, args.dashboard)() if args.dashboard else db.AutoDash.from_yaml(args.yaml_path)
+    export_dashboard(dashboard, args.out_dir, args.force)
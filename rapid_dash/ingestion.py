@@ -0,0 +1,261 @@
+"""
+This module contains the chunked ingestion of csv files that are too large to load at once.
+Each chunk is folded into a running aggregate or downsample, so peak memory follows the chunk size
+and not the file size. It also selects the parser used to read whole csv files.
+"""
+
+import time
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+CSV_ENGINES = ('c', 'python', 'pyarrow')
+
+
+def read_csv_options(engine: str) -> Dict[str, Any]:
+    """
+    Returns the `pd.read_csv` arguments of a csv engine.
+    'c' is the default single-threaded pandas parser and 'python' the slower, more lenient one. 'pyarrow' parses
+    with the multi-threaded Arrow csv reader into Arrow-backed dtypes, which hold strings and nullable integers more
+    compactly. It falls back to 'c' when pyarrow is not installed.
+
+    Args:
+        engine (str): The csv engine: 'c', 'python' or 'pyarrow'.
+
+    Returns:
+        Dict[str, Any]: The keyword arguments for `pd.read_csv`.
+    """
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"Unknown csv engine: {engine}. Choose from {list(CSV_ENGINES)}")
+    if engine != 'pyarrow':
+        return {'engine': engine}
+    if pyarrow is None:
+        print("pyarrow is not installed, reading csv files with the 'c' engine")
+        return {'engine': 'c'}
+    return {'engine': 'pyarrow', 'dtype_backend': 'pyarrow'}
+
+
+class Aggregator(ABC):
+    """
+    Abstract base class of the running aggregates fed by `ingest_csv`.
+    Concrete classes must implement the `update` and `result` methods and the `usecols` property.
+    """
+
+    @abstractmethod
+    def update(self, chunk: pd.DataFrame, start: int) -> None:
+        """
+        Fold a chunk into the aggregate.
+
+        Args:
+            chunk (pd.DataFrame): The rows of the chunk.
+            start (int): The position of the first row of the chunk in the file.
+        """
+        pass
+
+    @abstractmethod
+    def result(self) -> pd.DataFrame:
+        """Returns the aggregate of every chunk seen so far."""
+        pass
+
+    @property
+    @abstractmethod
+    def usecols(self) -> List[str]:
+        """The columns the aggregate reads from the file."""
+        pass
+
+
+class GroupAggregate(Aggregator):
+    """
+    Running group by aggregate, e.g. the total volume per consensus value.
+
+    Attributes:
+        by (str): The column to group by.
+        columns (List[str]): The columns to aggregate.
+        how (str): The aggregate: 'sum', 'mean', 'min', 'max' or 'count'.
+    """
+
+    def __init__(self, by: str, columns: List[str], how: str = 'sum') -> None:
+        if how not in ('sum', 'mean', 'min', 'max', 'count'):
+            raise ValueError(f"Unknown aggregate: {how}")
+        self.by = by
+        self.columns = [i for i in dict.fromkeys(columns) if i != by]
+        self.how = how
+        self.partials: Optional[pd.DataFrame] = None
+
+    @property
+    def usecols(self) -> List[str]:
+        return [self.by] + self.columns
+
+    def update(self, chunk: pd.DataFrame, start: int) -> None:
+        grouped = chunk.groupby(self.by, sort=False)[self.columns]
+        if self.how == 'mean':
+            partial = grouped.sum().join(grouped.count(), rsuffix='__count')
+        else:
+            partial = grouped.agg(self.how)
+        if self.partials is None:
+            self.partials = partial
+            return
+        combined = pd.concat([self.partials, partial])
+        how = {'mean': 'sum', 'count': 'sum'}.get(self.how, self.how)
+        self.partials = combined.groupby(level=0, sort=False).agg(how)
+
+    def result(self) -> pd.DataFrame:
+        if self.partials is None:
+            return pd.DataFrame(columns=[self.by] + self.columns)
+        result = self.partials
+        if self.how == 'mean':
+            result = pd.DataFrame({i: result[i] / result[i + '__count'] for i in self.columns})
+        return result.reset_index()
+
+
+class ReservoirSample(Aggregator):
+    """
+    Uniform random sample of a fixed number of rows, kept in file order.
+
+    Attributes:
+        size (int): The number of rows sampled.
+        columns (List[str]): The columns kept.
+    """
+
+    def __init__(self, size: int, columns: List[str], seed: Optional[int] = None) -> None:
+        self.size = size
+        self.columns = list(dict.fromkeys(columns))
+        self.rng = np.random.default_rng(seed)
+        self.sample: Dict[str, np.ndarray] = {}
+        self.positions = np.empty(0, dtype=np.int64)
+
+    @property
+    def usecols(self) -> List[str]:
+        return self.columns
+
+    def update(self, chunk: pd.DataFrame, start: int) -> None:
+        values = {i: chunk[i].to_numpy() for i in self.columns}
+        positions = start + np.arange(len(chunk))
+        for column, array in values.items():
+            if column not in self.sample:
+                self.sample[column] = array[:0]
+            elif self.sample[column].dtype != array.dtype:
+                self.sample[column] = self.sample[column].astype(np.result_type(self.sample[column], array))
+        free = max(self.size - len(self.positions), 0)
+        if free:
+            for column, array in values.items():
+                self.sample[column] = np.concatenate([self.sample[column], array[:free]])
+            self.positions = np.concatenate([self.positions, positions[:free]])
+            values = {i: array[free:] for i, array in values.items()}
+            positions = positions[free:]
+        if len(positions) == 0:
+            return
+        # Algorithm R: row n replaces a random slot with probability size / (n + 1).
+        slots = (self.rng.random(len(positions)) * (positions + 1)).astype(np.int64)
+        rows = np.flatnonzero(slots < self.size)
+        if len(rows) == 0:
+            return
+        slots = slots[rows]
+        # Later rows win when several rows draw the same slot.
+        _, last = np.unique(slots[::-1], return_index=True)
+        slots, rows = slots[::-1][last], rows[::-1][last]
+        for column, array in values.items():
+            self.sample[column][slots] = array[rows]
+        self.positions[slots] = positions[rows]
+
+    def result(self) -> pd.DataFrame:
+        order = np.argsort(self.positions, kind='stable')
+        return pd.DataFrame({i: self.sample[i][order] for i in self.columns} if self.sample else
+                            {i: [] for i in self.columns})
+
+
+class MinMaxDownsample(Aggregator):
+    """
+    Downsample that keeps, for every bucket of consecutive rows, the rows holding the minimum and the maximum
+    of each y column, so peaks survive. The bucket width doubles whenever more than `max_points` rows are kept.
+
+    Attributes:
+        x (str): The x column.
+        y_columns (List[str]): The y columns whose extremes are kept.
+        max_points (int): The maximum number of rows kept.
+    """
+
+    def __init__(self, x: str, y_columns: List[str], max_points: int = 5000) -> None:
+        self.x = x
+        self.y_columns = [i for i in dict.fromkeys(y_columns) if i != x]
+        self.max_points = max_points
+        self.bucket_rows = 1
+        self.kept: Optional[pd.DataFrame] = None
+
+    @property
+    def usecols(self) -> List[str]:
+        return [self.x] + self.y_columns
+
+    def extremes(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """Returns the rows holding the minimum or maximum of a y column within their bucket."""
+        buckets = rows['_row'] // self.bucket_rows
+        grouped = rows.groupby(buckets.to_numpy(), sort=False)
+        labels = pd.Index([])
+        for column in self.y_columns:
+            labels = labels.union(grouped[column].idxmin().dropna()).union(grouped[column].idxmax().dropna())
+        return rows.loc[labels]
+
+    def update(self, chunk: pd.DataFrame, start: int) -> None:
+        rows = chunk[[self.x] + self.y_columns].reset_index(drop=True)
+        rows['_row'] = start + np.arange(len(rows))
+        # Widen the buckets up front so a single chunk never keeps more than `max_points` rows.
+        while 2 * len(self.y_columns) * len(rows) > self.max_points * self.bucket_rows:
+            self.bucket_rows *= 2
+        kept = self.extremes(rows)
+        self.kept = kept if self.kept is None else pd.concat([self.kept, kept], ignore_index=True)
+        while len(self.kept) > self.max_points:
+            self.bucket_rows *= 2
+            self.kept = self.extremes(self.kept.reset_index(drop=True))
+
+    def result(self) -> pd.DataFrame:
+        if self.kept is None:
+            return pd.DataFrame(columns=[self.x] + self.y_columns)
+        return self.kept.sort_values('_row').drop(columns='_row').reset_index(drop=True)
+
+
+def ingest_csv(path: Union[str, Path], aggregator: Aggregator, chunk_size: int = 100000,
+               usecols: Optional[List[str]] = None, label: Optional[str] = None,
+               report: Callable[[str], Any] = print, **read_csv_kwargs: Any) -> Dict[str, Any]:
+    """
+    Stream a csv file through an aggregator one chunk at a time, reporting the ingestion rate after every chunk.
+
+    Args:
+        path (Union[str, Path]): The csv file.
+        aggregator (Aggregator): The running aggregate the chunks are folded into.
+        chunk_size (int): The number of rows read at a time.
+        usecols (List[str], optional): The columns to read. Defaults to every column.
+        label (str, optional): The name used in the progress reports. Defaults to the path.
+        report (Callable[[str], Any]): Called with each progress report. Defaults to print.
+        **read_csv_kwargs: Passed on to `pd.read_csv`.
+
+    Returns:
+        Dict[str, Any]: The result of the aggregator under 'data', and the 'rows', 'chunks', 'seconds'
+        and 'rows_per_second' of the ingestion.
+    """
+    label = label or str(path)
+    started = time.perf_counter()
+    rows = 0
+    chunks = 0
+    usecols = list(dict.fromkeys(usecols)) if usecols else None
+    with pd.read_csv(path, chunksize=chunk_size, usecols=usecols, **read_csv_kwargs) as reader:
+        for chunk in reader:
+            aggregator.update(chunk, rows)
+            rows += len(chunk)
+            chunks += 1
+            seconds = time.perf_counter() - started
+            report(f'{label}: {rows} rows ingested, {rows / seconds if seconds else 0:.0f} rows/s')
+    seconds = time.perf_counter() - started
+    return {
+        'data': aggregator.result(),
+        'rows': rows,
+        'chunks': chunks,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds else 0.0,
+    }
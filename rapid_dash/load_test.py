@@ -0,0 +1,342 @@
+""" A module for load testing dashboards with concurrent simulated users. """
+
+import os
+import gzip
+import json
+import time
+import random
+import resource
+import threading
+import urllib.error
+import urllib.request
+import numpy as np
+import yaml
+import dashboards as db
+import custom_dashboards as cd
+from benchmark import print_results
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HEADERS = {'Accept-Encoding': 'br, gzip', 'Content-Type': 'application/json'}
+
+
+def decode(body: bytes, encoding: Optional[str]) -> bytes:
+    """Returns a response body decompressed according to its Content-Encoding."""
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'br':
+        if brotli is None:
+            raise ValueError("brotli must be installed to decode brotli responses")
+        return brotli.decompress(body)
+    return body
+
+
+class InProcessClient(object):
+    """Sends the requests of a simulated user to a Dash app through the Flask test client, without a network."""
+
+    def __init__(self, app: Any) -> None:
+        self.client = app.server.test_client()
+
+    def request(self, method: str, path: str, payload: Any = None) -> Tuple[int, bytes]:
+        """Returns the status and the decoded body of a request."""
+        response = self.client.open(path, method=method, headers=HEADERS,
+                                    data=None if payload is None else json.dumps(payload))
+        return response.status_code, decode(response.data, response.headers.get('Content-Encoding'))
+
+
+class HTTPClient(object):
+    """Sends the requests of a simulated user to a running dashboard server."""
+
+    def __init__(self, url: str) -> None:
+        self.url = url.rstrip('/')
+
+    def request(self, method: str, path: str, payload: Any = None) -> Tuple[int, bytes]:
+        """Returns the status and the decoded body of a request."""
+        data = None if payload is None else json.dumps(payload).encode()
+        request = urllib.request.Request(self.url + path, data=data, headers=HEADERS, method=method)
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, decode(response.read(), response.headers.get('Content-Encoding'))
+        except urllib.error.HTTPError as error:
+            return error.code, error.read()
+
+
+def components(node: Any) -> Iterator[dict]:
+    """Yields every serialized Dash component in a layout or callback response."""
+    if isinstance(node, list):
+        for child in node:
+            yield from components(child)
+    elif isinstance(node, dict):
+        if 'type' in node and 'props' in node:
+            yield node
+            node = node['props'].get('children')
+        else:
+            node = list(node.values())
+        yield from components(node)
+
+
+def output_label(output: str) -> str:
+    """Returns a short label for a callback from its output, e.g. 'graph-content.figure'."""
+    return output.strip('.').split('...')[0]
+
+
+class SimulatedUser(object):
+    """
+    A user of a dashboard that keeps the component properties the browser would hold and fires the server side
+    callbacks triggered by its actions: loading the page, switching tabs, picking dropdown values and interval ticks.
+
+    Attributes:
+        client (Any): The `InProcessClient` or `HTTPClient` sending the requests.
+        rng (random.Random): Picks the tabs and dropdown values.
+        latencies (Dict[str, List[float]]): The latency of every request in seconds, keyed by callback label.
+        errors (Dict[str, int]): The number of failed requests, keyed by callback label.
+    """
+
+    def __init__(self, client: Any, seed: int) -> None:
+        self.client = client
+        self.rng = random.Random(seed)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.props: Dict[Tuple[str, str], Any] = {}
+        self.types: Dict[str, str] = {}
+        self.tab_values: Dict[str, List[Any]] = {}
+        self.dependencies: List[dict] = []
+
+    def timed(self, label: str, method: str, path: str, payload: Any = None) -> Optional[bytes]:
+        """Send a request, recording its latency. Returns the body, or None if the request failed."""
+        start = time.perf_counter()
+        status, body = self.client.request(method, path, payload)
+        self.latencies[label].append(time.perf_counter() - start)
+        if status >= 400:
+            self.errors[label] += 1
+            return None
+        return body
+
+    def index(self, node: Any) -> None:
+        """Record the properties of every component with an id in a layout or response."""
+        for component in components(node):
+            props = component['props']
+            if isinstance(props.get('id'), str):
+                self.types[props['id']] = component['type']
+                if component['type'] == 'Tabs':
+                    self.tab_values[props['id']] = [i['props']['value'] for i in components(props.get('children'))
+                                                    if i['type'] == 'Tab']
+                for name, value in props.items():
+                    if name != 'children':
+                        self.props[(props['id'], name)] = value
+
+    def load(self) -> None:
+        """Load the page, its layout and its callbacks, then fire the initial callbacks."""
+        self.timed('index', 'GET', '/')
+        layout = self.timed('layout', 'GET', '/_dash-layout')
+        dependencies = self.timed('dependencies', 'GET', '/_dash-dependencies')
+        if layout is None or dependencies is None:
+            return
+        self.props.clear()
+        self.index(json.loads(layout))
+        self.dependencies = [i for i in json.loads(dependencies) if not i.get('clientside_function')]
+        for dependency in self.dependencies:
+            if not dependency.get('prevent_initial_call'):
+                self.fire(dependency, dependency['inputs'][0])
+
+    def fire(self, dependency: dict, changed: dict) -> None:
+        """Call a server side callback with the current properties and apply its response."""
+        if not all(i['id'] in self.types for i in dependency['inputs']):
+            return
+        payload = {
+            'output': dependency['output'],
+            'inputs': [{**i, 'value': self.props.get((i['id'], i['property']))} for i in dependency['inputs']],
+            'state': [{**i, 'value': self.props.get((i['id'], i['property']))} for i in dependency['state']],
+            'changedPropIds': [f"{changed['id']}.{changed['property']}"],
+        }
+        body = self.timed(output_label(dependency['output']), 'POST', '/_dash-update-component', payload)
+        if not body:
+            return
+        for id, props in json.loads(body).get('response', {}).items():
+            for name, value in props.items():
+                self.props[(id, name)] = value
+                self.index(value)
+
+    def change(self, id: str, name: str, value: Any) -> None:
+        """Set a component property, as the browser does on user input, and fire the callbacks it triggers."""
+        self.props[(id, name)] = value
+        for dependency in self.dependencies:
+            if any(i['id'] == id and i['property'] == name for i in dependency['inputs']):
+                self.fire(dependency, {'id': id, 'property': name})
+
+    def ids(self, type: str) -> List[str]:
+        """Returns the ids of the rendered components of a type, e.g. 'Dropdown'."""
+        return [id for id, i in self.types.items() if i == type]
+
+    def session(self, rounds: int) -> None:
+        """
+        Load the dashboard, then for every round visit the tabs in a random order, pick a random value in every
+        dropdown of each tab and fire one interval tick.
+        """
+        self.load()
+        for _ in range(rounds):
+            for id, values in list(self.tab_values.items()):
+                for value in self.rng.sample(values, len(values)):
+                    self.change(id, 'value', value)
+                    for dropdown in self.ids('Dropdown'):
+                        options = self.props.get((dropdown, 'options')) or []
+                        if options:
+                            option = self.rng.choice(options)
+                            self.change(dropdown, 'value', option['value'] if isinstance(option, dict) else option)
+            for id in self.ids('Interval'):
+                self.change(id, 'n_intervals', (self.props.get((id, 'n_intervals')) or 0) + 1)
+
+
+def rss_bytes(pid: Optional[int] = None) -> int:
+    """
+    Returns the resident set size of a process in bytes.
+
+    Args:
+        pid (int, optional): The process id. Defaults to the current process.
+
+    Returns:
+        int: The resident set size, or the peak resident set size of the current process where /proc is unavailable.
+    """
+    try:
+        with open(f'/proc/{pid or os.getpid()}/status') as file:
+            for line in file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid is not None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RSSSampler(threading.Thread):
+    """Samples the resident set size of the server process in the background and keeps the peak."""
+
+    def __init__(self, pid: Optional[int] = None, interval: float = 0.1) -> None:
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.start_bytes = rss_bytes(pid)
+        self.peak_bytes = self.start_bytes
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, rss_bytes(self.pid))
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+        self.peak_bytes = max(self.peak_bytes, rss_bytes(self.pid))
+
+
+def run_load_test(make_client: Any, users: int, rounds: int, pid: Optional[int] = None,
+                  seed: int = 0) -> Dict[str, Any]:
+    """
+    Run `users` simulated users concurrently, each in its own thread with its own client.
+
+    Args:
+        make_client (Callable[[], Any]): Creates the client of a user.
+        users (int): The number of concurrent users.
+        rounds (int): The number of rounds of tab visits each user makes.
+        pid (int, optional): The process id of the server whose memory is sampled. Defaults to the current process.
+        seed (int): The random seed of the users.
+
+    Returns:
+        Dict[str, Any]: The latency statistics per callback under 'callbacks', and the 'requests', 'errors',
+        'seconds', 'requests_per_second', 'rss_start_mb' and 'rss_peak_mb' of the run.
+    """
+    simulated = [SimulatedUser(make_client(), seed + i) for i in range(users)]
+    sampler = RSSSampler(pid)
+    sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        for future in [executor.submit(user.session, rounds) for user in simulated]:
+            future.result()
+    seconds = time.perf_counter() - start
+    sampler.stop()
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    for user in simulated:
+        for label, values in user.latencies.items():
+            latencies[label].extend(values)
+        for label, count in user.errors.items():
+            errors[label] += count
+    callbacks = []
+    for label, values in latencies.items():
+        p50, p95, p99 = np.percentile(np.array(values) * 1000, [50, 95, 99])
+        callbacks.append({'callback': label, 'requests': len(values), 'errors': errors[label],
+                          'p50_ms': round(p50, 1), 'p95_ms': round(p95, 1), 'p99_ms': round(p99, 1),
+                          'max_ms': round(max(values) * 1000, 1)})
+    requests = sum(len(i) for i in latencies.values())
+    return {
+        'callbacks': callbacks,
+        'requests': requests,
+        'errors': sum(errors.values()),
+        'seconds': seconds,
+        'requests_per_second': requests / seconds if seconds else 0.0,
+        'rss_start_mb': sampler.start_bytes / 2 ** 20,
+        'rss_peak_mb': sampler.peak_bytes / 2 ** 20,
+    }
+
+
+def configured_app(dashboard: Optional[str], yaml_path: Optional[str], options: Dict[str, Any]) -> Any:
+    """
+    Create the Dash app of a scenario, with the `Dashboard` class attributes in `options` overridden,
+    e.g. {'compress_responses': True, 'json_engine': 'orjson'}.
+    """
+    if yaml_path:
+        for name, value in options.items():
+            setattr(db.AutoDash, name, value)
+        return db.AutoDash.from_yaml(yaml_path).create_app()
+    cls = getattr(cd, dashboard)
+    return type(cls.__name__, (cls,), options)().create_app()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Load test a dashboard with concurrent simulated users')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--dashboard',
+                       help='The name of the dashboard to run in process',
+                       choices=[name for name, obj in vars(cd).items() if (isinstance(obj, type) and issubclass(obj, cd.Dashboard))])
+    group.add_argument('--yaml-path',
+                       help='The path to the yaml config of a dashboard to run in process.')
+    group.add_argument('--url',
+                       help='The url of a running dashboard server, e.g. http://127.0.0.1:8080')
+    parser.add_argument('--pid',
+                        help='The process id of the server started with --url, to sample its memory',
+                        type=int)
+    parser.add_argument('--users',
+                        help='The number of concurrent users',
+                        type=int,
+                        default=10)
+    parser.add_argument('--rounds',
+                        help='The number of rounds of tab visits per user',
+                        type=int,
+                        default=3)
+    parser.add_argument('--option',
+                        help='A dashboard class attribute to override in process, e.g. compress_responses=true',
+                        action='append',
+                        default=[])
+    args = parser.parse_args()
+    if args.url:
+        make_client = lambda: HTTPClient(args.url)
+    else:
+        options = {}
+        for option in args.option:
+            name, _, value = option.partition('=')
+            options[name] = yaml.safe_load(value)
+        app = configured_app(args.dashboard, args.yaml_path, options)
+        make_client = lambda: InProcessClient(app)
+    result = run_load_test(make_client, args.users, args.rounds, args.pid)
+    print_results(sorted(result['callbacks'], key=lambda i: i['callback']))
+    print(f"{result['requests']} requests, {result['errors']} errors in {result['seconds']:.1f} s, "
+          f"{result['requests_per_second']:.0f} requests/s, "
+          f"RSS {result['rss_start_mb']:.0f} MB -> {result['rss_peak_mb']:.0f} MB peak")
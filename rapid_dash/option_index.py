@@ -0,0 +1,51 @@
+"""
+This module contains the prefix index used to search the options of high cardinality dropdowns.
+The index is built once per data version, after which every search is two binary searches.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class PrefixIndex:
+    """
+    The distinct options of a dropdown, sorted by their case folded label so the options starting with a prefix
+    are a contiguous range found with `searchsorted`.
+
+    Attributes:
+        keys (np.ndarray): The case folded labels, sorted.
+        labels (np.ndarray): The labels of the options, in the order of `keys`.
+        values (np.ndarray): The values of the options, in the order of `keys`.
+    """
+
+    def __init__(self, options: Iterable[Any]) -> None:
+        values = pd.unique(pd.Series(list(options)).dropna())
+        labels = np.array([str(i) for i in values], dtype=object)
+        keys = np.array([i.casefold() for i in labels], dtype=object)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order].astype(str)
+        self.labels = labels[order]
+        self.values = values[order]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def search(self, prefix: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the options whose label starts with `prefix`, ignoring case, in label order.
+
+        Args:
+            prefix (str): The text typed in the dropdown.
+            limit (int, optional): The maximum number of options returned. Defaults to every match.
+
+        Returns:
+            List[Dict[str, Any]]: The matching options as `dcc.Dropdown` option dicts.
+        """
+        key = prefix.casefold()
+        lo = np.searchsorted(self.keys, key, side='left')
+        hi = np.searchsorted(self.keys, key + '\U0010ffff', side='left')
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [{'label': label, 'value': value}
+                for label, value in zip(self.labels[lo:hi], self.values[lo:hi].tolist())]
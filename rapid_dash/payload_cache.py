@@ -0,0 +1,202 @@
+"""
+This module contains the persistent cache of rendered tab payloads. A payload is the serialized content of a tab,
+stored on disk under a hash of the tab spec and its data version, so a restarted server, or another worker,
+serves a tab rendered before without building its figures and tables again.
+"""
+
+import os
+import json
+import hashlib
+import inspect
+import tempfile
+import threading
+import functools
+import dash
+import plotly
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
+FORMAT_VERSION = 1
+
+
+@functools.lru_cache(maxsize=None)
+def code_digest() -> str:
+    """
+    Returns a hash of the source of this package and of the dash and plotly versions, so a deploy that changes
+    how tabs are rendered never serves payloads rendered by the previous code.
+    """
+    digest = hashlib.sha1(repr((FORMAT_VERSION, dash.__version__, plotly.__version__)).encode())
+    for path in sorted(Path(__file__).parent.glob('*.py')):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def describe(value: Any) -> Any:
+    """Returns a stable description of a class attribute: classes and functions by name, containers recursively."""
+    if isinstance(value, type):
+        return [f'{value.__module__}.{value.__qualname__}', class_spec(value)]
+    if callable(value):
+        return f'{getattr(value, "__module__", "")}.{getattr(value, "__qualname__", repr(value))}'
+    if isinstance(value, (list, tuple)):
+        return [describe(i) for i in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(repr(describe(i)) for i in value)
+    if isinstance(value, dict):
+        return {str(key): describe(i) for key, i in value.items()}
+    return repr(value)
+
+
+def is_method(base: type, value: Any) -> bool:
+    """Returns True if `value` is a method defined in the body of `base`, as opposed to a configured attribute."""
+    if isinstance(value, (staticmethod, classmethod, property)):
+        return True
+    return inspect.isfunction(value) and value.__qualname__.startswith(base.__qualname__ + '.')
+
+
+def class_spec(cls: type) -> Dict[str, Any]:
+    """Returns the public class attributes of a tab class and of its bases, described by `describe`."""
+    spec = {}
+    for base in reversed(cls.__mro__[:-1]):
+        for name, value in vars(base).items():
+            if not name.startswith('_') and not is_method(base, value):
+                spec[name] = value
+    return {name: describe(value) for name, value in sorted(spec.items())}
+
+
+def payload_key(tab_cls: type, version: Hashable) -> str:
+    """
+    Returns the key of the payload of a tab at a data version.
+
+    Args:
+        tab_cls (type): The tab class.
+        version (Hashable): The data version of the tab. Must not be None.
+
+    Returns:
+        str: A hash of the code, the tab spec and the data version.
+    """
+    spec = json.dumps(class_spec(tab_cls), sort_keys=True)
+    return hashlib.sha256(repr((code_digest(), spec, version)).encode()).hexdigest()
+
+
+class PayloadCache(object):
+    """
+    A directory of serialized tab payloads bounded in size. Files are written through a temporary file and renamed
+    into place, so concurrent workers never read a partial payload and the last writer of a key wins with an
+    identical payload. Payload files get the permissions of any file created under the umask of the process, so
+    workers running as other users of the same group can share the directory. Reading a payload refreshes its
+    modification time, and the least recently used payloads are removed when the directory grows over `max_bytes`.
+
+    The size of the directory is tracked as payloads are written, so a write only scans the directory when the
+    tracked size is over `max_bytes`, or every `scan_interval` writes to account for the payloads written and
+    removed by other workers.
+
+    Attributes:
+        directory (Path): The cache directory, shared by every worker.
+        max_bytes (int, optional): The maximum total size of the payloads in bytes. None disables eviction.
+        scan_interval (int): The number of writes between two scans of the directory.
+        low_water (float): The fraction of `max_bytes` the directory is evicted down to, leaving room for the
+            next writes before another scan.
+        metrics (Dict[str, int]): The number of 'hits', 'misses', 'writes', 'evictions' and 'scans' in this worker.
+    """
+    scan_interval: int = 100
+    low_water: float = 0.9
+
+    def __init__(self, directory: Union[str, Path], max_bytes: Optional[int] = None) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        umask = os.umask(0)
+        os.umask(umask)
+        self.file_mode = 0o666 & ~umask
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, int] = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0, 'scans': 0}
+        self.total_bytes = 0
+        self.unscanned_writes = 0
+        self.evict()
+
+    def count(self, metric: str, n: int = 1) -> None:
+        """Increment a counter of `metrics`."""
+        with self.lock:
+            self.metrics[metric] += n
+
+    def path(self, key: str) -> Path:
+        """Returns the file of the payload `key`."""
+        return self.directory / f'{key}.json'
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the payload `key`, or None if it is not cached."""
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file:
+                payload = file.read().decode()
+            os.utime(path)
+        except FileNotFoundError:
+            self.count('misses')
+            return None
+        self.count('hits')
+        return payload
+
+    def put(self, key: str, payload: str) -> None:
+        """Store the payload `key` and evict the least recently used payloads over `max_bytes`."""
+        data = payload.encode()
+        path = self.path(key)
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.chmod(tmp, self.file_mode)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        with self.lock:
+            self.metrics['writes'] += 1
+            self.total_bytes += len(data) - replaced
+            self.unscanned_writes += 1
+            scan = (self.unscanned_writes >= self.scan_interval
+                    or (self.max_bytes is not None and self.total_bytes > self.max_bytes))
+        if scan:
+            self.evict()
+
+    def entries(self) -> List[Tuple[Path, os.stat_result]]:
+        """Returns the path and stat of every payload, least recently used first."""
+        entries = []
+        for path in self.directory.glob('*.json'):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                pass
+        return sorted(entries, key=lambda i: i[1].st_mtime_ns)
+
+    def evict(self) -> int:
+        """
+        Scan the directory and, if it is over `max_bytes`, remove the least recently used payloads until it fits
+        in `low_water` of `max_bytes`, then reset the tracked size to the size found. Payloads removed at the same time by another worker are skipped.
+
+        Returns:
+            int: The number of payloads removed.
+        """
+        entries = self.entries()
+        total = sum(stat.st_size for _, stat in entries)
+        target = total if self.max_bytes is None or total <= self.max_bytes else self.max_bytes * self.low_water
+        evicted = 0
+        for path, stat in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                evicted += 1
+            except FileNotFoundError:
+                pass
+            total -= stat.st_size
+        with self.lock:
+            self.metrics['evictions'] += evicted
+            self.metrics['scans'] += 1
+            self.total_bytes = total
+            self.unscanned_writes = 0
+        return evicted
@@ -0,0 +1,243 @@
+"""
+This module contains the multi resolution rollups of time series tabs.
+A pyramid of minute, hour, day and week buckets is computed when a time series loads and extended
+incrementally when rows are appended. A figure request is served from the coarsest level that still
+has the target number of points in the visible range, so render time stays flat as history grows.
+"""
+
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+
+LEVELS: List[str] = ['week', 'day', 'hour', 'minute']
+STATISTICS: List[str] = ['min', 'max', 'mean', 'last']
+
+
+def bucket_starts(times: np.ndarray, level: str) -> np.ndarray:
+    """
+    Floor datetime64 values to the start of their bucket.
+
+    Args:
+        times (np.ndarray): The datetime64 values.
+        level (str): 'minute', 'hour', 'day' or 'week'. Weeks start on Monday.
+
+    Returns:
+        np.ndarray: The datetime64[ns] bucket starts.
+    """
+    if level == 'week':
+        days = times.astype('datetime64[D]')
+        # 1970-01-01 was a Thursday, shifting by 3 days makes Monday day 0 of the week.
+        days = days - ((days.astype(np.int64) + 3) % 7).astype('timedelta64[D]')
+        return days.astype('datetime64[ns]')
+    unit = {'minute': 'm', 'hour': 'h', 'day': 'D'}[level]
+    return times.astype(f'datetime64[{unit}]').astype('datetime64[ns]')
+
+
+def checksum(times: np.ndarray, values: Dict[str, np.ndarray]) -> str:
+    """Returns a hash of the times and the columns of a time series, used to tell an append from an edit."""
+    digest = hashlib.blake2b(np.ascontiguousarray(times, dtype='datetime64[ns]').tobytes(), digest_size=16)
+    for name in sorted(values):
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(values[name], dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class RollupLevel:
+    """
+    The buckets of one level of the pyramid, held as sorted arrays.
+
+    Attributes:
+        times (np.ndarray): The start of every bucket, sorted.
+        counts (np.ndarray): The number of rows in every bucket.
+        columns (Dict[str, Dict[str, np.ndarray]]): The 'min', 'max', 'sum' and 'last' of every column per bucket.
+    """
+
+    def __init__(self, times: np.ndarray, counts: np.ndarray, columns: Dict[str, Dict[str, np.ndarray]]) -> None:
+        self.times = times
+        self.counts = counts
+        self.columns = columns
+
+    @classmethod
+    def build(cls, level: str, times: np.ndarray, values: Dict[str, np.ndarray]) -> "RollupLevel":
+        """
+        Aggregate time sorted rows into the buckets of a level in one vectorized pass.
+
+        Args:
+            level (str): The level of the buckets.
+            times (np.ndarray): The sorted datetime64 times of the rows.
+            values (Dict[str, np.ndarray]): The numeric columns of the rows, in time order.
+
+        Returns:
+            RollupLevel: The buckets.
+        """
+        buckets = bucket_starts(times, level)
+        if len(buckets) == 0:
+            return cls(buckets, np.empty(0, dtype=np.int64),
+                       {i: {j: np.empty(0) for j in ('min', 'max', 'sum', 'last')} for i in values})
+        starts = np.concatenate([[0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1])
+        ends = np.concatenate([starts[1:], [len(buckets)]])
+        columns = {}
+        for name, column in values.items():
+            column = column.astype(np.float64)
+            columns[name] = {
+                'min': np.minimum.reduceat(column, starts),
+                'max': np.maximum.reduceat(column, starts),
+                'sum': np.add.reduceat(column, starts),
+                'last': column[ends - 1],
+            }
+        return cls(buckets[starts], ends - starts, columns)
+
+    def append(self, other: "RollupLevel") -> "RollupLevel":
+        """
+        Returns a new level holding the buckets of this level followed by `other`. When `other` starts in the
+        last bucket of this level the two partial buckets are merged, so only the new rows are aggregated.
+
+        Args:
+            other (RollupLevel): The buckets of the appended rows.
+
+        Returns:
+            RollupLevel: The combined level.
+        """
+        if len(other.times) == 0:
+            return self
+        if len(self.times) == 0 or other.times[0] != self.times[-1]:
+            return RollupLevel(np.concatenate([self.times, other.times]),
+                               np.concatenate([self.counts, other.counts]),
+                               {name: {stat: np.concatenate([stats[stat], other.columns[name][stat]])
+                                       for stat in stats} for name, stats in self.columns.items()})
+        merge = {'min': np.minimum, 'max': np.maximum, 'sum': np.add, 'last': lambda a, b: b}
+        columns = {}
+        for name, stats in self.columns.items():
+            new = other.columns[name]
+            columns[name] = {stat: np.concatenate([stats[stat][:-1],
+                                                   [merge[stat](stats[stat][-1], new[stat][0])],
+                                                   new[stat][1:]])
+                             for stat in stats}
+        counts = np.concatenate([self.counts[:-1], [self.counts[-1] + other.counts[0]], other.counts[1:]])
+        return RollupLevel(np.concatenate([self.times, other.times[1:]]), counts, columns)
+
+    def bounds(self, start: Optional[np.datetime64], end: Optional[np.datetime64]) -> slice:
+        """Returns the positions of the buckets overlapping a time range, found by binary search."""
+        lo = 0 if start is None else max(int(np.searchsorted(self.times, start, 'right')) - 1, 0)
+        hi = len(self.times) if end is None else int(np.searchsorted(self.times, end, 'right'))
+        return slice(lo, max(lo, hi))
+
+    def frame(self, bounds: slice, time_column: str, statistic: str) -> pd.DataFrame:
+        """
+        Returns the buckets within `bounds` as a DataFrame with one `statistic` column per rolled up column.
+
+        Args:
+            bounds (slice): The positions of the buckets.
+            time_column (str): The name given to the bucket start column.
+            statistic (str): 'min', 'max', 'mean' or 'last'.
+
+        Returns:
+            pd.DataFrame: The buckets.
+        """
+        data = {time_column: self.times[bounds]}
+        for name, stats in self.columns.items():
+            if statistic == 'mean':
+                data[name] = stats['sum'][bounds] / self.counts[bounds]
+            else:
+                data[name] = stats[statistic][bounds]
+        return pd.DataFrame(data)
+
+
+class RollupPyramid:
+    """
+    Rollups of a time series at several resolutions.
+
+    Attributes:
+        levels (Dict[str, RollupLevel]): The buckets of every level, from the coarsest to the finest.
+        n_rows (int): The number of rows rolled up.
+        last_time (np.datetime64 or None): The latest time rolled up.
+        checksum (str, optional): The `checksum` of the rows rolled up, or None if it was not computed.
+    """
+
+    def __init__(self, levels: Dict[str, RollupLevel], n_rows: int, last_time: Optional[np.datetime64],
+                 checksum: Optional[str] = None) -> None:
+        self.levels = levels
+        self.n_rows = n_rows
+        self.last_time = last_time
+        self.checksum = checksum
+
+    @classmethod
+    def build(cls, times: np.ndarray, values: Dict[str, np.ndarray], levels: List[str] = LEVELS) -> "RollupPyramid":
+        """
+        Roll up a time series at every level.
+
+        Args:
+            times (np.ndarray): The sorted datetime64 times of the rows.
+            values (Dict[str, np.ndarray]): The numeric columns to roll up, in time order.
+            levels (List[str]): The levels to build, from the coarsest to the finest.
+
+        Returns:
+            RollupPyramid: The rollups.
+        """
+        return cls({level: RollupLevel.build(level, times, values) for level in levels},
+                   len(times), times[-1] if len(times) else None, checksum(times, values))
+
+    def appended(self, times: np.ndarray, values: Dict[str, np.ndarray]) -> "RollupPyramid":
+        """
+        Returns a new pyramid extended with rows appended after `last_time`. Only the new rows are aggregated.
+        The new pyramid has no `checksum`, see `refresh`.
+
+        Args:
+            times (np.ndarray): The sorted datetime64 times of the appended rows.
+            values (Dict[str, np.ndarray]): The numeric columns of the appended rows.
+
+        Returns:
+            RollupPyramid: The extended rollups.
+        """
+        levels = {level: rollup.append(RollupLevel.build(level, times, values))
+                  for level, rollup in self.levels.items()}
+        return RollupPyramid(levels, self.n_rows + len(times), times[-1] if len(times) else self.last_time)
+
+    @classmethod
+    def refresh(cls, previous: Optional["RollupPyramid"], times: np.ndarray,
+                values: Dict[str, np.ndarray]) -> "RollupPyramid":
+        """
+        Roll up a reloaded time series, extending `previous` when the reload only appended rows after it
+        and rebuilding every level otherwise. The first `previous.n_rows` rows must match the `checksum` of
+        `previous`, so a reload that edits or reorders earlier rows is rebuilt even if the row count and the
+        last time rolled up are unchanged.
+
+        Args:
+            previous (RollupPyramid, optional): The rollups of the data before the reload.
+            times (np.ndarray): The sorted datetime64 times of every row.
+            values (Dict[str, np.ndarray]): The numeric columns of every row, in time order.
+
+        Returns:
+            RollupPyramid: The rollups of the reloaded data.
+        """
+        if (previous is not None and previous.checksum is not None
+                and set(values) == set(next(iter(previous.levels.values())).columns)
+                and 0 < previous.n_rows <= len(times) and times[previous.n_rows - 1] == previous.last_time):
+            n = previous.n_rows
+            if checksum(times[:n], {name: column[:n] for name, column in values.items()}) == previous.checksum:
+                pyramid = previous.appended(times[n:], {name: column[n:] for name, column in values.items()})
+                pyramid.checksum = checksum(times, values)
+                return pyramid
+        return cls.build(times, values, list(previous.levels) if previous is not None else LEVELS)
+
+    def select(self, start: Any = None, end: Any = None, target_points: int = 1000) -> Tuple[Optional[str], slice]:
+        """
+        Pick the coarsest level that still has at least `target_points` buckets in a time range.
+
+        Args:
+            start (Any, optional): The first time of the range.
+            end (Any, optional): The last time of the range.
+            target_points (int): The number of points the figure should have.
+
+        Returns:
+            Tuple[Optional[str], slice]: The level and the positions of its buckets in the range, or None and an
+            empty slice when even the finest level has fewer points, in which case the raw rows should be used.
+        """
+        start = None if start is None else np.datetime64(pd.Timestamp(start), 'ns')
+        end = None if end is None else np.datetime64(pd.Timestamp(end), 'ns')
+        for level, rollup in self.levels.items():
+            bounds = rollup.bounds(start, end)
+            if bounds.stop - bounds.start >= target_points:
+                return level, bounds
+        return None, slice(0, 0)
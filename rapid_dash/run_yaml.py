@@ -8,7 +8,8 @@ import yaml
 
 
 
-def start_dashboard(yaml_path: str) -> None:
+def start_dashboard(yaml_path: str, watch: bool = False) -> None:
+    AutoDash.watch_yaml = watch
     dashboard = AutoDash.from_yaml(yaml_path)
     #dashboard=dashboard_cls()
     dashboard.run(debug=True, port=8080)
@@ -20,5 +21,8 @@ if __name__ == '__main__':
     
     parser.add_argument('--yaml-path',
                         help='The path to the yaml config for a dashboard.')
+    parser.add_argument('--watch',
+                        help='Reload the tabs when the yaml config changes',
+                        action='store_true')
     args = parser.parse_args()
-    start_dashboard(args.yaml_path)
\ No newline at end of file
+    start_dashboard(args.yaml_path, args.watch)
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+This module contains the memory mapped data store shared by the worker processes of a dashboard.
+Each data source is materialized once into a directory of NumPy files on local disk, which every
+worker maps read only, so the pages are shared through the OS page cache instead of copied per process.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Union
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_MMAP_DIR = Path(tempfile.gettempdir()) / "rapid_dash_mmap"
+
+
+class MMapStore:
+    """
+    A directory of memory mapped data sources.
+    Every source has one sub directory per materialized version and a `CURRENT` file naming the
+    version readers should open. A new version is written to a temporary directory and swapped in
+    by atomic renames, so readers never see a half written file.
+
+    Attributes:
+        root (Path): The directory holding the sources.
+    """
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_MMAP_DIR) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def version_id(version: Hashable) -> str:
+        """Returns a file name safe id for a data source version stamp."""
+        return hashlib.sha1(repr(version).encode()).hexdigest()[:16]
+
+    def source_dir(self, name: str) -> Path:
+        """Returns the directory holding the versions of the source `name`."""
+        return self.root / hashlib.sha1(name.encode()).hexdigest()[:16]
+
+    def current_version(self, name: str) -> Optional[str]:
+        """Returns the id of the version readers should open, or None if the source was never materialized."""
+        try:
+            return (self.source_dir(name) / "CURRENT").read_text().strip()
+        except OSError:
+            return None
+
+    @contextmanager
+    def write_lock(self, name: str) -> Iterator[None]:
+        """Serializes writers of a source across threads and, where `fcntl` is available, across processes."""
+        source_dir = self.source_dir(name)
+        source_dir.mkdir(parents=True, exist_ok=True)
+        with self.lock, open(source_dir / ".lock", "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def materialize(self, name: str, df: pd.DataFrame, version: Hashable) -> str:
+        """
+        Write a DataFrame as a new version of the source `name` and make it current.
+        Numeric, boolean and datetime columns are written as `.npy` files. Other columns are
+        written as categorical codes with their categories stored alongside.
+
+        Args:
+            name (str): The name of the source.
+            df (pd.DataFrame): The data to write.
+            version (Hashable): The version stamp of the data.
+
+        Returns:
+            str: The id of the written version.
+        """
+        source_dir = self.source_dir(name)
+        version_id = self.version_id(version)
+        final_dir = source_dir / version_id
+        if not final_dir.exists():
+            tmp_dir = Path(tempfile.mkdtemp(dir=source_dir, prefix=f".{version_id}-"))
+            columns = []
+            for position, column in enumerate(df.columns):
+                values = df[column]
+                file_name = f"{position}.npy"
+                if values.dtype.kind in "biufcmM":
+                    np.save(tmp_dir / file_name, values.to_numpy())
+                    columns.append({'name': column, 'file': file_name, 'kind': 'array'})
+                else:
+                    codes, categories = pd.factorize(values)
+                    np.save(tmp_dir / file_name, codes)
+                    columns.append({'name': column, 'file': file_name, 'kind': 'categorical',
+                                    'categories': categories.tolist()})
+            with open(tmp_dir / "meta.json", "w") as file:
+                json.dump({'name': name, 'version': repr(version), 'columns': columns}, file)
+            os.replace(tmp_dir, final_dir)
+        current = source_dir / f".CURRENT-{os.getpid()}-{threading.get_ident()}"
+        current.write_text(version_id)
+        os.replace(current, source_dir / "CURRENT")
+        self.cleanup(name, keep=version_id)
+        return version_id
+
+    def cleanup(self, name: str, keep: str) -> None:
+        """
+        Remove every version of a source other than `keep`. Workers that still map an old version
+        keep reading it, since the mapped files stay valid until they are closed.
+        """
+        for path in self.source_dir(name).iterdir():
+            if path.is_dir() and path.name != keep and not path.name.startswith("."):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def open(self, name: str, version_id: Optional[str] = None) -> pd.DataFrame:
+        """
+        Open a version of the source `name` as a DataFrame backed by read only memory maps.
+
+        Args:
+            name (str): The name of the source.
+            version_id (str, optional): The version to open. Defaults to the current version.
+
+        Returns:
+            pd.DataFrame: The data of the source.
+        """
+        version_id = version_id or self.current_version(name)
+        if version_id is None:
+            raise ValueError(f"Source not materialized: {name}")
+        version_dir = self.source_dir(name) / version_id
+        with open(version_dir / "meta.json") as file:
+            meta = json.load(file)
+        data: Dict[Any, Any] = {}
+        for column in meta['columns']:
+            values = np.load(version_dir / column['file'], mmap_mode='r')
+            if column['kind'] == 'categorical':
+                values = pd.Categorical.from_codes(values, categories=column['categories'])
+            data[column['name']] = values
+        return pd.DataFrame(data, copy=False)
+
+    def load(self, name: str, loader: Callable[[], pd.DataFrame], version: Hashable = None) -> pd.DataFrame:
+        """
+        Open the source `name` at `version`, materializing it with `loader` if no worker has done so yet.
+
+        Args:
+            name (str): The name of the source.
+            loader (Callable[[], pd.DataFrame]): Loads the data from the original data source.
+            version (Hashable, optional): The current version stamp of the data source.
+
+        Returns:
+            pd.DataFrame: The memory mapped data.
+        """
+        version_id = self.version_id(version)
+        if self.current_version(name) != version_id:
+            with self.write_lock(name):
+                if self.current_version(name) != version_id:
+                    self.materialize(name, loader(), version)
+        try:
+            return self.open(name, version_id)
+        except FileNotFoundError:
+            # Another worker swapped in a newer version and removed this one.
+            return self.open(name)
+
+
+stores: Dict[str, MMapStore] = {}
+stores_lock = threading.Lock()
+
+
+def get_store(root: Union[str, Path] = DEFAULT_MMAP_DIR) -> MMapStore:
+    """
+    Get the store rooted at `root`, creating it on first use.
+
+    Args:
+        root (Union[str, Path]): The directory of the store.
+
+    Returns:
+        MMapStore: The shared store.
+    """
+    with stores_lock:
+        key = str(root)
+        if key not in stores:
+            stores[key] = MMapStore(root)
+        return stores[key]
@@ -0,0 +1,339 @@
+"""
+This module contains the helpers for loading tab data from SQL databases.
+Connections are pooled per database and query results are cached by query and parameters.
+"""
+
+import sys
+import sqlite3
+import threading
+import time
+import queue
+from collections import OrderedDict
+from contextlib import contextmanager
+import pandas as pd
+import data_cache as dc
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple, Union
+
+PARAMSTYLES = ('qmark', 'numeric', 'named', 'format', 'pyformat')
+
+
+def driver_paramstyle(connect: Callable[..., Any]) -> str:
+    """
+    Returns the DB-API `paramstyle` of the driver module defining a `connect` function, e.g. 'qmark' for sqlite3
+    or 'pyformat' for psycopg2. Defaults to 'qmark' when the module does not declare one.
+    """
+    module = getattr(connect, '__module__', None) or ''
+    root = module.partition('.')[0]
+    for name in (module, root, root.lstrip('_')):
+        paramstyle = getattr(sys.modules.get(name), 'paramstyle', None)
+        if paramstyle is not None:
+            return paramstyle
+    return 'qmark'
+
+
+class ConnectionPool:
+    """
+    A fixed size pool of DB-API connections to a single database.
+
+    Attributes:
+        database (str): The database the connections are opened against, e.g. the path to a SQLite file.
+        max_connections (int): The maximum number of connections held open by the pool.
+        connect (Callable): A DB-API `connect` function. Defaults to `sqlite3.connect`.
+        timeout (float): The number of seconds to wait for a free connection before raising.
+        paramstyle (str): The placeholder style of the driver, see `build_query`. Defaults to the `paramstyle`
+            declared by the module of `connect`.
+    """
+
+    def __init__(self, database: str, max_connections: int = 5,
+                 connect: Callable[..., Any] = sqlite3.connect, timeout: float = 30,
+                 paramstyle: Optional[str] = None) -> None:
+        self.database = database
+        self.max_connections = max_connections
+        self.connect = connect
+        self.timeout = timeout
+        self.paramstyle = driver_paramstyle(connect) if paramstyle is None else paramstyle
+        self.idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    def open_connection(self) -> Any:
+        """
+        Opens a new connection to the database. SQLite connections are shared across the
+        threads of the server so they are opened with `check_same_thread=False`.
+
+        Returns:
+            Any: A DB-API connection.
+        """
+        if self.connect is sqlite3.connect:
+            return self.connect(str(self.database), check_same_thread=False)
+        return self.connect(self.database)
+
+    def acquire(self) -> Any:
+        """
+        Take an idle connection from the pool, opening a new one if the pool is not full.
+
+        Returns:
+            Any: A DB-API connection.
+
+        Raises:
+            TimeoutError: If no connection becomes available within `timeout` seconds.
+        """
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if self.opened < self.max_connections:
+                self.opened += 1
+                try:
+                    return self.open_connection()
+                except Exception:
+                    self.opened -= 1
+                    raise
+        try:
+            return self.idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No connection to {self.database} available after {self.timeout} seconds")
+
+    def grow(self, max_connections: int) -> None:
+        """Raise the maximum number of connections of the pool to `max_connections`. A smaller size is ignored."""
+        with self.lock:
+            if max_connections > self.max_connections:
+                print(f'Growing the connection pool of {self.database} from {self.max_connections} '
+                      f'to {max_connections} connections')
+                self.max_connections = max_connections
+
+    def release(self, connection: Any) -> None:
+        """Return a connection to the pool."""
+        self.idle.put_nowait(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Context manager that borrows a connection from the pool and returns it when done.
+
+        Yields:
+            Any: A DB-API connection.
+        """
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self) -> None:
+        """Close every idle connection held by the pool."""
+        while True:
+            try:
+                connection = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            connection.close()
+            with self.lock:
+                self.opened -= 1
+
+
+class QueryCache:
+    """
+    A thread safe cache of query result sets with a time to live, bounded in entries and bytes.
+    Expired result sets are dropped when they are read and whenever a result set is added. The least recently
+    used result sets are evicted first when the cache is over a limit.
+
+    Attributes:
+        ttl_seconds (float): The number of seconds a result set stays valid after it is loaded.
+        max_entries (int or None): The maximum number of result sets kept.
+        max_bytes (int or None): The maximum total size of the result sets kept, in bytes.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: Optional[int] = 256,
+                 max_bytes: Optional[int] = 256 * 1024 ** 2) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Hashable, Tuple[float, float, int, pd.DataFrame]]" = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def configure(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """
+        Set the limits of the cache and evict any result sets over them.
+
+        Args:
+            max_entries (int, optional): The maximum number of result sets kept.
+            max_bytes (int, optional): The maximum total size of the result sets kept, in bytes.
+        """
+        with self.lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self.evict()
+
+    def get(self, key: Hashable, ttl_seconds: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """
+        Get the result set cached for `key`.
+
+        Args:
+            key (Hashable): The cache key.
+            ttl_seconds (float, optional): Overrides the time to live the result set was cached with.
+
+        Returns:
+            Optional[pd.DataFrame]: The cached result set, or None if it is missing or expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            loaded_at, ttl, _, result = entry
+            ttl = ttl if ttl_seconds is None else ttl_seconds
+            if time.monotonic() - loaded_at > ttl:
+                self.remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return result
+
+    def set(self, key: Hashable, result: pd.DataFrame, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Cache a result set under `key`, then drop the expired result sets and evict the least recently used
+        ones over the limits.
+
+        Args:
+            key (Hashable): The cache key.
+            result (pd.DataFrame): The result set.
+            ttl_seconds (float, optional): Overrides the cache wide time to live.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        size = dc.data_size(result)
+        with self.lock:
+            self.remove(key)
+            self.entries[key] = (time.monotonic(), ttl, size, result)
+            self.total_bytes += size
+            self.purge_expired()
+            self.evict()
+
+    def remove(self, key: Hashable) -> None:
+        """Remove the result set cached for `key`, if any. Called with the lock held."""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
+
+    def purge_expired(self) -> None:
+        """Remove every expired result set. Called with the lock held."""
+        now = time.monotonic()
+        for key in [key for key, (loaded_at, ttl, _, _) in self.entries.items() if now - loaded_at > ttl]:
+            self.remove(key)
+
+    def evict(self) -> None:
+        """Remove the least recently used result sets until the cache fits its limits. Called with the lock held."""
+        while self.entries and ((self.max_entries is not None and len(self.entries) > self.max_entries)
+                                or (self.max_bytes is not None and self.total_bytes > self.max_bytes)):
+            self.remove(next(iter(self.entries)))
+
+    def clear(self) -> None:
+        """Remove every cached result set."""
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+
+pools: Dict[str, ConnectionPool] = {}
+pools_lock = threading.Lock()
+query_cache = QueryCache()
+
+
+def get_pool(database: str, max_connections: int = 5) -> ConnectionPool:
+    """
+    Get the connection pool for a database, creating it on first use. The tabs querying a database share its pool,
+    which holds as many connections as the largest `max_connections` requested for it.
+
+    Args:
+        database (str): The database to connect to.
+        max_connections (int): The pool size requested. A pool created smaller grows to it.
+
+    Returns:
+        ConnectionPool: The shared pool for the database.
+    """
+    database = str(database)
+    with pools_lock:
+        if database not in pools:
+            pools[database] = ConnectionPool(database, max_connections=max_connections)
+        pool = pools[database]
+    pool.grow(max_connections)
+    return pool
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a column name so it can be used safely in a SQL statement."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def placeholder(paramstyle: str, position: int) -> str:
+    """Returns the placeholder of the parameter at `position` in a DB-API `paramstyle`."""
+    if paramstyle == 'qmark':
+        return '?'
+    if paramstyle == 'numeric':
+        return f':{position + 1}'
+    if paramstyle == 'named':
+        return f':p{position}'
+    if paramstyle == 'format':
+        return '%s'
+    if paramstyle == 'pyformat':
+        return f'%(p{position})s'
+    raise ValueError(f"Unknown paramstyle: {paramstyle}. Must be one of {PARAMSTYLES}")
+
+
+def build_query(query: str, columns: Optional[List[str]] = None,
+                filters: Optional[Dict[str, Any]] = None, distinct: bool = False,
+                paramstyle: str = 'qmark') -> Tuple[str, Union[Tuple[Any, ...], Dict[str, Any]]]:
+    """
+    Wrap a tab query so that the column projection and equality filters run inside the database.
+
+    Args:
+        query (str): The query declared by the tab, e.g. "SELECT * FROM prices".
+        columns (List[str], optional): The columns to select. Defaults to every column.
+        filters (Dict[str, Any], optional): Column to value equality filters added as a WHERE clause.
+        distinct (bool): If True, only distinct rows are returned.
+        paramstyle (str): The DB-API placeholder style of the driver, one of `PARAMSTYLES`. The query declared by
+            the tab must not contain placeholders of its own, and with the 'format' and 'pyformat' styles a literal
+            % in it must be written %%.
+
+    Returns:
+        Tuple[str, Union[Tuple[Any, ...], Dict[str, Any]]]: The SQL statement and its parameters, as a dict for
+        the 'named' and 'pyformat' styles.
+    """
+    select = "*" if not columns else ", ".join(quote_identifier(i) for i in dict.fromkeys(columns))
+    sql = f"SELECT {'DISTINCT ' if distinct else ''}{select} FROM ({query.strip().rstrip(';')}) AS source"
+    values = tuple(filters.values()) if filters else ()
+    if filters:
+        sql += " WHERE " + " AND ".join(f"{quote_identifier(name)} = {placeholder(paramstyle, i)}"
+                                         for i, name in enumerate(filters))
+    if paramstyle in ('named', 'pyformat'):
+        return sql, {f'p{i}': value for i, value in enumerate(values)}
+    return sql, values
+
+
+def read_sql(database: str, query: str, columns: Optional[List[str]] = None,
+             filters: Optional[Dict[str, Any]] = None, distinct: bool = False,
+             ttl_seconds: Optional[float] = None, max_connections: int = 5) -> pd.DataFrame:
+    """
+    Run a tab query through the shared connection pool, caching the result set by query and parameters.
+
+    Args:
+        database (str): The database to query.
+        query (str): The query declared by the tab.
+        columns (List[str], optional): The columns to select.
+        filters (Dict[str, Any], optional): Column to value equality filters.
+        distinct (bool): If True, only distinct rows are returned.
+        ttl_seconds (float, optional): How long the result set may be served from the cache.
+        max_connections (int): The pool size requested, see `get_pool`.
+
+    Returns:
+        pd.DataFrame: The result set.
+    """
+    pool = get_pool(database, max_connections)
+    sql, params = build_query(query, columns, filters, distinct, pool.paramstyle)
+    key = (str(database), sql, tuple(params.items()) if isinstance(params, dict) else params)
+    result = query_cache.get(key, ttl_seconds)
+    if result is None:
+        with pool.connection() as connection:
+            result = pd.read_sql_query(sql, connection, params=params)
+        query_cache.set(key, result, ttl_seconds)
+    return result
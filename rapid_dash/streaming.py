@@ -0,0 +1,313 @@
+"""
+This module contains the ring buffers and stream sources behind the streaming tabs.
+A source runs in a background thread, parses the lines it receives and appends them to a preallocated
+ring buffer per column, so an insert never reallocates and memory stays fixed however long the stream runs.
+"""
+
+import os
+import socket
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+
+class RingBuffer(object):
+    """
+    A fixed size buffer of the latest rows of a stream, held as one preallocated NumPy array per column.
+
+    Attributes:
+        capacity (int): The number of rows kept. Older rows are overwritten.
+        columns (Dict[str, np.ndarray]): The preallocated array of every column.
+        total (int): The number of rows appended since the buffer was created.
+    """
+
+    def __init__(self, capacity: int, columns: Dict[str, Any]) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.columns = {name: np.empty(capacity, dtype=np.dtype(dtype)) for name, dtype in columns.items()}
+        self.total = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def append(self, row: Sequence[Any]) -> None:
+        """Append one row, given as values in the order of `columns`."""
+        with self.lock:
+            position = self.total % self.capacity
+            for column, value in zip(self.columns.values(), row):
+                column[position] = value
+            self.total += 1
+
+    def extend(self, values: Dict[str, np.ndarray]) -> None:
+        """
+        Append a batch of rows with at most two slice assignments per column.
+
+        Args:
+            values (Dict[str, np.ndarray]): The values of every column, of equal lengths.
+        """
+        n = len(next(iter(values.values()))) if values else 0
+        if n == 0:
+            return
+        with self.lock:
+            skip = max(n - self.capacity, 0)
+            start = (self.total + skip) % self.capacity
+            first = min(n - skip, self.capacity - start)
+            for name, column in self.columns.items():
+                new = np.asarray(values[name])[skip:]
+                column[start:start + first] = new[:first]
+                column[:len(new) - first] = new[first:]
+            self.total += n
+
+    def window(self, n: Optional[int] = None) -> pd.DataFrame:
+        """
+        Returns a copy of the latest rows, oldest first.
+
+        Args:
+            n (int, optional): The number of rows. Defaults to every row kept.
+
+        Returns:
+            pd.DataFrame: The rows.
+        """
+        with self.lock:
+            size = len(self)
+            n = size if n is None else min(n, size)
+            end = self.total % self.capacity
+            start = (end - n) % self.capacity
+            if n == 0 or start < end:
+                return pd.DataFrame({name: column[start:start + n].copy() for name, column in self.columns.items()})
+            return pd.DataFrame({name: np.concatenate([column[start:], column[:end]])
+                                 for name, column in self.columns.items()})
+
+
+def parse_lines(lines: List[str], buffer: RingBuffer) -> Tuple[Dict[str, np.ndarray], int]:
+    """
+    Parse comma separated lines holding the values of the columns of a buffer, in order.
+
+    Args:
+        lines (List[str]): The lines.
+        buffer (RingBuffer): The buffer the values are for.
+
+    Returns:
+        Tuple[Dict[str, np.ndarray], int]: The values of every column and the number of lines skipped because
+        they could not be parsed, e.g. a header line.
+    """
+    names = list(buffer.columns)
+    rows = [line.split(',') for line in lines if line.strip()]
+    rows = [row for row in rows if len(row) == len(names)]
+    skipped = len([line for line in lines if line.strip()]) - len(rows)
+    try:
+        return {name: np.array([row[i].strip() for row in rows]).astype(buffer.columns[name].dtype)
+                for i, name in enumerate(names)}, skipped
+    except ValueError:
+        pass
+    parsed = []
+    for row in rows:
+        try:
+            parsed.append([np.array(value.strip()).astype(buffer.columns[name].dtype)
+                           for name, value in zip(names, row)])
+        except ValueError:
+            skipped += 1
+    return {name: np.array([row[i] for row in parsed], dtype=buffer.columns[name].dtype)
+            for i, name in enumerate(names)}, skipped
+
+
+class StreamSource(ABC):
+    """
+    Abstract base class of the sources feeding a ring buffer from a background thread.
+    Concrete classes must implement the `read` method.
+
+    Attributes:
+        poll_interval (float): The longest time, in seconds, a read waits before checking whether the source was stopped.
+        skipped (int): The number of lines that could not be parsed.
+    """
+    poll_interval: float = 0.1
+
+    def __init__(self) -> None:
+        self.skipped = 0
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def open(self) -> None:
+        """Opens the source. Called in the background thread before the first read."""
+        pass
+
+    def close(self) -> None:
+        """Closes the source. Called in the background thread after the last read."""
+        pass
+
+    @abstractmethod
+    def read(self) -> List[str]:
+        """Returns the complete lines received since the last read, waiting at most `poll_interval` seconds."""
+        pass
+
+    def run(self, buffer: RingBuffer) -> None:
+        """Read lines until the source is stopped, appending them to `buffer`."""
+        self.open()
+        try:
+            while not self.stopped.is_set():
+                lines = self.read()
+                if lines:
+                    values, skipped = parse_lines(lines, buffer)
+                    self.skipped += skipped
+                    buffer.extend(values)
+        finally:
+            self.close()
+
+    def start(self, buffer: RingBuffer) -> None:
+        """Start feeding `buffer` from a daemon thread."""
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, args=(buffer,), daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and wait for it to exit."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+
+class FileTailSource(StreamSource):
+    """
+    Follows a file as lines are appended to it, like `tail -F`. A file that is truncated or replaced,
+    e.g. by log rotation, is read again from the start.
+
+    Attributes:
+        path (Path): The file to follow. It may not exist yet.
+        from_start (bool): If True, the lines already in the file are read, otherwise only the appended lines.
+    """
+
+    def __init__(self, path: Union[str, Path], from_start: bool = False) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.from_start = from_start
+        self.file = None
+        self.partial = ''
+
+    def reopen(self, seek_end: bool) -> None:
+        """Open the file, at its end when `seek_end` is True."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.partial = ''
+        try:
+            self.file = open(self.path)
+        except FileNotFoundError:
+            return
+        if seek_end:
+            self.file.seek(0, os.SEEK_END)
+
+    def open(self) -> None:
+        self.reopen(not self.from_start)
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+    def read(self) -> List[str]:
+        if self.file is None:
+            self.reopen(False)
+        data = self.file.read() if self.file is not None else ''
+        if not data:
+            try:
+                stat = os.stat(self.path)
+                if self.file is None or stat.st_ino != os.fstat(self.file.fileno()).st_ino \
+                        or stat.st_size < self.file.tell():
+                    self.reopen(False)
+            except FileNotFoundError:
+                pass
+            self.stopped.wait(self.poll_interval)
+            return []
+        lines = (self.partial + data).split('\n')
+        self.partial = lines.pop()
+        return lines
+
+
+class DatagramSource(StreamSource):
+    """
+    Receives lines in datagrams on a socket. Every datagram holds one or more newline separated lines.
+
+    Attributes:
+        family (int): The socket family, `socket.AF_INET` or `socket.AF_UNIX`.
+        address (Any): The address the socket is bound to.
+    """
+
+    def __init__(self, family: int, address: Any) -> None:
+        super().__init__()
+        self.family = family
+        self.address = address
+        self.socket: Optional[socket.socket] = None
+        self.bound = threading.Event()
+
+    def open(self) -> None:
+        self.socket = socket.socket(self.family, socket.SOCK_DGRAM)
+        self.socket.bind(self.address)
+        self.socket.settimeout(self.poll_interval)
+        self.address = self.socket.getsockname()
+        self.bound.set()
+
+    def close(self) -> None:
+        if self.socket is not None:
+            self.socket.close()
+
+    def read(self) -> List[str]:
+        try:
+            data = self.socket.recv(65536)
+        except socket.timeout:
+            return []
+        return data.decode().splitlines()
+
+
+class UDPSource(DatagramSource):
+    """Receives lines in UDP datagrams. Port 0 binds a free port, available in `address` once `bound` is set."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0) -> None:
+        super().__init__(socket.AF_INET, (host, port))
+
+
+class UnixSocketSource(DatagramSource):
+    """Receives lines in datagrams on a Unix socket. A stale socket file left at `path` is replaced."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        super().__init__(socket.AF_UNIX, str(path))
+
+    def open(self) -> None:
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        super().open()
+
+    def close(self) -> None:
+        super().close()
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+streams: Dict[str, Tuple[RingBuffer, StreamSource]] = {}
+streams_lock = threading.Lock()
+
+
+def get_stream(name: str, columns: Dict[str, Any], capacity: int,
+               source: Callable[[], StreamSource]) -> RingBuffer:
+    """
+    Get the buffer of the stream `name`, creating it and starting its source on first use.
+
+    Args:
+        name (str): The name of the stream, e.g. the `dash_tabs.tab_key` of the tab.
+        columns (Dict[str, Any]): The name and dtype of every column, in the order of the values in a line.
+        capacity (int): The number of rows kept.
+        source (Callable[[], StreamSource]): Creates the source feeding the buffer.
+
+    Returns:
+        RingBuffer: The buffer.
+    """
+    with streams_lock:
+        if name not in streams:
+            buffer = RingBuffer(capacity, columns)
+            stream_source = source()
+            stream_source.start(buffer)
+            streams[name] = (buffer, stream_source)
+        return streams[name][0]
@@ -0,0 +1,73 @@
+"""
+This module contains the sorted time index used to slice time series tabs by date range.
+The index is built once per data version, after which every range request is two binary searches.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, Optional, Union
+
+
+class SortedTimeIndex:
+    """
+    A datetime64 index over a time column, sorted once so date ranges can be found with `searchsorted`.
+
+    Attributes:
+        column (str): The indexed time column.
+        times (np.ndarray): The sorted datetime64 values of the column. Missing values are dropped.
+        order (np.ndarray or None): The row positions in time order, or None if the rows are already in time order.
+    """
+
+    def __init__(self, df: pd.DataFrame, column: str) -> None:
+        self.column = column
+        times = pd.to_datetime(df[column]).to_numpy(dtype='datetime64[ns]')
+        valid = ~np.isnat(times)
+        if valid.all() and (len(times) < 2 or (times[1:] >= times[:-1]).all()):
+            self.order = None
+            self.times = times
+        else:
+            self.order = np.flatnonzero(valid)[np.argsort(times[valid], kind='stable')]
+            self.times = times[self.order]
+
+    @property
+    def start(self) -> Optional[pd.Timestamp]:
+        """The earliest time in the index."""
+        return pd.Timestamp(self.times[0]) if len(self.times) else None
+
+    @property
+    def end(self) -> Optional[pd.Timestamp]:
+        """The latest time in the index."""
+        return pd.Timestamp(self.times[-1]) if len(self.times) else None
+
+    def bounds(self, start: Any = None, end: Any = None) -> slice:
+        """
+        Find the positions of a date range in the sorted times with two binary searches.
+
+        Args:
+            start (Any, optional): The first time of the range, inclusive. Defaults to the earliest time.
+            end (Any, optional): The last time of the range, inclusive. Defaults to the latest time.
+
+        Returns:
+            slice: The positions of the range in `times`.
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.times, np.datetime64(pd.Timestamp(start), 'ns'), 'left'))
+        hi = len(self.times) if end is None else int(np.searchsorted(self.times, np.datetime64(pd.Timestamp(end), 'ns'), 'right'))
+        return slice(lo, max(lo, hi))
+
+    def window(self, df: pd.DataFrame, start: Any = None, end: Any = None) -> pd.DataFrame:
+        """
+        Returns the rows of `df` within a date range, in time order. When the rows are already in time order
+        this is a positional slice of the DataFrame and no row outside the range is touched.
+
+        Args:
+            df (pd.DataFrame): The DataFrame the index was built on.
+            start (Any, optional): The first time of the range, inclusive.
+            end (Any, optional): The last time of the range, inclusive.
+
+        Returns:
+            pd.DataFrame: The rows within the range.
+        """
+        bounds = self.bounds(start, end)
+        if self.order is None:
+            return df.iloc[bounds]
+        return df.iloc[self.order[bounds]]
@@ -0,0 +1,275 @@
+"""
+This module contains the declarative transforms of graph columns, e.g. moving averages and cumulative sums.
+A graph column with a `transform` is plotted as a derived column, computed once per data version and extended
+with only the appended rows when a reload appends rows to the data.
+
+    {'x': 'date', 'y': 'price', 'transform': {'type': 'rolling', 'window': 20, 'how': 'mean'}}
+"""
+
+import hashlib
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+class Transform(ABC):
+    """
+    Abstract base class of the transforms of a graph column.
+    Concrete classes must implement the `compute` method and the `label` property.
+
+    Attributes:
+        tail_rows (int): The number of rows before the appended rows that `extend` reads to compute them.
+    """
+    tail_rows: int = 0
+
+    @abstractmethod
+    def compute(self, values: pd.Series) -> pd.Series:
+        """Returns the transform of every value."""
+        pass
+
+    @property
+    @abstractmethod
+    def label(self) -> str:
+        """Describes the transform in the name of the derived column, e.g. 'rolling mean 20'."""
+        pass
+
+    def extend(self, inputs: np.ndarray, outputs: np.ndarray) -> np.ndarray:
+        """
+        Returns the transform of the rows appended after the rows already transformed.
+
+        Args:
+            inputs (np.ndarray): Every value of the column, the appended rows last.
+            outputs (np.ndarray): The transform of the rows before the appended rows.
+
+        Returns:
+            np.ndarray: The transform of the appended rows.
+        """
+        start = len(outputs)
+        lo = max(start - self.tail_rows, 0)
+        return self.compute(pd.Series(inputs[lo:])).to_numpy(dtype=np.float64)[start - lo:]
+
+
+class Rolling(Transform):
+    """
+    A rolling window aggregate.
+
+    Attributes:
+        window (int): The number of rows in the window.
+        how (str): The aggregate: 'mean', 'sum', 'std', 'var', 'min', 'max' or 'median'.
+        min_periods (int): The number of values needed for a result. Defaults to `window`.
+    """
+
+    def __init__(self, window: int, how: str = 'mean', min_periods: Optional[int] = None) -> None:
+        if how not in ('mean', 'sum', 'std', 'var', 'min', 'max', 'median'):
+            raise ValueError(f"Unknown rolling aggregate: {how}")
+        self.window = int(window)
+        self.how = how
+        self.min_periods = min_periods
+        self.tail_rows = self.window - 1
+
+    @property
+    def label(self) -> str:
+        return f'rolling {self.how} {self.window}'
+
+    def compute(self, values: pd.Series) -> pd.Series:
+        return getattr(values.rolling(self.window, min_periods=self.min_periods), self.how)()
+
+
+class EWM(Transform):
+    """
+    An exponentially weighted moving average, computed recursively (`adjust=False`) so it can be extended
+    from its last value.
+
+    Attributes:
+        parameter (str): The decay parameter: 'span', 'alpha', 'halflife' or 'com'.
+        value (float): The value of the decay parameter.
+    """
+
+    def __init__(self, **decay: float) -> None:
+        if len(decay) != 1 or next(iter(decay)) not in ('span', 'alpha', 'halflife', 'com'):
+            raise ValueError("ewm needs exactly one of span, alpha, halflife or com")
+        self.parameter, self.value = next(iter(decay.items()))
+
+    @property
+    def label(self) -> str:
+        return f'ewm {self.parameter}={self.value}'
+
+    def compute(self, values: pd.Series) -> pd.Series:
+        return values.ewm(adjust=False, **{self.parameter: self.value}).mean()
+
+    def extend(self, inputs: np.ndarray, outputs: np.ndarray) -> np.ndarray:
+        start = len(outputs)
+        if start == 0 or np.isnan(inputs[start - 1]):
+            # The weights after a missing value depend on the gap, so start again from the full history.
+            return super().extend(inputs, outputs[:0])[start:]
+        # With adjust=False the average only depends on its previous value, which seeds the appended rows.
+        seeded = pd.Series(np.concatenate([outputs[-1:], inputs[start:]]))
+        return self.compute(seeded).to_numpy(dtype=np.float64)[1:]
+
+
+class CumSum(Transform):
+    """A cumulative sum. Missing values are skipped."""
+
+    @property
+    def label(self) -> str:
+        return 'cumsum'
+
+    def compute(self, values: pd.Series) -> pd.Series:
+        return values.cumsum()
+
+    def extend(self, inputs: np.ndarray, outputs: np.ndarray) -> np.ndarray:
+        valid = outputs[~np.isnan(outputs)]
+        total = valid[-1] if len(valid) else 0.0
+        return self.compute(pd.Series(inputs[len(outputs):])).to_numpy(dtype=np.float64) + total
+
+
+class PctChange(Transform):
+    """
+    The relative change from the value `periods` rows before. Missing values are not filled.
+
+    Attributes:
+        periods (int): The number of rows to compare with.
+    """
+
+    def __init__(self, periods: int = 1) -> None:
+        self.periods = int(periods)
+        self.tail_rows = self.periods
+
+    @property
+    def label(self) -> str:
+        return 'pct_change' if self.periods == 1 else f'pct_change {self.periods}'
+
+    def compute(self, values: pd.Series) -> pd.Series:
+        return values.pct_change(self.periods, fill_method=None)
+
+
+TRANSFORMS = {'rolling': Rolling, 'ewm': EWM, 'cumsum': CumSum, 'pct_change': PctChange}
+
+
+def parse_transform(spec: Dict[str, Any]) -> Transform:
+    """
+    Build a transform from its spec.
+
+    Args:
+        spec (Dict[str, Any]): The `type` of the transform and its arguments, e.g.
+            {'type': 'rolling', 'window': 20, 'how': 'std'}, {'type': 'ewm', 'span': 10}, {'type': 'cumsum'}
+            or {'type': 'pct_change', 'periods': 1}.
+
+    Returns:
+        Transform: The transform.
+    """
+    spec = dict(spec)
+    kind = spec.pop('type', None)
+    if kind not in TRANSFORMS:
+        raise ValueError(f"Unknown transform type: {kind}. Choose from {list(TRANSFORMS)}")
+    return TRANSFORMS[kind](**spec)
+
+
+def output_column(column: Dict[str, Any]) -> str:
+    """
+    Returns the name of the column plotted for a graph column: the `name` of its transform, a name derived from
+    the transform, e.g. 'price rolling mean 20', or the y column when there is no transform.
+    """
+    if 'transform' not in column:
+        return column['y']
+    return column['transform'].get('name') or f"{column['y']} {parse_transform(without_name(column['transform'])).label}"
+
+
+def without_name(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns a transform spec without its optional `name`."""
+    return {key: value for key, value in spec.items() if key != 'name'}
+
+
+def graph_transforms(graph_columns: Union[List[Dict[str, Any]], Dict[str, Any], None]) -> List[Tuple[str, str, Transform]]:
+    """
+    Returns the name of the derived column, the y column and the transform of every graph column with a transform.
+    """
+    if graph_columns is None:
+        return []
+    if isinstance(graph_columns, dict):
+        graph_columns = [graph_columns]
+    return [(output_column(i), i['y'], parse_transform(without_name(i['transform'])))
+            for i in graph_columns if 'transform' in i]
+
+
+def input_columns(columns: List[str], transforms: List[Tuple[str, str, Transform]]) -> List[str]:
+    """Returns the columns of the data read by a tab: the kept columns and the inputs of its transforms."""
+    return list(dict.fromkeys(list(columns) + [i[1] for i in transforms]))
+
+
+def checksum(df: pd.DataFrame, columns: List[str]) -> str:
+    """Returns a hash of the values of `columns` in every row of `df`, used to tell an append from an edit."""
+    rows = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    return hashlib.blake2b(rows.tobytes(), digest_size=16).hexdigest()
+
+
+class DerivedColumns:
+    """
+    The data plotted by a tab: the columns it reads from its data and the derived columns of its transforms.
+
+    Attributes:
+        frame (pd.DataFrame): The plotted columns, in the row order of the data.
+        n_rows (int): The number of rows transformed.
+        checksum (str, optional): The `checksum` of the input columns of the rows transformed.
+    """
+
+    def __init__(self, frame: pd.DataFrame, checksum: Optional[str] = None) -> None:
+        self.frame = frame
+        self.n_rows = len(frame)
+        self.checksum = checksum
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, columns: List[str],
+              transforms: List[Tuple[str, str, Transform]]) -> "DerivedColumns":
+        """
+        Compute every transform over the data in one vectorized pass per transform.
+
+        Args:
+            df (pd.DataFrame): The data.
+            columns (List[str]): The columns of the data to keep next to the derived columns, e.g. the x columns.
+            transforms (List[Tuple[str, str, Transform]]): The derived columns, from `graph_transforms`.
+
+        Returns:
+            DerivedColumns: The plotted data.
+        """
+        frame = df[columns].reset_index(drop=True)
+        for name, column, transform in transforms:
+            frame[name] = transform.compute(df[column].astype(np.float64).reset_index(drop=True)).to_numpy()
+        return cls(frame, checksum(df, input_columns(columns, transforms)))
+
+    def appended(self, df: pd.DataFrame, columns: List[str], transforms: List[Tuple[str, str, Transform]]) -> bool:
+        """
+        Returns True if `df` holds the transformed rows followed by new rows: the first `n_rows` rows of the
+        kept columns and of the transform inputs must match the `checksum`, so an edit anywhere in the history
+        is caught.
+        """
+        if self.n_rows == 0 or len(df) < self.n_rows or self.checksum is None:
+            return False
+        return checksum(df.iloc[:self.n_rows], input_columns(columns, transforms)) == self.checksum
+
+    @classmethod
+    def refresh(cls, previous: Optional["DerivedColumns"], df: pd.DataFrame, columns: List[str],
+                transforms: List[Tuple[str, str, Transform]]) -> "DerivedColumns":
+        """
+        Transform reloaded data, extending `previous` when the reload only appended rows and computing every
+        transform over the full history otherwise.
+
+        Args:
+            previous (DerivedColumns, optional): The plotted data before the reload.
+            df (pd.DataFrame): The reloaded data.
+            columns (List[str]): The columns of the data to keep next to the derived columns.
+            transforms (List[Tuple[str, str, Transform]]): The derived columns, from `graph_transforms`.
+
+        Returns:
+            DerivedColumns: The plotted data of the reloaded data.
+        """
+        names = columns + [i[0] for i in transforms]
+        if previous is None or list(previous.frame.columns) != list(dict.fromkeys(names)) \
+                or not previous.appended(df, columns, transforms):
+            return cls.build(df, columns, transforms)
+        n = previous.n_rows
+        new = df[columns].iloc[n:].reset_index(drop=True)
+        for name, column, transform in transforms:
+            new[name] = transform.extend(df[column].to_numpy(dtype=np.float64), previous.frame[name].to_numpy())
+        return cls(pd.concat([previous.frame, new], ignore_index=True), checksum(df, input_columns(columns, transforms)))